@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
 from dotenv import load_dotenv
 
@@ -6,21 +8,58 @@ load_dotenv()
 # Import tools explicitly
 from mcp_server.tools.get_accounts import get_all_items, get_item_by_name
 from mcp_server.tools.get_transactions import get_all_transactions, get_transactions
-from mcp_server.tools.get_net_worth import get_net_worth
+from mcp_server.tools.get_net_worth import get_balance_history, get_net_worth, get_net_worth_history
 from mcp_server.tools.get_current_liabilities import get_current_liabilities
 from mcp_server.tools.get_category_taxonomy import get_category_taxonomy
 from mcp_server.tools.get_categorized_summary import get_categorized_summary
 from mcp_server.tools.get_filtered_transactions import get_transactions_by_vendor
+from mcp_server.tools.query_transactions import query_transactions
+from mcp_server.tools.get_spending_rollup import get_spending_rollup
+from mcp_server.tools.get_data_freshness import get_data_freshness
+from mcp_server.tools.get_recurring_transactions import get_recurring_transactions
+from mcp_server.services import metrics
+from mcp_server.services.concurrency import run_async
+from mcp_server.services.scheduler import refresh_scheduler
+from mcp_server.services.tenants import tenant_registry
+from mcp_server.utils import get_metrics_vars, get_tenant_vars
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    metrics.configure(get_metrics_vars())
+    tenant_registry.configure(get_tenant_vars())
+    # Keep balances and transactions warm in the background while the server runs
+    refresh_scheduler.start()
+    try:
+        yield
+    finally:
+        refresh_scheduler.stop()
+        metrics.dump_prometheus()
+
+app = FastMCP(name="TTYF MCP Server", lifespan=lifespan)
 
-app = FastMCP(name="TTYF MCP Server")
+# Register tools with FastMCP. Each tool runs on a worker thread, so a slow
+# Plaid request does not stall other in-flight tool calls.
+app.add_tool(run_async(get_all_items))
+app.add_tool(run_async(get_item_by_name))
+app.add_tool(run_async(get_transactions))
+app.add_tool(run_async(get_all_transactions))
+app.add_tool(run_async(get_net_worth))
+app.add_tool(run_async(get_net_worth_history))
+app.add_tool(run_async(get_balance_history))
+app.add_tool(run_async(get_current_liabilities))
+app.add_tool(run_async(get_category_taxonomy))
+app.add_tool(run_async(get_categorized_summary))
+app.add_tool(run_async(get_transactions_by_vendor))
+app.add_tool(run_async(query_transactions))
+app.add_tool(run_async(get_spending_rollup))
+app.add_tool(run_async(get_data_freshness))
+app.add_tool(run_async(get_recurring_transactions))
 
-# Register tools with FastMCP
-app.add_tool(get_all_items)
-app.add_tool(get_item_by_name)
-app.add_tool(get_transactions)
-app.add_tool(get_all_transactions)
-app.add_tool(get_net_worth)
-app.add_tool(get_current_liabilities)
-app.add_tool(get_category_taxonomy)
-app.add_tool(get_categorized_summary)
-app.add_tool(get_transactions_by_vendor)
\ No newline at end of file
+@app.resource("metrics://tools", name="tool_metrics", mime_type="application/json")
+def tool_metrics() -> dict:
+    """
+    Per-tool calls, errors, Plaid API calls, rows processed, response bytes, cache hits
+    and time, with the time spent in each span (keyring reads, Plaid calls, parsing,
+    aggregation and serialization). Empty unless METRICS_ENABLED=1.
+    """
+    return metrics.snapshot()
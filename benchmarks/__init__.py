@@ -0,0 +1 @@
+"""Benchmarks for the TTYF MCP server. Run modules with `python -m benchmarks.<name>`."""
@@ -0,0 +1,126 @@
+"""
+Compares building validated pydantic transactions against internal records.
+
+The old path validated every row into a PlaidTransaction and, for more than 20
+rows, validated it again into a CompactPlaidTransaction. The new path builds a
+slotted TransactionRecord per row and only constructs the compact response
+model at the boundary.
+
+    python -m benchmarks.bench_records [--rows 10000] [--repeat 5]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from mcp_server.tools.schemas.io import to_compact_transaction
+from mcp_server.tools.schemas.records import TransactionRecord
+from mcp_server.tools.schemas.tools import PlaidCategory, PlaidTransaction
+
+_CATEGORIES = ["FOOD_AND_DRINK", "TRANSPORTATION", "ENTERTAINMENT", "GENERAL_MERCHANDISE", None]
+_MERCHANTS = ["Amazon", "Netflix", "Starbucks", "Uber", None]
+
+
+def make_rows(count: int) -> list[dict]:
+    """Synthetic rows shaped like the transaction store's."""
+    rng = random.Random(0)
+    rows = []
+    for index in range(count):
+        category = rng.choice(_CATEGORIES)
+        merchant = rng.choice(_MERCHANTS)
+        rows.append({
+            "transaction_id": f"txn-{index}",
+            "account_id": f"acc-{index % 5}",
+            "amount": round(rng.uniform(1, 500), 2),
+            "txn_date": (date(2024, 1, 1) + timedelta(days=index % 365)).isoformat(),
+            "name": f"{merchant or 'POS DEBIT'} #{index % 97}",
+            "merchant_name": merchant,
+            "pending": 0,
+            "iso_currency_code": "USD",
+            "category_primary": category,
+            "category_detailed": f"{category}_OTHER" if category else None,
+            "category_confidence": "HIGH" if category else None,
+            "authorized_date": None,
+            "authorized_datetime": None,
+            "txn_datetime": None,
+            "website": None,
+            "account_name": f"Account {index % 5}",
+            "account_type": "depository",
+            "account_subtype": "checking",
+        })
+    return rows
+
+
+def validated_models(rows: list[dict]) -> list:
+    transactions = []
+    for row in rows:
+        category = None
+        if row["category_primary"]:
+            category = PlaidCategory(
+                primary=row["category_primary"],
+                detailed=row["category_detailed"],
+                confidence_level=row["category_confidence"],
+            )
+        transactions.append(PlaidTransaction(
+            account_id=row["account_id"],
+            amount=row["amount"],
+            authorized_date=row["authorized_date"],
+            authorized_datetime=row["authorized_datetime"],
+            iso_currency_code=row["iso_currency_code"],
+            merchant_name=row["merchant_name"],
+            name=row["name"],
+            txn_date=row["txn_date"],
+            txn_datetime=row["txn_datetime"],
+            pending=row["pending"],
+            category=category,
+            website=row["website"],
+            account_name=row["account_name"],
+            account_type=row["account_type"],
+            account_subtype=row["account_subtype"],
+        ))
+    return [transaction.to_compact() for transaction in transactions]
+
+
+def records(rows: list[dict]) -> list:
+    return [to_compact_transaction(record) for record in map(TransactionRecord.from_row, rows)]
+
+
+def measure(fn: Callable[[list[dict]], list], rows: list[dict], repeat: int) -> tuple[float, int, int]:
+    """Returns the best wall time, the peak traced memory and the number of blocks still allocated afterwards."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    result = fn(rows)
+    after = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return min(timings), peak, after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} transactions, best of {args.repeat}")
+    print(f"{'path':<20}{'wall ms':>10}{'peak KiB':>12}{'retained blocks':>17}")
+    for name, fn in (("validated models", validated_models), ("records", records)):
+        wall, peak, blocks = measure(fn, rows, args.repeat)
+        print(f"{name:<20}{wall * 1000:>10.1f}{peak / 1024:>12.0f}{blocks:>17}")
+
+
+if __name__ == "__main__":
+    main()
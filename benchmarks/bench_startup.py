@@ -0,0 +1,85 @@
+"""
+Reports where server startup spends its import time.
+
+Imports the FastMCP app in a fresh interpreter with `-X importtime` and lists
+the time spent per top-level package, the slowest modules by cumulative and by
+self time, and whether modules that should only load on first use (plaid,
+keyring) were imported eagerly.
+
+    python -m benchmarks.bench_startup [--top 15] [--module app]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+_ROOT = Path(__file__).resolve().parent.parent
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+# Modules that should not be imported until a tool first needs them
+_DEFERRED = ("plaid", "keyring", "urllib3")
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_imports(module: str) -> list[ImportTime]:
+    """Imports `module` in a fresh interpreter and parses its `-X importtime` report."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT,
+        env=os.environ | {"PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            imports.append(ImportTime(
+                module=match.group(4),
+                self_us=int(match.group(1)),
+                cumulative_us=int(match.group(2)),
+                depth=len(match.group(3)) // 2,
+            ))
+    return imports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--module", default="app")
+    args = parser.parse_args()
+
+    imports = measure_imports(args.module)
+    total = sum(entry.self_us for entry in imports)
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+
+    packages: dict[str, int] = {}
+    for entry in imports:
+        package = entry.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + entry.self_us
+    print(f"\n{'package':<60}{'ms':>10}{'share':>12}")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<60}{self_us / 1000:>10.1f}{self_us / total:>12.0%}")
+
+    for title, key in (("cumulative", lambda entry: entry.cumulative_us), ("self", lambda entry: entry.self_us)):
+        print(f"\nslowest by {title} time")
+        print(f"{'module':<60}{'self ms':>10}{'cumul. ms':>12}")
+        for entry in sorted(imports, key=key, reverse=True)[:args.top]:
+            print(f"{entry.module:<60}{entry.self_us / 1000:>10.1f}{entry.cumulative_us / 1000:>12.1f}")
+
+    loaded = {entry.module.split(".")[0] for entry in imports}
+    eager = [name for name in _DEFERRED if name in loaded]
+    print(f"\neagerly imported deferred modules: {', '.join(eager) if eager else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
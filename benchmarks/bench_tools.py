@@ -0,0 +1,206 @@
+"""
+Measures every tool registered in app.py end to end against the offline Plaid stand-in.
+
+Each scenario (number of accounts x number of transactions) runs in a fresh
+interpreter with its own empty storage directory and in-memory keyring. The
+initial transaction sync is timed on its own, then every tool is called
+through an in-memory MCP client, once cold and `--runs` more times warm.
+Reported per tool: first-call and p50/p95 latency, Plaid API calls made
+by the first call and per warm call, and the peak traced memory of one call.
+Background refresh is disabled, and stored transactions count as fresh for
+the whole scenario, so runs are repeatable.
+
+    python -m benchmarks.bench_tools [--accounts 1 10 50] [--transactions 1000 10000 100000]
+        [--runs 10] [--latency 0.05] [--rate-limit 0.0] [--tools get_net_worth ...]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+# Arguments of tools with required parameters, or whose defaults would not exercise them
+_ARGUMENTS: dict[str, dict[str, Any]] = {
+    "get_item_by_name": {"name": "Bank 0"},
+    "get_transactions_by_vendor": {"vendor": "amazon"},
+    "query_transactions": {"categories": ["FOOD_AND_DRINK"], "sort_by": "amount"},
+    "get_categorized_summary": {"transactions": "top"},
+}
+
+
+def _arguments(tool: Any, history_days: int) -> dict[str, Any]:
+    """Tools that take a date range get the whole synthetic history."""
+    properties = tool.inputSchema.get("properties", {})
+    arguments = {}
+    if "start_date" in properties:
+        arguments["start_date"] = (date.today() - timedelta(days=history_days)).isoformat()
+    if "end_date" in properties:
+        arguments["end_date"] = date.today().isoformat()
+    return arguments | _ARGUMENTS.get(tool.name, {})
+
+
+def _percentile(timings: list[float], percentile: int) -> float:
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[percentile - 1]
+
+
+def _setup_backend(args: argparse.Namespace):
+    """Points storage at an empty directory and installs the fake backend behind the shared client."""
+    import keyring
+
+    from benchmarks.fake_plaid import FakePlaidApi, FakePlaidConfig, MemoryKeyring
+
+    keyring.set_keyring(MemoryKeyring())
+    api = FakePlaidApi(FakePlaidConfig(
+        accounts=args.accounts[0],
+        transactions=args.transactions[0],
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit,
+    ))
+    storage = Path.home() / "ttyf"
+    storage.mkdir(parents=True, exist_ok=True)
+    connections = api.connections()
+    (storage / "plaid_connections.json").write_text(json.dumps([{"id": item_id, "name": name} for item_id, name, _ in connections]))
+    for item_id, _, access_token in connections:
+        keyring.set_password("ttyf_plaid", item_id, access_token)
+
+    from mcp_server.services.plaid.client import plaid_client
+
+    plaid_client.client = api
+    return api
+
+
+async def _run_scenario(args: argparse.Namespace) -> list[dict[str, Any]]:
+    api = _setup_backend(args)
+
+    from fastmcp import Client
+
+    from app import app
+    from benchmarks.fake_plaid import FakePlaidConfig
+    from mcp_server.services.plaid.sync import set_sync_min_interval, sync_all_transactions
+
+    # Slow scenarios outlast the default minimum sync interval, which would re-sync in the middle of a tool's runs
+    set_sync_min_interval(24 * 3600)
+    results = []
+    start = time.perf_counter()
+    await asyncio.to_thread(sync_all_transactions)
+    results.append({
+        "tool": "(initial sync)",
+        "first": time.perf_counter() - start,
+        "first_calls": sum(api.calls.values()),
+        "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+    history_days = FakePlaidConfig.history_days
+    async with Client(app) as client:
+        for tool in await client.list_tools():
+            if args.tools and tool.name not in args.tools:
+                continue
+            arguments = _arguments(tool, history_days)
+            result: dict[str, Any] = {"tool": tool.name}
+            try:
+                calls = sum(api.calls.values())
+                start = time.perf_counter()
+                await client.call_tool(tool.name, arguments)
+                result["first"] = time.perf_counter() - start
+                result["first_calls"] = sum(api.calls.values()) - calls
+
+                timings = []
+                calls = sum(api.calls.values())
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    await client.call_tool(tool.name, arguments)
+                    timings.append(time.perf_counter() - start)
+                result["p50"] = _percentile(timings, 50)
+                result["p95"] = _percentile(timings, 95)
+                result["calls_per_run"] = (sum(api.calls.values()) - calls) / max(args.runs, 1)
+
+                tracemalloc.start()
+                await client.call_tool(tool.name, arguments)
+                result["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                tracemalloc.stop()
+            except Exception as error:
+                result["error"] = f"{type(error).__name__}: {error}".splitlines()[0]
+            results.append(result)
+
+    results.append({"tool": "(rate limited calls)", "first_calls": api.rate_limited})
+    return results
+
+
+def _spawn(args: argparse.Namespace, accounts: int, transactions: int) -> list[dict[str, Any]]:
+    """Runs one scenario in a fresh interpreter, so storage, caches and peak RSS start from scratch."""
+    with tempfile.TemporaryDirectory(prefix="ttyf-bench-") as home:
+        command = [
+            sys.executable, "-m", "benchmarks.bench_tools", "--scenario",
+            "--accounts", str(accounts), "--transactions", str(transactions),
+            "--runs", str(args.runs), "--latency", str(args.latency), "--rate-limit", str(args.rate_limit),
+        ]
+        if args.tools:
+            command += ["--tools", *args.tools]
+        env = os.environ | {
+            "HOME": home,
+            "BACKGROUND_REFRESH": "0",
+            "PLAID_CLIENT_ID": os.getenv("PLAID_CLIENT_ID", "fake-client-id"),
+            "SANDBOX_PLAID_SECRET_KEY": os.getenv("SANDBOX_PLAID_SECRET_KEY", "fake-secret"),
+            "PROD_PLAID_SECRET_KEY": os.getenv("PROD_PLAID_SECRET_KEY", "fake-secret"),
+        }
+        result = subprocess.run(command, cwd=_ROOT, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"scenario {accounts} accounts x {transactions} transactions failed:\n{result.stderr}")
+        return json.loads(result.stdout.splitlines()[-1])
+
+
+def _print(accounts: int, transactions: int, results: list[dict[str, Any]]) -> None:
+    print(f"\n{accounts} accounts, {transactions} transactions")
+    print(f"{'tool':<28}{'first ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'api first':>11}{'api/run':>9}{'peak MiB':>10}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['tool']:<28}  {result['error']}")
+            continue
+        cells = [
+            f"{result['first'] * 1000:>10.1f}" if "first" in result else f"{'':>10}",
+            f"{result['p50'] * 1000:>10.1f}" if "p50" in result else f"{'':>10}",
+            f"{result['p95'] * 1000:>10.1f}" if "p95" in result else f"{'':>10}",
+            f"{result['first_calls']:>11}",
+            f"{result['calls_per_run']:>9.1f}" if "calls_per_run" in result else f"{'':>9}",
+            f"{result['peak_mib']:>10.1f}" if "peak_mib" in result else f"{'':>10}",
+        ]
+        print(f"{result['tool']:<28}{''.join(cells)}")
+        if "rss_mib" in result:
+            print(f"{'  (peak RSS after sync)':<28}{result['rss_mib']:>10.0f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--transactions", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean latency of a fake Plaid call in seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of a rate-limited Plaid call")
+    parser.add_argument("--tools", nargs="+", help="only measure these tools")
+    parser.add_argument("--scenario", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(asyncio.run(_run_scenario(args))))
+        return
+
+    for accounts in args.accounts:
+        for transactions in args.transactions:
+            _print(accounts, transactions, _spawn(args, accounts, transactions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Offline stand-in for the Plaid API, for benchmarks and local runs without network access.
+
+FakePlaidApi generates synthetic Items, accounts and transactions and answers
+the PlaidApi endpoints the tools use (accounts_get and transactions_sync) with
+responses shaped like plaid-python's models. Every call sleeps for a jittered
+latency, honours the request's page size and may fail with a rate-limit error,
+so the client's pagination, retries and concurrency are exercised. Install it
+behind the shared client with:
+
+    plaid_client.client = FakePlaidApi(FakePlaidConfig(accounts=10, transactions=10_000))
+"""
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from keyring.backend import KeyringBackend
+
+from mcp_server.storage.taxonomy import get_taxonomy
+
+# Vendors charging a fixed amount every month, so recurring detection has something to find
+_SUBSCRIPTIONS = (("Netflix", 15.49), ("Spotify", 10.99), ("iCloud", 2.99), ("Planet Fitness", 24.99))
+_MERCHANTS = (
+    "Amazon", "AMZN Mktp US", "Starbucks", "Uber", "Lyft", "Whole Foods", "Trader Joe's", "Shell", "Chevron",
+    "Target", "Walmart", "Costco", "Chipotle", "DoorDash", "Apple", "Home Depot", "CVS", "Delta", None,
+)
+_ACCOUNT_TYPES = (("depository", "checking"), ("credit", "credit card"), ("depository", "savings"), ("loan", "mortgage"))
+# Plaid caps /transactions/sync pages at 500 transactions
+_MAX_PAGE_SIZE = 500
+
+
+@dataclass(frozen=True)
+class FakePlaidConfig:
+    """
+    Size and behaviour of the fake backend.
+
+    Args:
+        accounts: Number of accounts across all Items
+        transactions: Number of posted transactions across all accounts
+        accounts_per_item: Accounts per Item, the last Item may have fewer
+        history_days: Days of history the transactions are spread over, ending today
+        latency: Mean latency of a call in seconds, jittered by +/-50%
+        rate_limit_rate: Probability that a call fails with RATE_LIMIT_EXCEEDED (HTTP 429)
+        seed: Seed of the generated data and of the injected latencies and errors
+    """
+    accounts: int = 10
+    transactions: int = 10_000
+    accounts_per_item: int = 5
+    history_days: int = 730
+    latency: float = 0.05
+    rate_limit_rate: float = 0.0
+    seed: int = 0
+
+    @property
+    def items(self) -> int:
+        return math.ceil(self.accounts / self.accounts_per_item)
+
+
+class FakeModel(dict):
+    """A plain dict with the attribute access and to_dict of plaid-python models."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: value.to_dict() if isinstance(value, FakeModel) else value for key, value in self.items()}
+
+
+class MemoryKeyring(KeyringBackend):
+    """Keyring backend that keeps passwords in memory, so access tokens never touch the system keyring."""
+    priority = 1
+
+    def __init__(self):
+        super().__init__()
+        self._passwords: dict[tuple[str, str], str] = {}
+
+    def get_password(self, service: str, username: str) -> str | None:
+        return self._passwords.get((service, username))
+
+    def set_password(self, service: str, username: str, password: str) -> None:
+        self._passwords[(service, username)] = password
+
+    def delete_password(self, service: str, username: str) -> None:
+        self._passwords.pop((service, username), None)
+
+
+class FakePlaidApi:
+    """
+    Synthetic PlaidApi. Transactions are generated up front as compact tuples and
+    only turned into response models page by page, as Plaid would deserialize them.
+    """
+
+    def __init__(self, config: FakePlaidConfig = FakePlaidConfig()):
+        self.config = config
+        self.calls: Counter[str] = Counter()
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(config.seed)
+        self._accounts: dict[str, list[FakeModel]] = {}
+        self._transactions: dict[str, list[tuple]] = {}
+        self._generate()
+
+    def connections(self) -> list[tuple[str, str, str]]:
+        """
+        Returns the (item id, name, access token) of every fake Item.
+        """
+        return [(item_id, f"Bank {index}", f"access-fake-{item_id}") for index, item_id in enumerate(self._accounts)]
+
+    def _generate(self) -> None:
+        rng = random.Random(self.config.seed)
+        detailed = [(primary, code) for code, primary in get_taxonomy().primary_by_detailed.items()]
+        today = date.today()
+
+        account_ids = []
+        for index in range(self.config.accounts):
+            item_id = f"item-{index // self.config.accounts_per_item}"
+            account_type, subtype = _ACCOUNT_TYPES[index % len(_ACCOUNT_TYPES)]
+            account_id = f"{item_id}-account-{index}"
+            self._accounts.setdefault(item_id, []).append(FakeModel(
+                account_id=account_id,
+                name=f"{subtype.title()} {index}",
+                mask=f"{index:04d}",
+                official_name=None,
+                type=account_type,
+                subtype=subtype,
+                balances=FakeModel(
+                    available=round(rng.uniform(0, 20_000), 2),
+                    current=round(rng.uniform(0, 20_000), 2),
+                    limit=10_000.0 if account_type == "credit" else None,
+                    iso_currency_code="USD",
+                ),
+            ))
+            self._transactions[item_id] = []
+            account_ids.append((item_id, account_id))
+
+        for index in range(self.config.transactions):
+            item_id, account_id = account_ids[index % len(account_ids)]
+            if index % 50 < len(_SUBSCRIPTIONS):
+                # A subscription charged on the same day every month
+                merchant, amount = _SUBSCRIPTIONS[index % 50]
+                months = (index // 50) % max(1, self.config.history_days // 30)
+                day = today - timedelta(days=30 * months + index % 50)
+                primary, code = "ENTERTAINMENT", "ENTERTAINMENT_TV_AND_MOVIES"
+            else:
+                merchant = rng.choice(_MERCHANTS)
+                amount = round(rng.lognormvariate(3, 1), 2) * (-1 if rng.random() < 0.05 else 1)
+                day = today - timedelta(days=rng.randrange(self.config.history_days))
+                primary, code = rng.choice(detailed)
+            self._transactions[item_id].append((
+                f"txn-{index}", account_id, amount, day.isoformat(), merchant, f"{merchant or 'POS DEBIT'} #{index % 997}",
+                primary, code,
+            ))
+
+    def _call(self, endpoint: str) -> None:
+        """Counts a call, waits out its latency and injects rate-limit errors."""
+        with self._lock:
+            self.calls[endpoint] += 1
+            latency = self.config.latency * self._random.uniform(0.5, 1.5)
+            limited = self._random.random() < self.config.rate_limit_rate
+            if limited:
+                self.rate_limited += 1
+        time.sleep(latency)
+        if limited:
+            import plaid
+
+            error = plaid.ApiException(status=429, reason="Too Many Requests")
+            error.body = json.dumps({
+                "error_type": "RATE_LIMIT_EXCEEDED",
+                "error_code": "TRANSACTIONS_SYNC_LIMIT",
+                "error_message": "rate limit exceeded for attempts to access this item",
+            })
+            error.headers = {}
+            raise error
+
+    def _item_id(self, access_token: str) -> str:
+        return access_token.removeprefix("access-fake-")
+
+    def accounts_get(self, request: Any, **kwargs) -> FakeModel:
+        self._call("accounts_get")
+        item_id = self._item_id(request.access_token)
+        return FakeModel(accounts=self._accounts[item_id], item=FakeModel(item_id=item_id))
+
+    def transactions_sync(self, request: Any, **kwargs) -> FakeModel:
+        self._call("transactions_sync")
+        item_id = self._item_id(request.access_token)
+        transactions = self._transactions[item_id]
+        # The cursor is the offset of the next transaction to send
+        offset = int(request.get("cursor") or 0)
+        count = min(request.get("count") or 100, _MAX_PAGE_SIZE)
+        page = transactions[offset:offset + count]
+        next_cursor = offset + len(page)
+        return FakeModel(
+            accounts=self._accounts[item_id],
+            added=[self._transaction(row) for row in page],
+            modified=[],
+            removed=[],
+            next_cursor=str(next_cursor),
+            has_more=next_cursor < len(transactions),
+        )
+
+    @staticmethod
+    def _transaction(row: tuple) -> FakeModel:
+        transaction_id, account_id, amount, day, merchant, name, primary, detailed = row
+        return FakeModel(
+            transaction_id=transaction_id,
+            account_id=account_id,
+            amount=amount,
+            date=day,
+            datetime=None,
+            authorized_date=day,
+            authorized_datetime=None,
+            name=name,
+            merchant_name=merchant,
+            pending=False,
+            iso_currency_code="USD",
+            personal_finance_category=FakeModel(primary=primary, detailed=detailed, confidence_level="HIGH"),
+            website=None,
+        )
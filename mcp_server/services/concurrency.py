@@ -0,0 +1,181 @@
+"""Concurrency helpers for fanning Plaid calls out across Items and accounts."""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Iterator
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import ParamSpec, TypeVar
+
+from mcp_server.services import metrics
+from mcp_server.services.tenants import TenantLocal, tenant_registry
+
+T = TypeVar("T")
+R = TypeVar("R")
+P = ParamSpec("P")
+
+# Calls of a single fan-out in flight at once
+MAX_WORKERS = 8
+# Threads shared by all fan-outs, so two tools can fan out fully at the same time
+FAN_OUT_THREADS = 2 * MAX_WORKERS
+PER_KEY_CONCURRENCY = 2
+PER_KEY_MIN_INTERVAL = 0.05
+# Tool calls served at once, each of which may fan out further
+MAX_TOOL_CALLS = 16
+
+# Shared by every fan-out, so its threads (and their SQLite connections) are reused across tool calls
+_fan_out_executor = ThreadPoolExecutor(max_workers=FAN_OUT_THREADS, thread_name_prefix="ttyf-fanout")
+_in_fan_out: ContextVar[bool] = ContextVar("ttyf_in_fan_out", default=False)
+
+
+class KeyedRateLimiter:
+    """
+    Bounds how hard a single key (e.g. a Plaid Item) can be hit.
+
+    Each key gets at most `max_concurrent` calls in flight, and successive call
+    starts for the same key are spaced at least `min_interval` seconds apart.
+    """
+
+    def __init__(self, max_concurrent: int = PER_KEY_CONCURRENCY, min_interval: float = PER_KEY_MIN_INTERVAL):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores: dict[Hashable, threading.BoundedSemaphore] = {}
+        self._next_start: dict[Hashable, float] = {}
+
+    def _semaphore(self, key: Hashable) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = self._semaphores[key] = threading.BoundedSemaphore(self.max_concurrent)
+            return semaphore
+
+    def _reserve_start(self, key: Hashable) -> float:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(key, now))
+            self._next_start[key] = start + self.min_interval
+            return start - now
+
+    @contextmanager
+    def limit(self, key: Hashable):
+        with self._semaphore(key):
+            delay = self._reserve_start(key)
+            if delay > 0:
+                time.sleep(delay)
+            yield
+
+
+# Shared across a tenant's tool calls so concurrent Plaid requests respect the same per-Item budget
+item_rate_limiter: TenantLocal[KeyedRateLimiter] = TenantLocal("item_rate_limiter", lambda tenant: KeyedRateLimiter())
+
+
+def fan_out_iter(
+    fn: Callable[[T], R],
+    args: Iterable[T],
+    max_workers: int = MAX_WORKERS,
+) -> Iterator[R]:
+    """
+    Runs `fn` over `args` on the shared fan-out pool.
+
+    Results are yielded in the order of `args` as soon as each one (and every
+    one before it) is ready, so callers can start consuming while later calls
+    are still in flight. The first exception raised by `fn` is re-raised.
+    Calls made from within a fan-out run inline, so nested fan-outs cannot
+    exhaust the pool and deadlock.
+
+    Plaid's per-Item budget is applied by the Plaid client around each request,
+    so calls answered from caches or the local stores are not slowed down.
+
+    Args:
+        fn: The blocking call to run for each argument
+        args: The arguments to fan out over
+        max_workers: Maximum number of calls of this fan-out in flight at once
+
+    Returns:
+        An iterator over the results, in input order
+    """
+    args = list(args)
+
+    def run(arg: T) -> R:
+        _in_fan_out.set(True)
+        return fn(arg)
+
+    if len(args) <= 1 or max_workers <= 1 or _in_fan_out.get():
+        for arg in args:
+            yield fn(arg)
+        return
+
+    remaining = iter(args)
+    pending: deque[Future[R]] = deque()
+
+    def submit_next() -> None:
+        for arg in remaining:
+            # Each call gets its own copy of the caller's context, e.g. the tool it is attributed to
+            pending.append(_fan_out_executor.submit(contextvars.copy_context().run, run, arg))
+            return
+
+    try:
+        for _ in range(min(max_workers, len(args))):
+            submit_next()
+        while pending:
+            result = pending.popleft().result()
+            submit_next()
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def fan_out(
+    fn: Callable[[T], R],
+    args: Iterable[T],
+    max_workers: int = MAX_WORKERS,
+) -> list[R]:
+    """
+    Runs `fn` over `args` concurrently and returns the results in input order.
+
+    See `fan_out_iter` for the arguments.
+    """
+    return list(fan_out_iter(fn, args, max_workers=max_workers))
+
+
+_tool_executor = ThreadPoolExecutor(max_workers=MAX_TOOL_CALLS, thread_name_prefix="ttyf-tool")
+
+
+def run_async(fn: Callable[P, R]) -> Callable[P, Awaitable[R]]:
+    """
+    Turns a blocking tool into a coroutine function that runs it on the tool executor.
+
+    The event loop stays free while the tool waits on Plaid or SQLite, so
+    concurrent tool calls are served side by side instead of one after another.
+    The wrapper keeps the tool's name, signature and docstring, so it registers
+    with FastMCP exactly like the tool itself, and the caller's context
+    variables are visible inside the tool. The tool runs as the tenant of the
+    request, see TenantRegistry.request_tenant. Calls are counted and timed per
+    tool when metrics are enabled.
+
+    Args:
+        fn: The blocking tool
+
+    Returns:
+        The async version of the tool
+    """
+    def instrumented(tenant: str, *args: P.args, **kwargs: P.kwargs) -> R:
+        with tenant_registry.use(tenant), metrics.tool_call(fn.__name__):
+            result = fn(*args, **kwargs)
+            metrics.record_response(result)
+            return result
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        # Resolved on the event loop, where the request's headers and access token are visible
+        tenant = tenant_registry.request_tenant()
+        call = functools.partial(contextvars.copy_context().run, instrumented, tenant, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(_tool_executor, call)
+
+    return wrapper
@@ -0,0 +1,184 @@
+"""Per-Item health with a circuit breaker, so one broken connection neither fails nor slows down every tool."""
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import TypeVar
+
+from mcp_server.services.plaid.client import last_call_coalesced, plaid_error
+from mcp_server.services.tenants import TenantLocal
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Errors only the user can fix, by re-linking the connection in the ttyf CLI
+ACTION_REQUIRED_ERRORS = frozenset({
+    "ITEM_LOGIN_REQUIRED", "INVALID_CREDENTIALS", "INVALID_MFA", "ITEM_LOCKED", "INVALID_ACCESS_TOKEN",
+    "ITEM_NOT_FOUND", "ACCESS_NOT_GRANTED", "USER_PERMISSION_REVOKED", "NO_ACCOUNTS", "ITEM_NOT_SUPPORTED",
+})
+# Delay before a broken Item is probed again, doubled on every further failure
+HEALTH_BASE_BACKOFF_SECONDS = 30.0
+# Same, for Items that need the user to re-link them
+ACTION_REQUIRED_BACKOFF_SECONDS = 300.0
+HEALTH_MAX_BACKOFF_SECONDS = 3600.0
+
+
+def describe_error(error: Exception) -> str:
+    """A one-line description of a failed Plaid request, e.g. "ApiException: ITEM_LOGIN_REQUIRED"."""
+    if hasattr(error, "body"):
+        details = plaid_error(error)
+        if details.get("error_code"):
+            return f"{type(error).__name__}: {details['error_code']}"
+    return f"{type(error).__name__}: {error}".splitlines()[0]
+
+
+def is_item_error(error: BaseException) -> bool:
+    """Whether an error is the Item's or Plaid's (API errors, timeouts, network failures) rather than a bug."""
+    import plaid
+    import urllib3
+
+    return isinstance(error, (ItemUnavailableError, plaid.ApiException, urllib3.exceptions.HTTPError))
+
+
+@dataclass(slots=True)
+class ItemHealth:
+    item_id: str
+    name: str
+    failures: int = 0
+    error_code: str | None = None
+    error_message: str | None = None
+    requires_action: bool = False
+    failing_since: float | None = None
+    last_success_at: float | None = None
+    next_probe_at: float = 0.0
+    probing: bool = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.failures == 0
+
+
+class ItemUnavailableError(Exception):
+    """Raised instead of calling Plaid for an Item whose circuit is open."""
+
+    def __init__(self, health: ItemHealth):
+        self.health = health
+        retry_in = max(0, round(health.next_probe_at - time.time()))
+        super().__init__(f"{health.name} is unavailable ({health.error_code or health.error_message}), retrying in {retry_in}s")
+
+
+class ItemHealthRegistry:
+    """
+    Tracks the outcome of every Item's Plaid requests, as a circuit breaker per Item.
+
+    A failed request opens the Item's circuit: further requests fail fast with
+    ItemUnavailableError instead of reaching Plaid, so tools can skip the Item
+    and answer from what is stored. Once the backoff has passed, a single
+    request is let through as a probe while the others keep failing fast; its
+    success closes the circuit, its failure doubles the backoff. Items that need
+    the user to re-link them are probed less often.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: dict[str, ItemHealth] = {}
+
+    @contextmanager
+    def guard(self, item_id: str, name: str) -> Iterator[None]:
+        """
+        Wraps an Item's Plaid requests, recording their outcome.
+
+        Raises:
+            ItemUnavailableError: If the Item's circuit is open and it is not its turn to be probed
+        """
+        now = time.time()
+        with self._lock:
+            health = self._items.get(item_id)
+            if health is None:
+                health = self._items[item_id] = ItemHealth(item_id=item_id, name=name)
+            health.name = name
+            probe = False
+            if not health.healthy:
+                if health.probing or now < health.next_probe_at:
+                    raise ItemUnavailableError(replace(health))
+                health.probing = probe = True
+
+        try:
+            yield
+        except Exception as error:
+            # An error shared by coalesced calls is recorded once, by the call that sent the request
+            if is_item_error(error) and not isinstance(error, ItemUnavailableError) and not last_call_coalesced():
+                self._record_failure(health, error)
+            raise
+        else:
+            self._record_success(health)
+        finally:
+            if probe:
+                with self._lock:
+                    health.probing = False
+
+    def _record_success(self, health: ItemHealth) -> None:
+        with self._lock:
+            health.failures = 0
+            health.error_code = health.error_message = None
+            health.requires_action = False
+            health.failing_since = None
+            health.last_success_at = time.time()
+
+    def _record_failure(self, health: ItemHealth, error: Exception) -> None:
+        error_code = plaid_error(error).get("error_code") if hasattr(error, "body") else None
+        requires_action = error_code in ACTION_REQUIRED_ERRORS
+        now = time.time()
+        with self._lock:
+            health.failures += 1
+            health.error_code = error_code
+            health.error_message = describe_error(error)
+            health.requires_action = requires_action
+            health.failing_since = health.failing_since or now
+            base = ACTION_REQUIRED_BACKOFF_SECONDS if requires_action else HEALTH_BASE_BACKOFF_SECONDS
+            health.next_probe_at = now + min(base * 2 ** (health.failures - 1), HEALTH_MAX_BACKOFF_SECONDS)
+
+    def get(self, item_id: str) -> ItemHealth | None:
+        """
+        Returns a copy of an Item's health, or None if it was never requested.
+        """
+        with self._lock:
+            health = self._items.get(item_id)
+            return replace(health) if health is not None else None
+
+    def degraded(self) -> list[ItemHealth]:
+        """
+        Returns a copy of the health of every Item whose last request failed.
+        """
+        with self._lock:
+            return [replace(health) for health in self._items.values() if not health.healthy]
+
+    def reset(self, item_id: str | None = None) -> None:
+        """
+        Closes an Item's circuit, or every circuit, e.g. after the user re-linked a connection.
+        """
+        with self._lock:
+            if item_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(item_id, None)
+
+
+def skip_failed_items(fn: Callable[[T], R]) -> Callable[[T], R | None]:
+    """
+    Wraps a per-Item call so that Item errors yield None instead of raising, for partial results.
+    """
+    def call(arg: T) -> R | None:
+        try:
+            return fn(arg)
+        except Exception as error:
+            if not is_item_error(error):
+                raise
+            return None
+
+    return call
+
+
+# Global instance that can be imported anywhere, one per tenant
+item_health: TenantLocal[ItemHealthRegistry] = TenantLocal("item_health", lambda tenant: ItemHealthRegistry())
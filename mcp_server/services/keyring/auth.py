@@ -1,71 +1,167 @@
-import keyring
+from collections.abc import Iterable
+from contextlib import closing
+from typing import Any
 
+from mcp_server.services import metrics
 from mcp_server.services.keyring.exceptions import PasswordNotFoundError
+from mcp_server.services.tenants import DEFAULT_TENANT, current_tenant
+
+
+def _read_secret_service(backend: Any, service: str, usernames: list[str]) -> dict[str, str]:
+    """
+    Reads the passwords of several usernames of a service from a Secret Service keyring in one search.
+
+    keyring's own get_password opens a D-Bus connection and searches the
+    collection once per password. Returns an empty dict when the active backend
+    is not a Secret Service keyring or the batched read fails.
+    """
+    from keyring.backends import SecretService
+
+    # The chainer backend reads from its backends in order, so only the first one can answer
+    backends = getattr(backend, "backends", None) or [backend]
+    secret_service = backends[0]
+    if not isinstance(secret_service, SecretService.Keyring):
+        return {}
+
+    scheme = secret_service.schemes[secret_service.scheme]
+    wanted = set(usernames)
+    passwords: dict[str, str] = {}
+    try:
+        collection = secret_service.get_preferred_collection()
+        with closing(collection.connection):
+            for item in collection.search_items({scheme["service"]: service}):
+                username = item.get_attributes().get(scheme["username"])
+                if username in wanted and username not in passwords:
+                    secret_service.unlock(item)
+                    passwords[username] = item.get_secret().decode("utf-8")
+    except Exception:
+        return {}
+    return passwords
 
 
 class AuthHandler:
-    """Handler for secure storage and retrieval of authentication tokens."""
+    """
+    Handler for secure storage and retrieval of authentication tokens.
+
+    keyring is imported on first use, since loading its backends is slow and
+    most server startups never touch it before the first tool call. Tokens are
+    stored under the current tenant's keyring service unless one is given.
+    """
     
     KEYRING_SERVICE = "ttyf_plaid"
+
+    @classmethod
+    def tenant_service(cls, tenant: str) -> str:
+        """
+        Get a tenant's keyring service: KEYRING_SERVICE for the default tenant, e.g. `ttyf_plaid:alice` otherwise.
+        """
+        return cls.KEYRING_SERVICE if tenant == DEFAULT_TENANT else f"{cls.KEYRING_SERVICE}:{tenant}"
+
+    @classmethod
+    def _service(cls, service: str | None) -> str:
+        return service or cls.tenant_service(current_tenant())
     
     @classmethod
-    def save_access_token(cls, item_id: str, access_token: str) -> None:
+    def save_access_token(cls, item_id: str, access_token: str, service: str | None = None) -> None:
         """
         Save a Plaid access token securely.
         
         Args:
             item_id: The Plaid item ID to use as the key
             access_token: The Plaid access token to store
+            service: The keyring service to store under, the current tenant's by default
         """
-        keyring.set_password(cls.KEYRING_SERVICE, item_id, access_token)
+        import keyring
+
+        keyring.set_password(cls._service(service), item_id, access_token)
     
     @classmethod
-    def get_access_token(cls, item_id: str) -> str | None:
+    def get_access_token(cls, item_id: str, service: str | None = None) -> str | None:
         """
         Get a Plaid access token from secure storage.
         
         Args:
             item_id: The Plaid item ID
+            service: The keyring service to read from, the current tenant's by default
             
         Returns:
             The access token if found, None otherwise
         """
-        return keyring.get_password(cls.KEYRING_SERVICE, item_id)
+        import keyring
+
+        with metrics.span("keyring.read"):
+            return keyring.get_password(cls._service(service), item_id)
     
     @classmethod
-    def delete_access_token(cls, item_id: str) -> None:
+    def get_access_tokens(cls, item_ids: Iterable[str], service: str | None = None) -> dict[str, str | None]:
+        """
+        Get the Plaid access tokens of several Items from secure storage at once.
+
+        On Secret Service keyrings (most Linux desktops) all tokens are read in
+        a single search over one connection. Other backends, and tokens the
+        batched read did not find, are read one by one.
+
+        Args:
+            item_ids: The Plaid item IDs
+            service: The keyring service to read from, the current tenant's by default
+
+        Returns:
+            The access token of each Item, None for Items without one
+        """
+        import keyring
+
+        service = cls._service(service)
+        item_ids = list(item_ids)
+        with metrics.span("keyring.read_batch", items=len(item_ids)):
+            tokens: dict[str, str | None] = _read_secret_service(keyring.get_keyring(), service, item_ids)
+            for item_id in item_ids:
+                if item_id not in tokens:
+                    tokens[item_id] = keyring.get_password(service, item_id)
+        return {item_id: tokens[item_id] for item_id in item_ids}
+
+    @classmethod
+    def delete_access_token(cls, item_id: str, service: str | None = None) -> None:
         """
         Delete a Plaid access token from secure storage.
         Can raise PasswordNotFoundError if the password is not found in the keyring.
         Args:
             item_id: The Plaid item ID
+            service: The keyring service to delete from, the current tenant's by default
         """
+        import keyring
+
         try:
-            keyring.delete_password(cls.KEYRING_SERVICE, item_id)
+            keyring.delete_password(cls._service(service), item_id)
         except Exception:
             # Token might not exist, which is fine
             raise PasswordNotFoundError(f"Password for {item_id} not found in keyring.")
     
     @classmethod
-    def set_link_token(cls, email: str, link_token: str) -> None:
+    def set_link_token(cls, email: str, link_token: str, service: str | None = None) -> None:
         """
         Save a Plaid link token securely.
         
         Args:
             email: The email address to use as the key
             link_token: The Plaid link token to store
+            service: The keyring service to store under, the current tenant's by default
         """
-        keyring.set_password(cls.KEYRING_SERVICE, email, link_token)
+        import keyring
+
+        keyring.set_password(cls._service(service), email, link_token)
     
     @classmethod
-    def get_link_token(cls, email: str) -> str | None:
+    def get_link_token(cls, email: str, service: str | None = None) -> str | None:
         """
         Get a Plaid link token from secure storage.
         
         Args:
             email: The email address to use as the key
+            service: The keyring service to read from, the current tenant's by default
             
         Returns:
             The link token if found, None otherwise
         """
-        return keyring.get_password(cls.KEYRING_SERVICE, email)
\ No newline at end of file
+        import keyring
+
+        return keyring.get_password(cls._service(service), email)
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""
+Timing spans and per-tool counters for the server's hot paths.
+
+Metrics are off unless enabled with METRICS_ENABLED=1. While off, `span`
+returns a shared no-op context manager and `count` returns immediately, so
+instrumented code pays one function call and one flag check. Response sizes
+take a second serialization of every tool result, so they are only counted
+with METRICS_RESPONSE_BYTES=1 as well.
+
+Spans and counters are attributed to the tool call they run under. The tool
+is tracked in a context variable, which is carried into the tool executor
+and fan-out threads; work outside any tool call, e.g. background refreshes,
+is attributed to "(background)".
+"""
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, TypeVar, get_args
+
+if TYPE_CHECKING:
+    from mcp_server.utils import MetricsVars
+
+T = TypeVar("T")
+
+BACKGROUND = "(background)"
+# Shortest time between two Prometheus dumps, so busy servers do not rewrite the file on every call
+PROMETHEUS_DUMP_INTERVAL_SECONDS = 10.0
+
+
+@dataclass(slots=True)
+class ToolMetrics:
+    calls: int = 0
+    errors: int = 0
+    api_calls: int = 0
+    rows: int = 0
+    bytes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class SpanMetrics:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+Counter = Literal["api_calls", "rows", "bytes", "cache_hits", "cache_misses"]
+
+_enabled = False
+_response_bytes = False
+_logger: Any = None
+_prometheus_file: Path | None = None
+_last_dump = 0.0
+_current_tool: ContextVar[str] = ContextVar("ttyf_current_tool", default=BACKGROUND)
+_lock = threading.Lock()
+_tools: dict[str, ToolMetrics] = {}
+_spans: dict[tuple[str, str], SpanMetrics] = {}
+_NOOP = contextlib.nullcontext()
+
+
+def configure(settings: "MetricsVars") -> None:
+    """
+    Turns metrics on or off, see get_metrics_vars.
+    """
+    global _enabled, _response_bytes, _logger, _prometheus_file
+    _prometheus_file = settings.prometheus_file
+    _response_bytes = settings.response_bytes
+    _logger = None
+    if settings.enabled and settings.log_spans:
+        import structlog
+
+        # Spans go to stderr, since stdout carries the MCP stdio transport
+        _logger = structlog.wrap_logger(
+            structlog.PrintLogger(sys.stderr),
+            processors=[structlog.processors.TimeStamper(fmt="iso"), structlog.processors.JSONRenderer()],
+        )
+    _enabled = settings.enabled
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class _Span:
+    __slots__ = ("name", "fields", "started")
+
+    def __init__(self, name: str, fields: dict[str, Any]):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback) -> None:
+        elapsed = time.perf_counter() - self.started
+        tool = _current_tool.get()
+        with _lock:
+            metrics = _spans.get((tool, self.name))
+            if metrics is None:
+                metrics = _spans[(tool, self.name)] = SpanMetrics()
+            metrics.count += 1
+            metrics.seconds += elapsed
+            metrics.max_seconds = max(metrics.max_seconds, elapsed)
+        if _logger is not None:
+            _logger.info(
+                "span", span=self.name, tool=tool, duration_ms=round(elapsed * 1000, 3),
+                error=error_type.__name__ if error_type else None, **self.fields,
+            )
+
+
+def span(name: str, **fields: Any) -> contextlib.AbstractContextManager:
+    """
+    Times a block of work, e.g. `with span("plaid.accounts_get"): ...`.
+
+    Args:
+        name: The span name, dotted by area: keyring, plaid, parse, aggregate or serialize
+        fields: Extra fields logged with the span when span logging is on
+    """
+    if not _enabled:
+        return _NOOP
+    return _Span(name, fields)
+
+
+def count(counter: Counter, amount: int = 1) -> None:
+    """
+    Adds to a counter of the current tool: api_calls, rows, bytes, cache_hits or cache_misses.
+    """
+    if not _enabled:
+        return
+    tool = _current_tool.get()
+    with _lock:
+        metrics = _tools.get(tool)
+        if metrics is None:
+            metrics = _tools[tool] = ToolMetrics()
+        setattr(metrics, counter, getattr(metrics, counter) + amount)
+
+
+def counted(items: Iterable[T], counter: Counter = "rows") -> Iterable[T]:
+    """
+    Counts the items of a stream as they are consumed, or returns the stream as-is while metrics are off.
+    """
+    if not _enabled:
+        return items
+    return _counted(items, counter)
+
+
+def _counted(items: Iterable[T], counter: Counter) -> Iterator[T]:
+    consumed = 0
+    try:
+        for item in items:
+            consumed += 1
+            yield item
+    finally:
+        count(counter, consumed)
+
+
+@contextlib.contextmanager
+def tool_call(name: str) -> Iterator[None]:
+    """
+    Attributes everything within the block to the tool `name`, and counts its calls, errors and time.
+    """
+    if not _enabled:
+        yield
+        return
+
+    token = _current_tool.set(name)
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        _current_tool.reset(token)
+        with _lock:
+            metrics = _tools.get(name)
+            if metrics is None:
+                metrics = _tools[name] = ToolMetrics()
+            metrics.calls += 1
+            metrics.errors += failed
+            metrics.seconds += elapsed
+            metrics.max_seconds = max(metrics.max_seconds, elapsed)
+        _maybe_dump()
+
+
+def record_response(result: Any) -> None:
+    """
+    Counts the serialized size of a tool's response, timing the serialization.
+
+    Does nothing unless response sizes are counted, see get_metrics_vars.
+    """
+    if not (_enabled and _response_bytes):
+        return
+    import pydantic_core
+
+    with span("serialize"):
+        size = len(pydantic_core.to_json(result))
+    count("bytes", size)
+
+
+def snapshot() -> dict[str, Any]:
+    """
+    Returns every tool's counters and span timings, as plain JSON-serializable data.
+    """
+    with _lock:
+        tools = {name: asdict(metrics) for name, metrics in _tools.items()}
+        for (tool, name), metrics in _spans.items():
+            tools.setdefault(tool, asdict(ToolMetrics())).setdefault("spans", {})[name] = asdict(metrics)
+    return {"enabled": _enabled, "tools": tools}
+
+
+def reset() -> None:
+    """
+    Clears every counter and span timing.
+    """
+    with _lock:
+        _tools.clear()
+        _spans.clear()
+
+
+def prometheus_text() -> str:
+    """
+    Renders the counters and span timings in the Prometheus text exposition format.
+    """
+    lines = []
+    with _lock:
+        tools = {name: asdict(metrics) for name, metrics in _tools.items()}
+        spans = {key: asdict(metrics) for key, metrics in _spans.items()}
+
+    for field in ("calls", "errors", *get_args(Counter), "seconds"):
+        metric = f"ttyf_tool_{field}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(f'{metric}{{tool="{tool}"}} {values[field]}' for tool, values in sorted(tools.items()))
+    for field, metric in (("count", "ttyf_span_count_total"), ("seconds", "ttyf_span_seconds_total")):
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(
+            f'{metric}{{tool="{tool}",span="{name}"}} {values[field]}' for (tool, name), values in sorted(spans.items())
+        )
+    return "\n".join(lines) + "\n"
+
+
+def dump_prometheus(path: Path | None = None) -> None:
+    """
+    Writes the Prometheus text to `path`, or to METRICS_PROMETHEUS_FILE, replacing the file atomically.
+    """
+    path = path or _prometheus_file
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{os.getpid()}")
+    partial.write_text(prometheus_text())
+    partial.replace(path)
+
+
+def _maybe_dump() -> None:
+    global _last_dump
+    if _prometheus_file is None:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_dump < PROMETHEUS_DUMP_INTERVAL_SECONDS:
+            return
+        _last_dump = now
+    dump_prometheus()
@@ -1,12 +1,134 @@
-import plaid
-from plaid.configuration import Configuration
-from plaid.api import plaid_api
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import AbstractContextManager, nullcontext
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+from mcp_server.services import metrics
+from mcp_server.services.concurrency import item_rate_limiter
+from mcp_server.services.tenants import TenantLocal, tenant_registry
+from mcp_server.utils import PlaidHttpVars, get_plaid_http_vars, get_plaid_vars
+
+if TYPE_CHECKING:
+    import plaid
+
+# Upper bound of a single backoff delay, before jitter
+_MAX_BACKOFF_SECONDS = 8.0
+
+
+def plaid_error(error: "plaid.ApiException") -> dict[str, Any]:
+    """
+    Returns the parsed Plaid error body of a failed request, or an empty dict.
+    """
+    try:
+        body = json.loads(error.body)
+    except (TypeError, ValueError):
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _is_retryable(error: Exception) -> bool:
+    import plaid
+    import urllib3
+
+    if isinstance(error, urllib3.exceptions.HTTPError):
+        # Timeouts, refused or reset connections
+        return True
+    if not isinstance(error, plaid.ApiException):
+        return False
+    status = error.status or 0
+    return status == 429 or status >= 500 or plaid_error(error).get("error_type") == "RATE_LIMIT_EXCEEDED"
+
+
+def _flight_key(endpoint: str, request: Any) -> str:
+    """Identifies a request by its endpoint and arguments, access token included, without keeping the token around."""
+    payload = request.to_dict() if hasattr(request, "to_dict") else request
+    arguments = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{endpoint}:{arguments}".encode()).hexdigest()
+
+
+def _item_limit(request: Any) -> AbstractContextManager:
+    """The per-Item rate limit of a request, keyed by its access token; requests without one are not limited."""
+    access_token = request.get("access_token") if hasattr(request, "get") else None
+    return item_rate_limiter.limit(access_token) if access_token else nullcontext()
+
+
+# Plaid requests in flight per tenant, see TENANT_MAX_PLAID_CALLS
+_tenant_plaid_calls: TenantLocal[threading.BoundedSemaphore] = TenantLocal(
+    "plaid_calls", lambda tenant: threading.BoundedSemaphore(tenant_registry.max_plaid_calls)
+)
+
+# Whether the last call made in a context was answered by an identical call already in flight
+_coalesced: ContextVar[bool] = ContextVar("ttyf_plaid_coalesced", default=False)
+
+
+def last_call_coalesced() -> bool:
+    """
+    Returns whether the last `call` made in the current context shared the response or error
+    of an identical call already in flight, instead of sending its own request.
+    """
+    return _coalesced.get()
 
-from mcp_server.utils import get_plaid_vars
 
 class PlaidServiceClient:
+    """
+    Plaid API client with kept-alive connections, retries and request coalescing.
+
+    plaid-python is blocking, so requests run on the calling thread. At most
+    as many requests as the HTTP pool has connections are in flight at once,
+    so every request has a kept-alive connection (and its TLS session) to reuse
+    instead of opening and discarding one. Requests have a connect and read
+    timeout, and rate-limited, 5xx and network-failed requests are retried with
+    jittered exponential backoff. Every attempt is subject to the Item's
+    budget in item_rate_limiter, keyed by the request's access token.
+
+    Identical concurrent requests (same endpoint, access token and arguments)
+    are coalesced: the first one is sent, and the others wait for and share its
+    response or error instead of sending duplicates. Each tenant may have at
+    most TENANT_MAX_PLAID_CALLS requests in flight, so one tenant's fan-out
+    cannot take the whole pool.
+
+    Settings, credentials and the plaid-python client (whose import alone
+    takes a noticeable share of startup) are loaded on the first request.
+    """
     def __init__(self):
+        self._setup_lock = threading.Lock()
+        self._ready = False
+        self._client: Any = None
+        self._flights_lock = threading.Lock()
+        self._flights: dict[str, Future] = {}
+
+    @property
+    def client(self) -> "plaid.api.plaid_api.PlaidApi":
+        self._ensure_setup()
+        return self._client
+
+    @client.setter
+    def client(self, client: Any) -> None:
+        """Replaces the underlying PlaidApi, e.g. with a fake backend."""
+        self._client = client
+
+    def _ensure_setup(self) -> None:
+        if self._ready:
+            return
+        with self._setup_lock:
+            if not self._ready:
+                self._setup()
+                self._ready = True
+
+    def _setup(self) -> None:
+        import plaid
+        from plaid.api import plaid_api
+        from plaid.configuration import Configuration
+        from urllib3.connection import HTTPConnection
+
         client_id, secret, env = get_plaid_vars()
+        self.http: PlaidHttpVars = get_plaid_http_vars()
 
         self.client_id = client_id
         self.secret = secret
@@ -21,11 +143,93 @@ class PlaidServiceClient:
                 'secret': self.secret,
             }
         )
-        self.client = plaid_api.PlaidApi(plaid.ApiClient(self.configuration))
-            
+        self.configuration.connection_pool_maxsize = self.http.pool_size
+        self.configuration.socket_options = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        # Retries are handled by `call`, which also covers rate limits and 5xx responses
+        self.configuration.retries = 0
+        if self._client is None:
+            self._client = plaid_api.PlaidApi(plaid.ApiClient(self.configuration))
+        self._connections = threading.BoundedSemaphore(self.http.pool_size)
+
+    def _request(self, endpoint: str, request: Any) -> Any:
+        # Waits for a pooled connection rather than opening one the pool would discard
+        with self._connections:
+            return getattr(self.client, endpoint)(
+                request,
+                _request_timeout=(self.http.connect_timeout, self.http.read_timeout),
+            )
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        headers = getattr(error, "headers", None) or {}
+        try:
+            # Plaid's Retry-After, when given, is the earliest useful retry
+            floor = float(headers.get("Retry-After", 0))
+        except (TypeError, ValueError):
+            floor = 0.0
+        ceiling = min(_MAX_BACKOFF_SECONDS, self.http.retry_backoff * 2 ** attempt)
+        return max(floor, random.uniform(0, ceiling))
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        """Returns the in-flight call for a key, and whether the caller has to make it."""
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Future()
+            return flight, True
+
+    def _land(self, key: str, flight: Future, result: Any = None, error: BaseException | None = None) -> None:
+        with self._flights_lock:
+            del self._flights[key]
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+    def _send(self, endpoint: str, request: Any) -> Any:
+        self._ensure_setup()
+        for attempt in range(self.http.max_retries + 1):
+            metrics.count("api_calls")
+            try:
+                with _item_limit(request), metrics.span(f"plaid.{endpoint}", attempt=attempt):
+                    return self._request(endpoint, request)
+            except Exception as error:
+                if attempt == self.http.max_retries or not _is_retryable(error):
+                    raise
+                time.sleep(self._backoff(attempt, error))
+
+    def call(self, endpoint: str, request: Any) -> Any:
+        """
+        Sends a request to a Plaid endpoint and blocks until the response arrives.
+
+        The response may be shared with identical concurrent calls, so it must not be mutated.
+
+        Args:
+            endpoint: Name of the PlaidApi method, e.g. "accounts_get"
+            request: The request model for the endpoint
+
+        Returns:
+            The endpoint's response model
+        """
+        key = _flight_key(endpoint, request)
+        flight, leader = self._join(key)
+        _coalesced.set(not leader)
+        if not leader:
+            return flight.result()
+        try:
+            with _tenant_plaid_calls.resolve():
+                result = self._send(endpoint, request)
+        except BaseException as error:
+            self._land(key, flight, error=error)
+            raise
+        self._land(key, flight, result=result)
+        return result
+
 
 def get_plaid_client() -> PlaidServiceClient:
     return PlaidServiceClient()
 
 
-plaid_client = get_plaid_client()
\ No newline at end of file
+plaid_client = get_plaid_client()
@@ -0,0 +1,113 @@
+import time
+
+from mcp_server.services import metrics
+from mcp_server.services.concurrency import fan_out
+from mcp_server.services.health import item_health, skip_failed_items
+from mcp_server.services.plaid.client import plaid_client, plaid_error
+from mcp_server.storage.item import item_storage
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.tools.schemas.util import PlaidConnection
+
+# Plaid's maximum `count` for /transactions/sync
+SYNC_PAGE_SIZE = 500
+# History requested the first time an Item is synced (Plaid's maximum)
+SYNC_DAYS_REQUESTED = 730
+# Items synced more recently than this are answered from the store as-is
+SYNC_MIN_INTERVAL_SECONDS = 60
+_MAX_PAGINATION_RESTARTS = 3
+
+_sync_min_interval = SYNC_MIN_INTERVAL_SECONDS
+
+
+def set_sync_min_interval(seconds: float | None) -> None:
+    """
+    Overrides how recently an Item must have been synced to be answered from the
+    store as-is, e.g. while a background refresh keeps every Item current.
+
+    Args:
+        seconds: The new interval, or None to restore SYNC_MIN_INTERVAL_SECONDS
+    """
+    global _sync_min_interval
+    _sync_min_interval = SYNC_MIN_INTERVAL_SECONDS if seconds is None else seconds
+
+
+def sync_transactions(connection: PlaidConnection, force: bool = False) -> None:
+    """
+    Pulls the transaction deltas of one Item into the local transaction store.
+
+    Pages through /transactions/sync from the stored cursor until `has_more` is
+    false and applies the whole delta at once. If Plaid reports that the data
+    changed mid-pagination, the pagination is restarted from the stored cursor.
+    The Item's account metadata from the last page is stored alongside.
+    Requests go through the Item's circuit breaker, see ItemHealthRegistry.
+
+    Args:
+        connection: The Item to sync
+        force: Sync even if the Item was synced within the minimum interval (SYNC_MIN_INTERVAL_SECONDS by default)
+
+    Raises:
+        ItemUnavailableError: If the Item's last sync failed and it is not yet due for a retry
+    """
+    start_cursor, synced_at = transaction_store.get_cursor(connection.item_id)
+    if not force and synced_at is not None and time.time() - synced_at < _sync_min_interval:
+        return
+
+    with item_health.guard(connection.item_id, connection.name):
+        _sync_pages(connection, start_cursor)
+
+
+def _sync_pages(connection: PlaidConnection, start_cursor: str | None) -> None:
+    from plaid import ApiException
+    from plaid.model.transactions_sync_request import TransactionsSyncRequest
+    from plaid.model.transactions_sync_request_options import TransactionsSyncRequestOptions
+
+    for attempt in range(_MAX_PAGINATION_RESTARTS + 1):
+        cursor = start_cursor
+        added, modified, removed = [], [], []
+        try:
+            while True:
+                request = TransactionsSyncRequest(access_token=connection.access_token, count=SYNC_PAGE_SIZE)
+                if cursor:
+                    request.cursor = cursor
+                else:
+                    request.options = TransactionsSyncRequestOptions(days_requested=SYNC_DAYS_REQUESTED)
+
+                response = plaid_client.call("transactions_sync", request)
+                accounts = response.accounts
+                with metrics.span("parse.transactions_sync"):
+                    added.extend(transaction.to_dict() for transaction in response.added)
+                    modified.extend(transaction.to_dict() for transaction in response.modified)
+                    removed.extend(transaction.transaction_id for transaction in response.removed)
+                cursor = response.next_cursor
+                if not response.has_more:
+                    break
+        except ApiException as error:
+            if plaid_error(error).get("error_code") != "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION" or attempt == _MAX_PAGINATION_RESTARTS:
+                raise
+            continue
+
+        transaction_store.apply_sync(
+            connection.item_id,
+            added,
+            modified,
+            removed,
+            cursor,
+            accounts=[account.to_dict() for account in accounts],
+        )
+        return
+
+
+def sync_all_transactions(force: bool = False) -> None:
+    """
+    Syncs the transactions of every stored Item concurrently.
+
+    Items that fail to sync are skipped, and keep their stored transactions, so
+    one broken connection does not fail every transaction tool.
+
+    Args:
+        force: Sync even Items that were synced very recently
+    """
+    fan_out(
+        skip_failed_items(lambda connection: sync_transactions(connection, force=force)),
+        list(item_storage.get_items().values()),
+    )
@@ -0,0 +1,157 @@
+"""Background refresh of every Item's balances and transactions."""
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+
+from mcp_server.services.concurrency import fan_out
+from mcp_server.services.health import describe_error
+from mcp_server.services.plaid.sync import set_sync_min_interval, sync_transactions
+from mcp_server.services.tenants import current_tenant, tenant_registry
+from mcp_server.storage.item import item_storage
+from mcp_server.tools.get_accounts import refresh_item
+from mcp_server.tools.schemas.util import PlaidConnection
+from mcp_server.utils import RefreshVars, get_refresh_vars
+
+# Refresh times are spread by up to this fraction of the interval, so Items are not all refreshed at once
+REFRESH_JITTER = 0.1
+# Delay before the first retry of a failed refresh, doubled on every further failure
+REFRESH_BASE_BACKOFF_SECONDS = 30.0
+# Upper bound of the delay before an Item's first refresh after startup
+_STARTUP_SPREAD_SECONDS = 5.0
+# Longest the scheduler sleeps, so new connections are picked up
+_MAX_IDLE_SECONDS = 60.0
+
+
+@dataclass(slots=True)
+class ItemRefreshState:
+    tenant: str
+    item_id: str
+    name: str
+    next_run_at: float
+    last_success_at: float | None = None
+    last_error: str | None = None
+    failures: int = 0
+
+
+def _jittered(seconds: float) -> float:
+    return seconds * random.uniform(1 - REFRESH_JITTER, 1 + REFRESH_JITTER)
+
+
+class RefreshScheduler:
+    """
+    Keeps every resident tenant's Items' balances and transactions warm on a daemon thread.
+
+    Each Item is refreshed every interval (balances into the account cache and
+    the balance snapshots, transactions into the transaction store), at jittered
+    times. A failed refresh is retried with jittered exponential backoff, and
+    the outcome of every Item's last refresh is kept for freshness reports.
+    While the scheduler runs, tools answer transaction queries from the store
+    unless an Item's last sync is older than an interval and a half. Tenants
+    evicted for being idle are no longer refreshed, until their next tool call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: dict[tuple[str, str], ItemRefreshState] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.settings: RefreshVars = get_refresh_vars()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Starts the refresh thread, unless disabled with BACKGROUND_REFRESH=0 or already running.
+        """
+        self.settings = get_refresh_vars()
+        if not self.settings.enabled or self.running:
+            return
+        set_sync_min_interval(self.settings.interval_seconds * 1.5)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ttyf-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stops the refresh thread, waiting up to `timeout` seconds for in-flight refreshes.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        set_sync_min_interval(None)
+
+    def states(self) -> list[ItemRefreshState]:
+        """
+        Returns a copy of the refresh state of every known Item of the current tenant.
+        """
+        tenant = current_tenant()
+        with self._lock:
+            return [replace(state) for state in self._states.values() if state.tenant == tenant]
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            resident = tenant_registry.resident()
+            for tenant in resident:
+                # Background work, which must not keep an idle tenant from being evicted
+                with tenant_registry.use(tenant, touch=False):
+                    due = self._due_connections()
+                    if due:
+                        fan_out(self._refresh, due)
+            with self._lock:
+                self._states = {key: state for key, state in self._states.items() if state.tenant in resident}
+            self._stop.wait(self._seconds_until_next_run())
+
+    def _due_connections(self) -> list[PlaidConnection]:
+        try:
+            connections = list(item_storage.get_items().values())
+        except Exception:
+            # No connections file or keyring yet, try again later
+            return []
+
+        tenant = current_tenant()
+        now = time.time()
+        with self._lock:
+            for connection in connections:
+                if (tenant, connection.item_id) not in self._states:
+                    self._states[(tenant, connection.item_id)] = ItemRefreshState(
+                        tenant=tenant,
+                        item_id=connection.item_id,
+                        name=connection.name,
+                        next_run_at=now + random.uniform(0, _STARTUP_SPREAD_SECONDS),
+                    )
+            return [connection for connection in connections if self._states[(tenant, connection.item_id)].next_run_at <= now]
+
+    def _seconds_until_next_run(self) -> float:
+        with self._lock:
+            next_run_at = min((state.next_run_at for state in self._states.values()), default=None)
+        if next_run_at is None:
+            return _MAX_IDLE_SECONDS
+        return min(_MAX_IDLE_SECONDS, max(0.0, next_run_at - time.time()))
+
+    def _refresh(self, connection: PlaidConnection) -> None:
+        try:
+            refresh_item(connection.name)
+            sync_transactions(connection, force=True)
+        except Exception as error:
+            with self._lock:
+                state = self._states[(current_tenant(), connection.item_id)]
+                state.failures += 1
+                state.last_error = describe_error(error)
+                backoff = REFRESH_BASE_BACKOFF_SECONDS * 2 ** (state.failures - 1)
+                state.next_run_at = time.time() + _jittered(min(backoff, self.settings.max_backoff_seconds))
+            return
+
+        with self._lock:
+            state = self._states[(current_tenant(), connection.item_id)]
+            state.failures = 0
+            state.last_error = None
+            state.last_success_at = time.time()
+            state.next_run_at = state.last_success_at + _jittered(self.settings.interval_seconds)
+
+
+# Global instance, started and stopped with the FastMCP app
+refresh_scheduler = RefreshScheduler()
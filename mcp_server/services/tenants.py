@@ -0,0 +1,256 @@
+"""
+Per-tenant isolation of Items, credentials, stores, caches and rate-limit budgets.
+
+One server can serve several users, e.g. the members of a household, each a
+tenant with its own connections file, keyring service and SQLite stores (see
+get_tenant_storage). Every piece of per-user state is a TenantLocal: a
+module-level name such as `item_storage`, whose attribute access is forwarded
+to the current tenant's own instance, created on first use. Call sites are the
+same as with a single user.
+
+The current tenant is tracked in a context variable, which is carried into the
+tool executor and fan-out threads. Each tool call sets it from the caller's
+access token, or from the X-TTYF-Tenant header when that is enabled and names
+an allowed tenant, and otherwise serves the default tenant (TTYF_TENANT).
+
+Tenants are kept in the order of their last tool call. Once more than
+TENANT_MAX_RESIDENT tenants are resident, the least recently used ones without
+a call in flight are evicted, dropping their Items, caches and store
+connections; their data stays on disk and is loaded again on their next call.
+The default tenant is never evicted.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from mcp_server.utils import TenantVars
+
+T = TypeVar("T")
+
+DEFAULT_TENANT = "default"
+TENANT_HEADER = "x-ttyf-tenant"
+# Tenant names become directory names and keyring services, so they are kept to a safe alphabet
+_TENANT_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+_UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]+")
+_MISSING = object()
+
+_current_tenant: ContextVar[str | None] = ContextVar("ttyf_tenant", default=None)
+
+
+def validate_tenant(tenant: str) -> str:
+    """
+    Returns the tenant name if it is valid.
+
+    Raises:
+        ValueError: If the name is empty, too long or has characters other than letters, digits, `_`, `.` and `-`
+    """
+    if not _TENANT_NAME.fullmatch(tenant):
+        raise ValueError(f"Invalid tenant name: {tenant!r}")
+    return tenant
+
+
+def client_tenant(identity: str) -> str:
+    """
+    Returns the tenant of an authenticated client, given its token's tenant claim or client id.
+
+    Identities that are not valid tenant names, e.g. URL-shaped OAuth client
+    ids, are mapped to their safe characters followed by a hash of the whole
+    identity, e.g. "https-app.example.com-mcp-1f3a...". So is the reserved
+    name of the default tenant, whose data is the single-user install's, so
+    that no token can select it.
+    """
+    if identity != DEFAULT_TENANT and _TENANT_NAME.fullmatch(identity):
+        return identity
+    digest = hashlib.sha256(identity.encode()).hexdigest()[:16]
+    prefix = _UNSAFE_CHARACTERS.sub("-", identity).lstrip("_.-")[:47]
+    return f"{prefix}-{digest}" if prefix else digest
+
+
+def current_tenant() -> str:
+    """
+    Returns the tenant of the running tool call, or the default tenant outside of one.
+    """
+    return _current_tenant.get() or tenant_registry.default_tenant
+
+
+@dataclass(eq=False)
+class _Tenant:
+    state: dict[str, Any] = field(default_factory=dict)
+    # Tool calls and refreshes running for the tenant, which keep it from being evicted
+    active: int = 0
+    # Serializes the creation of the tenant's state, which may itself use other state of the tenant
+    create_lock: threading.RLock = field(default_factory=threading.RLock)
+
+
+class TenantRegistry:
+    """
+    The resident tenants and their state, in least recently used order.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tenants: OrderedDict[str, _Tenant] = OrderedDict()
+        self.default_tenant = DEFAULT_TENANT
+        self.max_resident = 16
+        self.header_enabled = False
+        self.header_tenants: frozenset[str] = frozenset()
+        self.max_plaid_calls = 8
+        self.evictions = 0
+
+    def configure(self, settings: "TenantVars") -> None:
+        """
+        Applies the tenant settings, see get_tenant_vars.
+        """
+        self.default_tenant = validate_tenant(settings.default_tenant)
+        self.max_resident = settings.max_resident
+        self.header_enabled = settings.header_enabled
+        self.header_tenants = frozenset(validate_tenant(tenant) for tenant in settings.header_tenants)
+        self.max_plaid_calls = settings.max_plaid_calls
+
+    def _tenant(self, name: str) -> _Tenant:
+        """Finds or adds a tenant. Must hold self._lock."""
+        tenant = self._tenants.get(name)
+        if tenant is None:
+            tenant = self._tenants[name] = _Tenant()
+        return tenant
+
+    def get(self, name: str, factory: Callable[[str], T]) -> T:
+        """
+        Returns the current tenant's instance of some state, creating it with `factory(tenant)` on first use.
+        """
+        tenant_name = current_tenant()
+        # Lock-free on the hot path: dict reads are atomic, and state is only ever added to a tenant
+        tenant = self._tenants.get(tenant_name)
+        if tenant is None:
+            with self._lock:
+                tenant = self._tenant(tenant_name)
+        value = tenant.state.get(name, _MISSING)
+        if value is _MISSING:
+            with tenant.create_lock:
+                value = tenant.state.get(name, _MISSING)
+                if value is _MISSING:
+                    value = tenant.state[name] = factory(tenant_name)
+        return value
+
+    @contextmanager
+    def use(self, tenant: str, touch: bool = True) -> Iterator[None]:
+        """
+        Runs the block as the given tenant, keeping the tenant resident meanwhile.
+
+        Args:
+            tenant: The tenant name
+            touch: Count the block as activity, making the tenant the most recently used and
+                evicting idle tenants beyond TENANT_MAX_RESIDENT. Background work passes False,
+                so it does not keep tenants resident.
+
+        Raises:
+            ValueError: If the tenant name is invalid
+        """
+        validate_tenant(tenant)
+        with self._lock:
+            entry = self._tenant(tenant)
+            entry.active += 1
+            if touch:
+                self._tenants.move_to_end(tenant)
+                self._evict_idle()
+        token = _current_tenant.set(tenant)
+        try:
+            yield
+        finally:
+            _current_tenant.reset(token)
+            with self._lock:
+                entry.active -= 1
+
+    def _evict_idle(self) -> None:
+        """Drops the least recently used idle tenants beyond max_resident. Must hold self._lock."""
+        excess = len(self._tenants) - self.max_resident
+        if excess <= 0:
+            return
+        for name in [name for name, tenant in self._tenants.items() if not tenant.active and name != self.default_tenant][:excess]:
+            del self._tenants[name]
+            self.evictions += 1
+
+    def evict(self, tenant: str) -> bool:
+        """
+        Drops a tenant's state, unless it has a call in flight.
+
+        Returns:
+            Whether the tenant was evicted
+        """
+        with self._lock:
+            entry = self._tenants.get(tenant)
+            if entry is None or entry.active:
+                return False
+            del self._tenants[tenant]
+            self.evictions += 1
+            return True
+
+    def resident(self) -> list[str]:
+        """
+        Returns the tenants whose state is in memory, the default tenant first, then least recently used first.
+        """
+        with self._lock:
+            names = list(self._tenants)
+        return [self.default_tenant, *(name for name in names if name != self.default_tenant)]
+
+    def request_tenant(self) -> str:
+        """
+        Returns the tenant of the MCP request being handled.
+
+        An authenticated client is the tenant named by its token's `tenant` claim,
+        or else its client id, see client_tenant. Without authentication, the
+        X-TTYF-Tenant header names the tenant when TENANT_HEADER_ENABLED is set,
+        and only tenants listed in TENANT_HEADER_ALLOWLIST may be named, the
+        default tenant included.
+        Otherwise, including over stdio and with fastmcp releases that do not
+        expose the request's token and headers, it is the default tenant.
+
+        Raises:
+            PermissionError: If the header names a tenant that is not allowed
+        """
+        try:
+            from fastmcp.server.dependencies import get_access_token, get_http_headers
+        except ImportError:
+            return self.default_tenant
+
+        token = get_access_token()
+        if token is not None:
+            return client_tenant(str(token.claims.get("tenant") or token.client_id))
+        if self.header_enabled:
+            tenant = get_http_headers().get(TENANT_HEADER)
+            if tenant:
+                if tenant not in self.header_tenants:
+                    raise PermissionError(f"Tenant {tenant!r} is not in TENANT_HEADER_ALLOWLIST")
+                return tenant
+        return self.default_tenant
+
+
+class TenantLocal(Generic[T]):
+    """
+    Per-tenant state behind a single module-level name.
+
+    Attribute access is forwarded to the current tenant's instance, created
+    with `factory(tenant)` on first use; `resolve()` returns the instance itself.
+    """
+    __slots__ = ("_name", "_factory")
+
+    def __init__(self, name: str, factory: Callable[[str], T]):
+        self._name = name
+        self._factory = factory
+
+    def resolve(self) -> T:
+        return tenant_registry.get(self._name, self._factory)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self.resolve(), attribute)
+
+
+# Global instance, configured with the FastMCP app
+tenant_registry = TenantRegistry()
@@ -0,0 +1,223 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from mcp_server.tools.schemas.tools import PlaidItem
+from mcp_server.services.tenants import TenantLocal
+from mcp_server.utils import _BALANCES_DB, get_tenant_storage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS balance_accounts (
+    account_id TEXT PRIMARY KEY,
+    item_id TEXT,
+    item_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mask TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    official_name TEXT,
+    holder_category TEXT,
+    iso_currency_code TEXT,
+    observed_at REAL NOT NULL,
+    -- The first observation of the account's Item without it, NULL while it is still in the Item
+    removed_at REAL
+);
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    account_id TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    current REAL,
+    available REAL,
+    credit_limit REAL,
+    PRIMARY KEY (account_id, taken_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS balance_snapshots_by_time ON balance_snapshots (taken_at);
+CREATE TABLE IF NOT EXISTS balance_items (
+    item_id TEXT PRIMARY KEY,
+    observed_at REAL NOT NULL
+);
+"""
+# Bumped when existing databases need a one-off migration, see _migrate
+_SCHEMA_VERSION = 1
+
+# Latest snapshot of each account in its Item's last observation, with the account's metadata
+_SELECT_LATEST = """
+SELECT a.*, s.taken_at, s.current, s.available, s.credit_limit
+FROM balance_accounts a
+JOIN balance_items i ON i.item_id = a.item_id AND i.observed_at = a.observed_at
+JOIN balance_snapshots s ON s.account_id = a.account_id
+WHERE s.taken_at = (SELECT MAX(taken_at) FROM balance_snapshots WHERE account_id = a.account_id)
+"""
+
+
+class BalanceStore:
+    """
+    Local append-only time series of account balances.
+
+    Every accounts_get response is recorded. A snapshot row is only appended
+    when an account's balances differ from its previous snapshot, so an
+    account's balance at any time is its latest snapshot at or before then,
+    and unchanged balances cost no space. When each Item and account was last
+    observed is kept separately, so the latest balances can be served while
+    they are known to be fresh, leaving out accounts that were removed from
+    their Item since. Removed accounts keep when they were first missing, so
+    past balances can leave them out from then on.
+    """
+
+    def __init__(self, path: Path = _BALANCES_DB):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._migrate(connection)
+            self._local.connection = connection
+        return connection
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        # Idempotent, so connections opened concurrently may both run it
+        with connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                columns = {row["name"] for row in connection.execute("PRAGMA table_info(balance_accounts)")}
+                if "removed_at" not in columns:
+                    connection.execute("ALTER TABLE balance_accounts ADD COLUMN removed_at REAL")
+                # Stores written before Items were tracked start from their accounts' latest observation,
+                # and their accounts missing from it count as removed as of then
+                connection.execute(
+                    "INSERT OR IGNORE INTO balance_items (item_id, observed_at)"
+                    " SELECT item_id, MAX(observed_at) FROM balance_accounts WHERE item_id IS NOT NULL GROUP BY item_id"
+                )
+                connection.execute(
+                    "UPDATE balance_accounts SET removed_at = (SELECT observed_at FROM balance_items i WHERE i.item_id = balance_accounts.item_id)"
+                    " WHERE removed_at IS NULL AND observed_at < (SELECT observed_at FROM balance_items i WHERE i.item_id = balance_accounts.item_id)"
+                )
+            if version < _SCHEMA_VERSION:
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def record(self, item: PlaidItem, taken_at: float | None = None) -> int:
+        """
+        Records the balances of an Item's accounts as observed now.
+
+        Args:
+            item: The Item with the balances returned by accounts_get
+            taken_at: When the balances were observed, defaults to now
+
+        Returns:
+            The number of snapshots appended, i.e. of accounts whose balances changed
+        """
+        taken_at = time.time() if taken_at is None else taken_at
+        appended = 0
+        with self._write_lock, self._connection() as connection:
+            previous_observation = connection.execute(
+                "SELECT observed_at FROM balance_items WHERE item_id = ?", (item.item_id,)
+            ).fetchone()
+            latest = previous_observation is None or taken_at >= previous_observation["observed_at"]
+            connection.execute(
+                "INSERT INTO balance_items (item_id, observed_at) VALUES (?, ?)"
+                " ON CONFLICT (item_id) DO UPDATE SET observed_at = MAX(observed_at, excluded.observed_at)",
+                (item.item_id, taken_at),
+            )
+            for account in item.accounts:
+                balances = account.balances
+                connection.execute(
+                    "INSERT INTO balance_accounts (account_id, item_id, item_name, name, mask, type, subtype,"
+                    " official_name, holder_category, iso_currency_code, observed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (account_id) DO UPDATE SET item_id = excluded.item_id,"
+                    " item_name = excluded.item_name, name = excluded.name, mask = excluded.mask,"
+                    " type = excluded.type, subtype = excluded.subtype, official_name = excluded.official_name,"
+                    " holder_category = excluded.holder_category, iso_currency_code = excluded.iso_currency_code,"
+                    " observed_at = MAX(observed_at, excluded.observed_at),"
+                    " removed_at = CASE WHEN excluded.observed_at >= observed_at THEN NULL ELSE removed_at END",
+                    (
+                        account.account_id, item.item_id, item.name, account.name, account.mask, account.type,
+                        account.subtype, account.official_name, account.holder_category,
+                        balances.iso_currency_code, taken_at,
+                    ),
+                )
+                previous = connection.execute(
+                    "SELECT current, available, credit_limit FROM balance_snapshots"
+                    " WHERE account_id = ? ORDER BY taken_at DESC LIMIT 1",
+                    (account.account_id,),
+                ).fetchone()
+                snapshot = (balances.current, balances.available, balances.limit)
+                if previous is None or tuple(previous) != snapshot:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO balance_snapshots (account_id, taken_at, current, available, credit_limit)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (account.account_id, taken_at, *snapshot),
+                    )
+                    appended += 1
+            if latest:
+                # The Item's accounts missing from its newest observation were removed as of now
+                connection.execute(
+                    "UPDATE balance_accounts SET removed_at = ? WHERE item_id = ? AND observed_at < ? AND removed_at IS NULL",
+                    (taken_at, item.item_id, taken_at),
+                )
+        return appended
+
+    def latest(self, item_ids: Iterable[str] | None = None) -> list[sqlite3.Row]:
+        """
+        Returns the latest snapshot of every account in its Item's last observation, with its metadata and `observed_at`.
+
+        Args:
+            item_ids: Optional Items to restrict the accounts to
+        """
+        query, params = _SELECT_LATEST, []
+        if item_ids is not None:
+            item_ids = list(item_ids)
+            query += f" AND a.item_id IN ({', '.join('?' for _ in item_ids)})"
+            params = item_ids
+        return list(self._connection().execute(query + " ORDER BY a.item_name, a.name", params))
+
+    def observed_at(self, item_id: str) -> float | None:
+        """
+        Returns when the balances of an Item were last observed, or None if they never were.
+        """
+        row = self._connection().execute(
+            "SELECT observed_at FROM balance_items WHERE item_id = ?", (item_id,)
+        ).fetchone()
+        return row["observed_at"] if row is not None else None
+
+    def get_accounts(self) -> list[sqlite3.Row]:
+        """
+        Returns the metadata of every account that has snapshots, with its Item and `removed_at`.
+        """
+        return list(self._connection().execute("SELECT * FROM balance_accounts ORDER BY item_name, name"))
+
+    def iter_snapshots(
+        self, end: float, start: float | None = None, account_ids: Iterable[str] | None = None
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Streams snapshots taken before `end`, oldest first.
+
+        Args:
+            end: Snapshot time bound (exclusive), as a Unix timestamp
+            start: Optional earliest snapshot time (inclusive)
+            account_ids: Optional accounts to restrict the snapshots to
+        """
+        query = "SELECT account_id, taken_at, current, available, credit_limit FROM balance_snapshots WHERE taken_at < ?"
+        params: list = [end]
+        if start is not None:
+            query += " AND taken_at >= ?"
+            params.append(start)
+        if account_ids is not None:
+            account_ids = list(account_ids)
+            query += f" AND account_id IN ({', '.join('?' for _ in account_ids)})"
+            params.extend(account_ids)
+        yield from self._connection().execute(query + " ORDER BY taken_at", params)
+
+
+# Global instance that can be imported anywhere, holding the current tenant's balances
+balance_store: TenantLocal[BalanceStore] = TenantLocal(
+    "balance_store", lambda tenant: BalanceStore(get_tenant_storage(tenant).balances_db)
+)
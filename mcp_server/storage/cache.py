@@ -0,0 +1,179 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from mcp_server.services import metrics
+from mcp_server.services.tenants import current_tenant, tenant_registry
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Shared by every cache for stale-while-revalidate refreshes
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ttyf-cache-refresh")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    loaded_at: float
+    refreshing: bool = False
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache whose entries expire after a TTL.
+
+    Entries older than `refresh_after` are still served, but a background
+    refresh is started (stale-while-revalidate). Entries older than `ttl` are
+    never served; they are reloaded before returning. Concurrent misses for the
+    same key share a single load.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 1800, refresh_after: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.refresh_after = ttl if refresh_after is None else refresh_after
+        self._entries: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[K, threading.Lock] = {}
+        self._stats = CacheStats()
+
+    def get_or_load(self, key: K, loader: Callable[[K], V]) -> V:
+        """
+        Returns the cached value for `key`, loading it with `loader` when needed.
+
+        Args:
+            key: The cache key
+            loader: Called with `key` to load a missing, expired or stale value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        with self._lock:
+            entry, stale = self._lookup(key)
+            if entry is None:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        if entry is not None:
+            metrics.count("cache_hits")
+            if stale:
+                self.refresh(key, loader)
+            return entry.value
+
+        with key_lock:
+            # Another thread may have loaded the key while we waited
+            with self._lock:
+                entry, _ = self._lookup(key, count=False)
+                if entry is not None:
+                    self._stats.hits += 1
+                    metrics.count("cache_hits")
+                    return entry.value
+                self._stats.misses += 1
+            metrics.count("cache_misses")
+
+            value = loader(key)
+            self.put(key, value)
+            return value
+
+    def _lookup(self, key: K, count: bool = True) -> tuple[_Entry[V] | None, bool]:
+        """Finds a servable entry and whether it is stale. Must hold self._lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+
+        age = time.monotonic() - entry.loaded_at
+        if age >= self.ttl:
+            return None, False
+
+        self._entries.move_to_end(key)
+        stale = age >= self.refresh_after
+        if count:
+            if stale:
+                self._stats.stale_hits += 1
+            else:
+                self._stats.hits += 1
+        return entry, stale
+
+    def refresh(self, key: K, loader: Callable[[K], V]) -> None:
+        """
+        Reloads `key` in the background unless a refresh is already running.
+
+        The refresh runs as the caller's tenant, and is skipped if the tenant
+        has been evicted by the time it starts.
+
+        Args:
+            key: The cache key
+            loader: Called with `key` to load the new value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.refreshing:
+                    return
+                entry.refreshing = True
+
+        tenant = current_tenant()
+
+        def run() -> None:
+            try:
+                if tenant not in tenant_registry.resident():
+                    # Reloading would bring back the state of an evicted tenant
+                    if entry is not None:
+                        with self._lock:
+                            entry.refreshing = False
+                    return
+                # Background work, which must not keep an idle tenant from being evicted
+                with tenant_registry.use(tenant, touch=False):
+                    self.put(key, loader(key))
+                with self._lock:
+                    self._stats.refreshes += 1
+            except Exception:
+                with self._lock:
+                    self._stats.refresh_errors += 1
+                    if entry is not None:
+                        entry.refreshing = False
+
+        # Run in the caller's context, e.g. the tool it is attributed to
+        _refresh_executor.submit(contextvars.copy_context().run, run)
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(value=value, loaded_at=time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+                self._stats.evictions += 1
+
+    def invalidate(self, key: K | None = None) -> None:
+        """
+        Drops `key` from the cache, or every entry when no key is given.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
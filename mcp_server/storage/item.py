@@ -1,34 +1,89 @@
-from mcp_server.utils import read_access_tokens
+import os
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+
+from mcp_server.services.tenants import TenantLocal
+from mcp_server.utils import get_tenant_storage, read_access_tokens
 from mcp_server.tools.schemas.util import PlaidConnection
-from typing import Any, Optional
 
 
 class ItemStorage:
-    _instance: Optional["ItemStorage"] = None
-    items: dict[str, PlaidConnection] = {}
-    accounts: dict[str, list[dict[str, Any]]] = {}
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ItemStorage, cls).__new__(cls)
-            cls._instance.items = read_access_tokens()
-        return cls._instance
+    """
+    A tenant's stored Plaid connections by name.
 
-    def get_item(self, name: str) -> PlaidConnection:
-        if not name in self.items:
-            self.items = read_access_tokens()
+    Connections and their access tokens are read from the connections file and
+    the keyring on first use rather than at import, so server startup does not
+    wait on the keyring. They are then served from memory, behind a read-only
+    view. Each access only stats the connections file: it is read again when
+    its modification time, size or inode changed, and then only the access
+    tokens of newly added connections are read from the keyring.
+    """
+
+    def __init__(self, connections_file: Path, keyring_service: str):
+        self.connections_file = connections_file
+        self.keyring_service = keyring_service
+        self.items: dict[str, PlaidConnection] = {}
+        self._loaded = False
+        self._signature: tuple[int, int, int] | None = None
+        self._load_lock = threading.Lock()
+
+    def _file_signature(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.connections_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read(self, known_tokens: Mapping[str, str] | None = None) -> dict[str, PlaidConnection]:
+        return read_access_tokens(known_tokens, connections_file=self.connections_file, keyring_service=self.keyring_service)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded and self._file_signature() == self._signature:
+            return
+        with self._load_lock:
+            signature = self._file_signature()
+            if self._loaded and signature == self._signature:
+                return
+            known_tokens = {item.item_id: item.access_token for item in self.items.values()}
+            self.items = self._read(known_tokens)
+            self._signature = signature
+            self._loaded = True
 
+    def reload(self) -> None:
+        """
+        Reads the connections file and every access token again, e.g. after a token was replaced in the keyring.
+        """
+        with self._load_lock:
+            self.items = self._read()
+            self._signature = self._file_signature()
+            self._loaded = True
+
+    def get_item(self, name: str) -> PlaidConnection:
+        self._ensure_loaded()
         return self.items[name]
-    
-    def get_items(self) -> dict[str, PlaidConnection]:
-        return self.items
+
+    def get_items(self) -> Mapping[str, PlaidConnection]:
+        self._ensure_loaded()
+        return MappingProxyType(self.items)
 
     def add_item(self, name: str, item: PlaidConnection):
-        self.items[name] = item
+        self._ensure_loaded()
+        # Copied on write, so views handed out earlier stay consistent
+        self.items = {**self.items, name: item}
 
     def delete_item(self, name: str):
-        del self.items[name]
+        self._ensure_loaded()
+        items = dict(self.items)
+        del items[name]
+        self.items = items
+
+
+def _tenant_item_storage(tenant: str) -> ItemStorage:
+    storage = get_tenant_storage(tenant)
+    return ItemStorage(storage.connections_file, storage.keyring_service)
 
 
-# Global instance that can be imported anywhere
-item_storage = ItemStorage()
\ No newline at end of file
+# Global instance that can be imported anywhere, holding the current tenant's connections
+item_storage: TenantLocal[ItemStorage] = TenantLocal("item_storage", _tenant_item_storage)
@@ -0,0 +1,252 @@
+import sqlite3
+import statistics
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import groupby
+from operator import attrgetter
+from typing import Literal
+
+from mcp_server.services import metrics
+from mcp_server.services.tenants import TenantLocal
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.storage.vendor_index import normalize_vendor
+
+_DAYS_PER_MONTH = 30.44
+
+Frequency = Literal["weekly", "biweekly", "monthly", "quarterly", "annual"]
+
+# Nominal period and tolerance in days of each frequency, shortest first
+_PERIODS: tuple[tuple[Frequency, float, float], ...] = (
+    ("weekly", 7.0, 1.5),
+    ("biweekly", 14.0, 2.5),
+    ("monthly", _DAYS_PER_MONTH, 4.0),
+    ("quarterly", 91.31, 10.0),
+    ("annual", 365.25, 20.0),
+)
+# Fewest distinct charge dates for a series to count as recurring
+_MIN_OCCURRENCES: dict[Frequency, int] = {"weekly": 4, "biweekly": 3, "monthly": 3, "quarterly": 3, "annual": 2}
+# Share of the gaps between charges that must match the period
+_MIN_REGULARITY = 0.75
+# Amounts of one vendor further apart than this fraction are considered separate series, e.g. two plans
+_AMOUNT_GAP = 0.2
+# Largest coefficient of variation of a fixed-amount series, such as a subscription
+_FIXED_AMOUNT_VARIATION = 0.05
+# A series is active until this many periods have passed without a charge
+_ACTIVE_PERIODS = 1.5
+
+
+@dataclass(slots=True)
+class _Charge:
+    vendor: str
+    outflow: bool
+    magnitude: float
+    day: int
+    amount: float
+    display_name: str
+    account_id: str
+    category: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class RecurringSeries:
+    """
+    A vendor charging or paying an Item's accounts at a regular interval.
+
+    Amounts follow Plaid's convention: positive amounts are money leaving the account.
+    """
+    vendor: str
+    item_id: str
+    account_ids: tuple[str, ...]
+    category: str | None
+    frequency: Frequency
+    period_days: float
+    interval_days: float
+    occurrences: int
+    first_date: date
+    last_date: date
+    average_amount: float
+    last_amount: float
+    amount_variation: float
+    regularity: float
+
+    @property
+    def fixed_amount(self) -> bool:
+        return self.amount_variation <= _FIXED_AMOUNT_VARIATION
+
+    @property
+    def next_expected_date(self) -> date:
+        return self.last_date + timedelta(days=round(self.interval_days))
+
+    @property
+    def monthly_amount(self) -> float:
+        return self.average_amount * _DAYS_PER_MONTH / self.period_days
+
+    def is_active(self, today: date) -> bool:
+        return (today - self.last_date).days <= self.period_days * _ACTIVE_PERIODS
+
+
+def _charges(rows: Iterable[sqlite3.Row]) -> Iterator[_Charge]:
+    # Names and dates repeat a lot, so each is parsed once
+    vendors: dict[str, str] = {}
+    days: dict[str, int] = {}
+    for row in rows:
+        amount = row["amount"]
+        if not amount:
+            continue
+        display_name = row["merchant_name"] or row["name"]
+        vendor = vendors.get(display_name)
+        if vendor is None:
+            vendor = vendors[display_name] = normalize_vendor(display_name)
+        day = days.get(row["txn_date"])
+        if day is None:
+            day = days[row["txn_date"]] = date.fromisoformat(row["txn_date"]).toordinal()
+        yield _Charge(
+            vendor=vendor,
+            outflow=amount > 0,
+            magnitude=abs(amount),
+            day=day,
+            amount=amount,
+            display_name=display_name,
+            account_id=row["account_id"],
+            category=row["category_primary"],
+        )
+
+
+def _amount_clusters(charges: list[_Charge]) -> list[list[_Charge]]:
+    """Splits charges sorted by magnitude into clusters spanning at most _AMOUNT_GAP of their smallest amount."""
+    clusters: list[list[_Charge]] = []
+    for charge in charges:
+        if not clusters or charge.magnitude > clusters[-1][0].magnitude * (1 + _AMOUNT_GAP):
+            clusters.append([])
+        clusters[-1].append(charge)
+    return clusters
+
+
+def _detect(item_id: str, charges: list[_Charge]) -> RecurringSeries | None:
+    """Classifies one vendor's charges, sorted by date, as a recurring series if they are regular enough."""
+    days = sorted({charge.day for charge in charges})
+    if len(days) < 2:
+        return None
+
+    intervals = [later - earlier for earlier, later in zip(days, days[1:])]
+    interval = statistics.median(intervals)
+    for frequency, period, tolerance in _PERIODS:
+        if abs(interval - period) <= tolerance:
+            break
+    else:
+        return None
+
+    regularity = sum(abs(gap - period) <= tolerance for gap in intervals) / len(intervals)
+    if len(days) < _MIN_OCCURRENCES[frequency] or regularity < _MIN_REGULARITY:
+        return None
+
+    amounts = [charge.amount for charge in charges]
+    if len(days) == 2 and len(set(amounts)) > 1:
+        # Two charges a year apart are only a series when they are for the very same amount
+        return None
+    average = statistics.fmean(amounts)
+    last = charges[-1]
+    return RecurringSeries(
+        vendor=last.display_name,
+        item_id=item_id,
+        account_ids=tuple(sorted({charge.account_id for charge in charges})),
+        category=last.category,
+        frequency=frequency,
+        period_days=period,
+        interval_days=interval,
+        occurrences=len(days),
+        first_date=date.fromordinal(days[0]),
+        last_date=date.fromordinal(days[-1]),
+        average_amount=average,
+        last_amount=last.amount,
+        amount_variation=statistics.pstdev(amounts) / abs(average),
+        regularity=regularity,
+    )
+
+
+def _detect_vendor(item_id: str, charges: list[_Charge]) -> list[RecurringSeries]:
+    """Finds the recurring series among one vendor's charges in one direction, sorted by magnitude."""
+    by_date = attrgetter("day")
+    found: list[RecurringSeries] = []
+    rest: list[_Charge] = []
+    # Charges of the exact same amount first, so a subscription stands out among a vendor's other purchases
+    for _, same_amount in groupby(charges, key=attrgetter("magnitude")):
+        same_amount = list(same_amount)
+        series = _detect(item_id, sorted(same_amount, key=by_date)) if len(same_amount) > 1 else None
+        if series:
+            found.append(series)
+        else:
+            rest.extend(same_amount)
+    if not rest:
+        return found
+
+    # Then series of similar amounts, and finally the vendor as a whole for bills that vary more
+    clusters = _amount_clusters(rest)
+    found.extend(series for cluster in clusters if len(cluster) > 1 and (series := _detect(item_id, sorted(cluster, key=by_date))))
+    if not found and len(clusters) > 1 and (series := _detect(item_id, sorted(rest, key=by_date))):
+        found.append(series)
+    return found
+
+
+def detect_recurring(item_id: str, rows: Iterable[sqlite3.Row]) -> list[RecurringSeries]:
+    """
+    Finds the recurring series among an Item's transactions.
+
+    Transactions are sorted once by normalized vendor, direction and amount, so
+    each vendor's charges form one run, within which charges of the same amount
+    and then clusters of similar amounts are adjacent too (e.g. two plans of one
+    vendor). Each group is checked for a weekly to annual period by the median
+    gap between its charge dates. A vendor without any regular group is checked
+    as a whole, so bills with varying amounts are found too. The cost is
+    O(n log n) in the number of transactions, without pairwise comparisons.
+
+    Args:
+        item_id: The Item the transactions belong to
+        rows: The Item's posted transactions, see TransactionStore.iter_item_transactions
+
+    Returns:
+        The recurring series, in no particular order
+    """
+    charges = sorted(_charges(rows), key=attrgetter("vendor", "outflow", "magnitude", "day"))
+    found: list[RecurringSeries] = []
+    for _, run in groupby(charges, key=attrgetter("vendor", "outflow")):
+        found.extend(_detect_vendor(item_id, list(run)))
+    return found
+
+
+class RecurringIndex:
+    """
+    Recurring series of every Item, detected from the transaction store.
+
+    Each Item's series are cached together with the Item's sync cursor, and
+    detected again only once a sync has moved the cursor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: dict[str, tuple[str | None, list[RecurringSeries]]] = {}
+
+    def get(self, item_id: str) -> list[RecurringSeries]:
+        """
+        Returns the recurring series of an Item's stored transactions.
+        """
+        # Read before detecting, so a sync applied meanwhile invalidates the result
+        cursor, _ = transaction_store.get_cursor(item_id)
+        with self._lock:
+            cached = self._series.get(item_id)
+        if cached is not None and cached[0] == cursor:
+            metrics.count("cache_hits")
+            return cached[1]
+
+        metrics.count("cache_misses")
+        with metrics.span("aggregate.recurring"):
+            series = detect_recurring(item_id, metrics.counted(transaction_store.iter_item_transactions(item_id)))
+        with self._lock:
+            self._series[item_id] = (cursor, series)
+        return series
+
+
+# Global instance that can be imported anywhere, one per tenant
+recurring_index: TenantLocal[RecurringIndex] = TenantLocal("recurring_index", lambda tenant: RecurringIndex())
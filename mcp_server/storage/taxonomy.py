@@ -0,0 +1,92 @@
+import csv
+import difflib
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import cache
+from importlib import resources
+from types import MappingProxyType
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryTaxonomyIndex:
+    """
+    Immutable, indexed Plaid personal finance category taxonomy.
+
+    Detailed categories are the full Plaid codes, e.g. FOOD_AND_DRINK_COFFEE.
+    Their sub-category is the code without the primary prefix, e.g. COFFEE.
+    """
+    primaries: tuple[str, ...]
+    detailed_by_primary: Mapping[str, tuple[str, ...]]
+    primary_by_detailed: Mapping[str, str]
+    descriptions: Mapping[str, str]
+    detailed_by_sub_category: Mapping[str, tuple[str, ...]]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, str]]) -> "CategoryTaxonomyIndex":
+        detailed_by_primary: dict[str, list[str]] = {}
+        primary_by_detailed: dict[str, str] = {}
+        descriptions: dict[str, str] = {}
+        detailed_by_sub_category: dict[str, list[str]] = {}
+        for row in rows:
+            primary, detailed = row["PRIMARY"], row["DETAILED"]
+            detailed_by_primary.setdefault(primary, []).append(detailed)
+            primary_by_detailed[detailed] = primary
+            descriptions[detailed] = row["DESCRIPTION"]
+            detailed_by_sub_category.setdefault(sub_category(primary, detailed), []).append(detailed)
+
+        return cls(
+            primaries=tuple(detailed_by_primary),
+            detailed_by_primary=MappingProxyType({key: tuple(value) for key, value in detailed_by_primary.items()}),
+            primary_by_detailed=MappingProxyType(primary_by_detailed),
+            descriptions=MappingProxyType(descriptions),
+            detailed_by_sub_category=MappingProxyType({key: tuple(value) for key, value in detailed_by_sub_category.items()}),
+        )
+
+    def resolve(self, category: str) -> tuple[str, ...]:
+        """
+        Expands a primary, detailed or sub-category name to the detailed categories it covers.
+
+        Args:
+            category: e.g. FOOD_AND_DRINK, FOOD_AND_DRINK_COFFEE or COFFEE, in any case
+
+        Returns:
+            The detailed categories
+
+        Raises:
+            ValueError: If the category is not in the taxonomy or is an ambiguous sub-category
+        """
+        name = category.strip().upper().replace(" ", "_")
+        if name in self.detailed_by_primary:
+            return self.detailed_by_primary[name]
+        if name in self.primary_by_detailed:
+            return (name,)
+        matches = self.detailed_by_sub_category.get(name, ())
+        if len(matches) == 1:
+            return matches
+        if matches:
+            raise ValueError(f"Ambiguous category {category!r}, use one of {list(matches)}")
+
+        suggestions = difflib.get_close_matches(name, [*self.primaries, *self.primary_by_detailed], n=3)
+        hint = f", did you mean {' or '.join(suggestions)}?" if suggestions else ", see get_category_taxonomy"
+        raise ValueError(f"Unknown category {category!r}{hint}")
+
+    def expand(self, categories: Iterable[str]) -> frozenset[str]:
+        """
+        Validates category filters and expands them to the set of detailed categories they cover, see `resolve`.
+        """
+        return frozenset(detailed for category in categories for detailed in self.resolve(category))
+
+
+def sub_category(primary: str, detailed: str) -> str:
+    """The detailed category without its primary prefix, e.g. COFFEE for FOOD_AND_DRINK_COFFEE."""
+    return detailed.removeprefix(f"{primary}_")
+
+
+@cache
+def get_taxonomy() -> CategoryTaxonomyIndex:
+    """
+    Loads the taxonomy bundled with the package, once per process.
+    """
+    source = resources.files("mcp_server.storage").joinpath("static", "plaid_categories.csv")
+    with source.open("r", encoding="utf-8", newline="") as file:
+        return CategoryTaxonomyIndex.from_rows(csv.DictReader(file))
@@ -0,0 +1,427 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Literal
+
+from mcp_server.services.tenants import TenantLocal
+from mcp_server.utils import _TRANSACTIONS_DB, get_tenant_storage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_cursors (
+    item_id TEXT PRIMARY KEY,
+    cursor TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id TEXT PRIMARY KEY,
+    item_id TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    txn_date TEXT NOT NULL,
+    amount REAL NOT NULL,
+    name TEXT NOT NULL,
+    merchant_name TEXT,
+    pending INTEGER NOT NULL,
+    iso_currency_code TEXT,
+    category_primary TEXT,
+    category_detailed TEXT,
+    category_confidence TEXT,
+    authorized_date TEXT,
+    authorized_datetime TEXT,
+    txn_datetime TEXT,
+    website TEXT
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id TEXT PRIMARY KEY,
+    item_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mask TEXT,
+    type TEXT NOT NULL,
+    subtype TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_by_date ON transactions (txn_date);
+CREATE INDEX IF NOT EXISTS transactions_by_item ON transactions (item_id);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    bucket_end TEXT NOT NULL,
+    key TEXT NOT NULL,
+    total REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (period, dimension, bucket, key)
+);
+CREATE TABLE IF NOT EXISTS rollup_dirty_days (day TEXT PRIMARY KEY);
+CREATE TRIGGER IF NOT EXISTS rollups_dirty_on_insert AFTER INSERT ON transactions BEGIN
+    INSERT OR IGNORE INTO rollup_dirty_days (day) VALUES (new.txn_date);
+END;
+CREATE TRIGGER IF NOT EXISTS rollups_dirty_on_delete AFTER DELETE ON transactions BEGIN
+    INSERT OR IGNORE INTO rollup_dirty_days (day) VALUES (old.txn_date);
+END;
+CREATE TRIGGER IF NOT EXISTS rollups_dirty_on_update AFTER UPDATE ON transactions BEGIN
+    INSERT OR IGNORE INTO rollup_dirty_days (day) VALUES (old.txn_date), (new.txn_date);
+END;
+"""
+# Bumped when existing databases need a one-off migration, see _migrate
+_SCHEMA_VERSION = 1
+
+_COLUMNS = (
+    "transaction_id", "item_id", "account_id", "txn_date", "amount", "name", "merchant_name",
+    "pending", "iso_currency_code", "category_primary", "category_detailed", "category_confidence",
+    "authorized_date", "authorized_datetime", "txn_datetime", "website",
+)
+# Transaction columns plus the name, type and subtype of the transaction's account
+_SELECT_TRANSACTIONS = (
+    "SELECT t.*, a.name AS account_name, a.type AS account_type, a.subtype AS account_subtype"
+    " FROM transactions t LEFT JOIN accounts a ON a.account_id = t.account_id"
+)
+# SQLite's default limit on bound parameters is 999 in older builds
+_MAX_PARAMS = 900
+
+RollupPeriod = Literal["day", "week", "month"]
+RollupDimension = Literal["category", "account", "merchant"]
+_ROLLUP_KEYS: dict[str, str] = {
+    "category": "COALESCE(category_primary, 'Uncategorized')",
+    "account": "account_id",
+    "merchant": "COALESCE(merchant_name, name)",
+}
+
+# Called after each applied sync with (transaction_id, txn_date, vendor) of every
+# added or modified transaction and the ids of the removed ones
+SyncListener = Callable[[list[tuple[str, str, str]], list[str]], None]
+
+
+def _isoformat(value: Any) -> str | None:
+    return value.isoformat() if value is not None and hasattr(value, "isoformat") else value
+
+
+def _to_row(item_id: str, transaction: dict[str, Any]) -> tuple:
+    category = transaction.get("personal_finance_category") or {}
+    return (
+        transaction["transaction_id"],
+        item_id,
+        transaction["account_id"],
+        _isoformat(transaction["date"]),
+        transaction["amount"],
+        transaction["name"],
+        transaction.get("merchant_name"),
+        int(bool(transaction["pending"])),
+        transaction.get("iso_currency_code"),
+        category.get("primary"),
+        category.get("detailed"),
+        category.get("confidence_level"),
+        _isoformat(transaction.get("authorized_date")),
+        _isoformat(transaction.get("authorized_datetime")),
+        _isoformat(transaction.get("datetime")),
+        transaction.get("website"),
+    )
+
+
+def bucket_bounds(period: RollupPeriod, day: date) -> tuple[date, date]:
+    """
+    Returns the first and last day of the day, week (Monday to Sunday) or month bucket containing `day`.
+    """
+    match period:
+        case "day":
+            return day, day
+        case "week":
+            start = day - timedelta(days=day.weekday())
+            return start, start + timedelta(days=6)
+        case "month":
+            start = day.replace(day=1)
+            next_month = (start + timedelta(days=32)).replace(day=1)
+            return start, next_month - timedelta(days=1)
+    raise ValueError(f"Unknown rollup period {period!r}")
+
+
+def _to_account_row(item_id: str, account: dict[str, Any]) -> tuple:
+    subtype = account.get("subtype")
+    return (
+        account["account_id"],
+        item_id,
+        account["name"],
+        account.get("mask"),
+        str(account["type"]),
+        str(subtype) if subtype is not None else None,
+    )
+
+
+class TransactionStore:
+    """
+    Local SQLite copy of every Item's transactions, kept current with /transactions/sync.
+
+    Each Item's sync cursor is stored next to its transactions, so a sync only
+    pulls the deltas (added, modified and removed transactions) since the last one.
+    The account metadata returned by each sync is kept too, so transactions can be
+    annotated and filtered by account without an extra accounts_get call.
+    Connections are opened lazily, one per thread.
+
+    Day, week and month totals per category, account and merchant are kept in
+    a pre-aggregated rollups table. Triggers record the days whose transactions
+    changed, and only the buckets covering those days are recomputed, on the
+    next rollup read, so closed historical buckets are aggregated once.
+    """
+
+    def __init__(self, path: Path = _TRANSACTIONS_DB):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._listeners: list[SyncListener] = []
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Lets INSERT OR REPLACE fire the delete trigger for the replaced row, whose date may differ
+            connection.execute("PRAGMA recursive_triggers=ON")
+            connection.executescript(_SCHEMA)
+            self._migrate(connection)
+            self._local.connection = connection
+        return connection
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        # Idempotent, so connections opened concurrently may both run it
+        with connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                # Transactions stored before rollups existed were never marked dirty
+                connection.execute("INSERT OR IGNORE INTO rollup_dirty_days (day) SELECT DISTINCT txn_date FROM transactions")
+            if version < _SCHEMA_VERSION:
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def subscribe(self, listener: SyncListener) -> None:
+        """
+        Registers a listener that is told about every applied sync, e.g. to keep an index current.
+        """
+        self._listeners.append(listener)
+
+    def get_cursor(self, item_id: str) -> tuple[str | None, float | None]:
+        """
+        Returns the stored sync cursor of an Item and when it was last synced.
+        """
+        row = self._connection().execute(
+            "SELECT cursor, synced_at FROM sync_cursors WHERE item_id = ?", (item_id,)
+        ).fetchone()
+        return (row["cursor"], row["synced_at"]) if row else (None, None)
+
+    def apply_sync(
+        self,
+        item_id: str,
+        added: Iterable[dict[str, Any]],
+        modified: Iterable[dict[str, Any]],
+        removed: Iterable[str],
+        cursor: str,
+        accounts: Iterable[dict[str, Any]] = (),
+    ) -> None:
+        """
+        Atomically applies one complete /transactions/sync delta and advances the cursor.
+
+        Args:
+            item_id: The Item the delta belongs to
+            added: Transactions added since the previous cursor
+            modified: Transactions modified since the previous cursor
+            removed: Ids of transactions removed since the previous cursor
+            cursor: The cursor to resume from on the next sync
+            accounts: The Item's accounts as returned alongside the delta
+        """
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        rows = [_to_row(item_id, transaction) for transaction in (*added, *modified)]
+        removed = list(removed)
+        with self._write_lock, self._connection() as connection:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO transactions ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+            connection.executemany(
+                "DELETE FROM transactions WHERE transaction_id = ?",
+                [(transaction_id,) for transaction_id in removed],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO accounts (account_id, item_id, name, mask, type, subtype) VALUES (?, ?, ?, ?, ?, ?)",
+                [_to_account_row(item_id, account) for account in accounts],
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_cursors (item_id, cursor, synced_at) VALUES (?, ?, ?)",
+                (item_id, cursor, time.time()),
+            )
+
+        upserted = [(row[0], row[3], row[6] or row[5]) for row in rows]
+        for listener in self._listeners:
+            listener(upserted, removed)
+
+    def iter_transactions(
+        self,
+        start: date,
+        end: date,
+        account_ids: Iterable[str] | None = None,
+        account_type: str | None = None,
+        detailed_categories: Iterable[str] | None = None,
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Streams stored transactions within a date window, most recent first.
+
+        Each row carries the transaction's columns plus the `account_name`,
+        `account_type` and `account_subtype` of its account, when known.
+
+        Args:
+            start: Start date of the window (inclusive)
+            end: End date of the window (inclusive)
+            account_ids: Optional accounts to restrict the results to
+            account_type: Optional account type to restrict the results to
+            detailed_categories: Optional detailed categories to restrict the results to
+
+        Returns:
+            An iterator over the matching rows
+        """
+        query = _SELECT_TRANSACTIONS + " WHERE t.txn_date BETWEEN ? AND ?"
+        params: list[Any] = [start.isoformat(), end.isoformat()]
+        if account_ids is not None:
+            account_ids = list(account_ids)
+            query += f" AND t.account_id IN ({', '.join('?' for _ in account_ids)})"
+            params.extend(account_ids)
+        if account_type is not None:
+            query += " AND a.type = ?"
+            params.append(account_type)
+        if detailed_categories is not None:
+            detailed_categories = list(detailed_categories)
+            query += f" AND t.category_detailed IN ({', '.join('?' for _ in detailed_categories)})"
+            params.extend(detailed_categories)
+        query += " ORDER BY t.txn_date DESC"
+        yield from self._connection().execute(query, params)
+
+    def get_transactions(self, transaction_ids: Iterable[str]) -> list[sqlite3.Row]:
+        """
+        Loads stored transactions by id, with the same columns as iter_transactions, most recent first.
+
+        Args:
+            transaction_ids: The ids of the transactions to load
+
+        Returns:
+            The rows of the transactions that exist in the store
+        """
+        transaction_ids = list(transaction_ids)
+        rows: list[sqlite3.Row] = []
+        for i in range(0, len(transaction_ids), _MAX_PARAMS):
+            chunk = transaction_ids[i:i + _MAX_PARAMS]
+            rows.extend(self._connection().execute(
+                _SELECT_TRANSACTIONS + f" WHERE t.transaction_id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            ))
+        rows.sort(key=lambda row: row["txn_date"], reverse=True)
+        return rows
+
+    def refresh_rollups(self) -> int:
+        """
+        Recomputes the rollup buckets covering every day whose transactions changed since the last refresh.
+
+        Returns:
+            The number of (period, bucket) pairs recomputed
+        """
+        with self._write_lock, self._connection() as connection:
+            days = [date.fromisoformat(row["day"]) for row in connection.execute("SELECT day FROM rollup_dirty_days")]
+            if not days:
+                return 0
+
+            buckets = {(period, *bucket_bounds(period, day)) for period in ("day", "week", "month") for day in days}
+            for period, start, end in buckets:
+                connection.execute("DELETE FROM rollups WHERE period = ? AND bucket = ?", (period, start.isoformat()))
+                for dimension, key in _ROLLUP_KEYS.items():
+                    connection.execute(
+                        "INSERT INTO rollups (period, dimension, bucket, bucket_end, key, total, count)"
+                        f" SELECT ?, ?, ?, ?, {key}, SUM(amount), COUNT(*) FROM transactions"
+                        f" WHERE txn_date BETWEEN ? AND ? GROUP BY {key}",
+                        (period, dimension, start.isoformat(), end.isoformat(), start.isoformat(), end.isoformat()),
+                    )
+            connection.executemany(
+                "DELETE FROM rollup_dirty_days WHERE day = ?", [(day.isoformat(),) for day in days]
+            )
+            return len(buckets)
+
+    def get_rollups(
+        self, period: RollupPeriod, dimension: RollupDimension, start: date, end: date
+    ) -> list[sqlite3.Row]:
+        """
+        Returns the per-bucket totals of a dimension within a date window, oldest bucket first.
+
+        Buckets entirely inside the window are read from the pre-aggregated
+        rollups, and the partial buckets at the window's edges are aggregated
+        from the transactions within the window.
+
+        Args:
+            period: Bucket size: day, week or month
+            dimension: What to total by: category (primary), account or merchant
+            start: Start date of the window (inclusive)
+            end: End date of the window (inclusive)
+
+        Returns:
+            Rows with `bucket` (first day), `bucket_end`, `key` (primary category,
+            account id or merchant), `total` and `count`
+        """
+        self.refresh_rollups()
+        connection = self._connection()
+        rows = list(connection.execute(
+            "SELECT bucket, bucket_end, key, total, count FROM rollups"
+            " WHERE period = ? AND dimension = ? AND bucket >= ? AND bucket_end <= ?",
+            (period, dimension, start.isoformat(), end.isoformat()),
+        ))
+
+        key = _ROLLUP_KEYS[dimension]
+        for bucket_start, bucket_end in {bucket_bounds(period, start), bucket_bounds(period, end)}:
+            if start <= bucket_start and bucket_end <= end:
+                continue
+            rows.extend(connection.execute(
+                f"SELECT ? AS bucket, ? AS bucket_end, {key} AS key, SUM(amount) AS total, COUNT(*) AS count"
+                f" FROM transactions WHERE txn_date BETWEEN ? AND ? GROUP BY {key}",
+                (
+                    bucket_start.isoformat(), bucket_end.isoformat(),
+                    max(bucket_start, start).isoformat(), min(bucket_end, end).isoformat(),
+                ),
+            ))
+        return sorted(rows, key=lambda row: row["bucket"])
+
+    def get_account_names(self) -> dict[str, str]:
+        """
+        Returns the name of every stored account by account id.
+        """
+        return {
+            row["account_id"]: row["name"]
+            for row in self._connection().execute("SELECT account_id, name FROM accounts")
+        }
+
+    def iter_vendor_rows(self, start: date | None = None, end: date | None = None) -> Iterator[sqlite3.Row]:
+        """
+        Streams the id, date, merchant name and name of every stored transaction.
+
+        Args:
+            start: Optional start date of the transactions (inclusive)
+            end: Optional end date of the transactions (inclusive)
+        """
+        query = "SELECT transaction_id, txn_date, merchant_name, name FROM transactions"
+        if start is None and end is None:
+            yield from self._connection().execute(query)
+            return
+        yield from self._connection().execute(
+            query + " WHERE txn_date BETWEEN ? AND ?",
+            ((start or date.min).isoformat(), (end or date.max).isoformat()),
+        )
+
+    def iter_item_transactions(self, item_id: str) -> Iterator[sqlite3.Row]:
+        """
+        Streams the id, account, date, amount, names and primary category of an Item's posted transactions.
+        """
+        yield from self._connection().execute(
+            "SELECT transaction_id, account_id, txn_date, amount, merchant_name, name, category_primary"
+            " FROM transactions WHERE item_id = ? AND pending = 0",
+            (item_id,),
+        )
+
+
+# Global instance that can be imported anywhere, holding the current tenant's transactions
+transaction_store: TenantLocal[TransactionStore] = TenantLocal(
+    "transaction_store", lambda tenant: TransactionStore(get_tenant_storage(tenant).transactions_db)
+)
@@ -0,0 +1,235 @@
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import date
+
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.services.tenants import TenantLocal
+
+# Tokens that carry no information about who the vendor is
+_NOISE_TOKENS = frozenset({
+    "ach", "checkcard", "co", "com", "debit", "inc", "llc", "ltd", "pos", "purchase", "sq", "tst", "www",
+})
+_VOWELS = frozenset("aeiou")
+_TOKEN_SIMILARITY = 0.5
+# Shorter query tokens only match vendor tokens exactly, since e.g. "t" is a prefix of half the vendors
+_MIN_FUZZY_TOKEN_LENGTH = 3
+# Queries of up to this many tokens must match every token; longer ones at least half of them
+_SHORT_QUERY_TOKENS = 2
+
+
+def _words(text: str) -> list[list[str]]:
+    """The lowercase letter and digit tokens of each whitespace-separated word, e.g. "7-Eleven" -> ["7", "eleven"]."""
+    return [tokens for word in text.lower().split() if (tokens := re.findall(r"[a-z0-9]+", word))]
+
+
+def _is_noise(word: list[str]) -> bool:
+    """Whether a word says nothing about the vendor: a noise token such as POS or LLC, or a number such as "#123"."""
+    return all(token in _NOISE_TOKENS or token.isdigit() for token in word)
+
+
+def normalize_vendor(text: str) -> str:
+    """
+    Normalizes a merchant or transaction name for indexing.
+
+    Lowercases, splits words on punctuation (`#`, `*`, `-`) and drops words that
+    are only noise tokens or numbers, e.g. "SQ *BLUE BOTTLE #123" becomes
+    "blue bottle" while "7-Eleven" becomes "7 eleven" and "Co-op" "co op".
+    Names made only of such words keep them, so "76" stays searchable.
+    """
+    words = _words(text)
+    return " ".join(token for word in ([word for word in words if not _is_noise(word)] or words) for token in word)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _skeleton(token: str) -> str:
+    """First letter plus the remaining consonants, so that "amzn" and "amazon" agree."""
+    return token[0] + "".join(char for char in token[1:] if char not in _VOWELS)
+
+
+class VendorIndex:
+    """
+    Inverted index from vendor names to stored transactions.
+
+    Transactions are grouped by their normalized vendor (merchant name, or the
+    transaction name when Plaid has no merchant). Substring queries are answered
+    from trigram postings over the distinct vendors. Fuzzy queries additionally
+    match each query token to vendor tokens by prefix, by consonant skeleton
+    (abbreviations such as "AMZN") or by trigram similarity; tokens shorter
+    than three letters only match exactly.
+
+    Queries made only of noise words, e.g. "sq" or "76", would match too much
+    or nothing of the normalized vendors, so they are answered by a raw
+    substring scan of the transaction names within the window instead.
+
+    The index is built from the transaction store on first use and then kept up
+    to date with every sync applied to the store.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._vendor_ids: dict[str, int] = {}
+        self._vendors: list[str] = []
+        self._vendor_transactions: list[dict[str, str]] = []
+        self._transaction_vendor: dict[str, int] = {}
+        self._vendor_trigrams: dict[str, set[int]] = defaultdict(set)
+        self._token_vendors: dict[str, set[int]] = defaultdict(set)
+        self._vocabulary: list[str] = []
+        self._token_trigrams: dict[str, set[str]] = defaultdict(set)
+        self._skeletons: dict[str, set[str]] = defaultdict(set)
+        transaction_store.subscribe(self._on_sync)
+
+    def _ensure_built(self) -> None:
+        with self._lock:
+            if self._built:
+                return
+            for row in transaction_store.iter_vendor_rows():
+                self._add(row["transaction_id"], row["txn_date"], row["merchant_name"] or row["name"])
+            self._built = True
+
+    def _on_sync(self, upserted: Iterable[tuple[str, str, str]], removed: Iterable[str]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            for transaction_id in removed:
+                self._remove(transaction_id)
+            for transaction_id, txn_date, vendor in upserted:
+                self._remove(transaction_id)
+                self._add(transaction_id, txn_date, vendor)
+
+    def _vendor_id(self, vendor: str) -> int:
+        vendor_id = self._vendor_ids.get(vendor)
+        if vendor_id is not None:
+            return vendor_id
+
+        vendor_id = self._vendor_ids[vendor] = len(self._vendors)
+        self._vendors.append(vendor)
+        self._vendor_transactions.append({})
+        for trigram in _trigrams(vendor):
+            self._vendor_trigrams[trigram].add(vendor_id)
+        for token in vendor.split():
+            if token not in self._token_vendors:
+                bisect.insort(self._vocabulary, token)
+                for trigram in _trigrams(token):
+                    self._token_trigrams[trigram].add(token)
+                self._skeletons[_skeleton(token)].add(token)
+            self._token_vendors[token].add(vendor_id)
+        return vendor_id
+
+    def _add(self, transaction_id: str, txn_date: str, vendor: str) -> None:
+        vendor_id = self._vendor_id(normalize_vendor(vendor))
+        self._vendor_transactions[vendor_id][transaction_id] = txn_date
+        self._transaction_vendor[transaction_id] = vendor_id
+
+    def _remove(self, transaction_id: str) -> None:
+        vendor_id = self._transaction_vendor.pop(transaction_id, None)
+        if vendor_id is not None:
+            self._vendor_transactions[vendor_id].pop(transaction_id, None)
+
+    def _substring_vendors(self, query: str) -> set[int]:
+        if len(query) < 3:
+            # Too short to mean anything mid-word, so only words starting with the query match, e.g. "ub" -> "uber"
+            return {vendor_id for token in self._prefixed_tokens(query) for vendor_id in self._token_vendors[token]}
+
+        # Unpadded trigrams, since the query may start or end mid-word
+        postings = sorted(
+            (self._vendor_trigrams.get(query[i:i + 3], set()) for i in range(len(query) - 2)),
+            key=len,
+        )
+        candidates = postings[0].intersection(*postings[1:])
+        return {vendor_id for vendor_id in candidates if query in self._vendors[vendor_id]}
+
+    def _prefixed_tokens(self, prefix: str) -> Iterator[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(prefix):
+                break
+            yield candidate
+
+    def _similar_tokens(self, token: str) -> set[str]:
+        matches: set[str] = {token} if token in self._token_vendors else set()
+        if len(token) < _MIN_FUZZY_TOKEN_LENGTH:
+            return matches
+
+        # Prefix matches, e.g. "netfl" -> "netflix"
+        matches.update(self._prefixed_tokens(token))
+
+        # Abbreviations, e.g. "amzn" -> "amazon"
+        matches |= self._skeletons.get(_skeleton(token), set())
+
+        # Misspellings, by trigram similarity
+        token_trigrams = _trigrams(token)
+        overlaps: dict[str, int] = defaultdict(int)
+        for trigram in token_trigrams:
+            for candidate in self._token_trigrams.get(trigram, ()):
+                overlaps[candidate] += 1
+        for candidate, overlap in overlaps.items():
+            union = len(token_trigrams) + len(_trigrams(candidate)) - overlap
+            if overlap / union >= _TOKEN_SIMILARITY:
+                matches.add(candidate)
+        return matches
+
+    def _fuzzy_vendors(self, query: str) -> set[int]:
+        tokens = query.split()
+        matched_tokens: dict[int, int] = defaultdict(int)
+        for token in tokens:
+            vendor_ids: set[int] = set()
+            for similar in self._similar_tokens(token):
+                vendor_ids |= self._token_vendors[similar]
+            for vendor_id in vendor_ids:
+                matched_tokens[vendor_id] += 1
+
+        # Longer queries need only half of their tokens to match, so "amzn mktp us purchase" still finds "amazon"
+        required = len(tokens) if len(tokens) <= _SHORT_QUERY_TOKENS else math.ceil(len(tokens) / 2)
+        return {vendor_id for vendor_id, count in matched_tokens.items() if count >= required}
+
+    def _scan(self, text: str, start: date, end: date) -> list[str]:
+        if not text:
+            return []
+        return [
+            row["transaction_id"]
+            for row in transaction_store.iter_vendor_rows(start, end)
+            if text in (row["merchant_name"] or row["name"]).lower()
+        ]
+
+    def lookup(self, vendor: str, start: date, end: date, fuzzy: bool = False) -> list[str]:
+        """
+        Finds the stored transactions of a vendor within a date window.
+
+        Args:
+            vendor: The vendor to look up, e.g. "netflix" or "AMZN"
+            start: Start date of the window (inclusive)
+            end: End date of the window (inclusive)
+            fuzzy: Also match abbreviations and misspellings of the vendor
+
+        Returns:
+            The ids of the matching transactions
+        """
+        if all(_is_noise(word) for word in _words(vendor)):
+            return self._scan(vendor.lower().strip(), start, end)
+        query = normalize_vendor(vendor)
+
+        self._ensure_built()
+        start_date, end_date = start.isoformat(), end.isoformat()
+        with self._lock:
+            vendor_ids = self._substring_vendors(query)
+            if fuzzy:
+                vendor_ids |= self._fuzzy_vendors(query)
+            return [
+                transaction_id
+                for vendor_id in vendor_ids
+                for transaction_id, txn_date in self._vendor_transactions[vendor_id].items()
+                if start_date <= txn_date <= end_date
+            ]
+
+
+# Global instance that can be imported anywhere, one per tenant
+vendor_index: TenantLocal[VendorIndex] = TenantLocal("vendor_index", lambda tenant: VendorIndex())
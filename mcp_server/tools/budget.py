@@ -0,0 +1,127 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Iterable
+from functools import cache
+from typing import Any
+
+from mcp_server.tools.schemas.records import TransactionRecord
+from mcp_server.tools.schemas.tools import CompactPlaidTransaction, PlaidTransaction
+
+# Roughly 12k tokens of JSON per tool response
+DEFAULT_MAX_RESPONSE_BYTES = 48_000
+
+
+@cache
+def _fixed_size(full: bool) -> int:
+    """Serialized size of a transaction whose variable-length strings are all empty."""
+    model = CompactPlaidTransaction if not full else PlaidTransaction
+    fields: dict[str, Any] = {
+        "amount": -123456.78,
+        "merchant_name": "",
+        "name": "",
+        "txn_date": "2000-01-01",
+        "category": {"primary": "", "detailed": "", "confidence_level": "VERY_HIGH"},
+    }
+    if full:
+        fields |= {
+            "account_id": "",
+            "iso_currency_code": "USD",
+            "pending": False,
+            "authorized_date": "2000-01-01",
+            "authorized_datetime": "2000-01-01T00:00:00Z",
+            "txn_datetime": "2000-01-01T00:00:00Z",
+            "website": "",
+            "account_name": "",
+            "account_type": "",
+            "account_subtype": "",
+        }
+    return len(model(**fields).model_dump_json())
+
+
+def estimate_size(strings: Iterable[str | None], full: bool = False) -> int:
+    """
+    Estimates the serialized JSON size of a transaction without serializing it.
+
+    Args:
+        strings: The transaction's variable-length string fields
+        full: Estimate the full PlaidTransaction rather than the compact one
+
+    Returns:
+        The estimated size in bytes
+    """
+    return _fixed_size(full) + sum(len(string) for string in strings if string)
+
+
+def estimate_transaction_size(record: TransactionRecord, full: bool = False) -> int:
+    """
+    Estimates the serialized JSON size of a transaction record, see estimate_size.
+    """
+    strings = [record.name, record.merchant_name, record.category_primary, record.category_detailed]
+    if full:
+        strings += [record.account_id, record.website, record.account_name, record.account_type, record.account_subtype]
+    return estimate_size(strings, full)
+
+
+class ResponseBudget:
+    """
+    Tracks how many more bytes a tool response may grow by.
+
+    The first item always fits, so a paginated response always makes progress.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES):
+        self.remaining = max_bytes
+        self.used_any = False
+
+    def take(self, size: int) -> bool:
+        """
+        Reserves `size` bytes if they fit.
+
+        Returns:
+            Whether the item fits in the budget
+        """
+        if self.used_any and size > self.remaining:
+            return False
+        self.remaining -= size
+        self.used_any = True
+        return True
+
+
+def _fingerprint(query: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(query, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def encode_cursor(offset: int, query: dict[str, Any]) -> str:
+    """
+    Builds an opaque continuation cursor for the rows after `offset` of a query.
+
+    Args:
+        offset: Number of rows already returned
+        query: The query arguments the cursor is only valid for
+
+    Returns:
+        The cursor to pass back to the tool
+    """
+    payload = json.dumps({"offset": offset, "query": _fingerprint(query)}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None, query: dict[str, Any]) -> int:
+    """
+    Returns the offset a continuation cursor points at, or 0 without a cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for different query arguments
+    """
+    if not cursor:
+        return 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset, fingerprint = int(payload["offset"]), payload["query"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor, start again without a cursor")
+    if fingerprint != _fingerprint(query):
+        raise ValueError("The cursor belongs to a query with different arguments, start again without a cursor")
+    return offset
@@ -0,0 +1,183 @@
+import sqlite3
+from array import array
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+from datetime import date
+from typing import Generic, Literal, TypeVar
+
+from mcp_server.services import metrics
+from mcp_server.tools.budget import estimate_size
+from mcp_server.tools.schemas.io import compact_transaction
+from mcp_server.tools.schemas.tools import CompactPlaidTransaction
+
+V = TypeVar("V", bound=Hashable)
+
+UNCATEGORIZED = "Uncategorized"
+
+GroupColumn = Literal["account", "category", "merchant"]
+
+
+class DictionaryEncoder(Generic[V]):
+    """Maps repeated values to small integer codes."""
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: list[V] = []
+        self._codes: dict[V, int] = {}
+
+    def encode(self, value: V) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+@dataclass(frozen=True, slots=True)
+class GroupTotal:
+    key: str
+    total: float
+    count: int
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+
+class TransactionBatch:
+    """
+    Column-oriented batch of transactions for aggregations.
+
+    Amounts and date ordinals are stored in typed arrays, and accounts,
+    categories, merchants and names are dictionary encoded, so group-bys run in
+    one pass over integer codes instead of over per-row pydantic models. Models
+    are only built, with `compact`, for the rows that are actually returned.
+    """
+    __slots__ = (
+        "transaction_ids", "amounts", "dates", "accounts", "categories", "merchants", "names", "vendors",
+        "account_values", "category_values", "merchant_values", "name_values", "vendor_values",
+    )
+
+    def __init__(self):
+        self.transaction_ids: list[str] = []
+        self.amounts = array("d")
+        self.dates = array("l")
+        self.accounts = array("l")
+        self.categories = array("l")
+        self.merchants = array("l")
+        self.names = array("l")
+        # Merchant name, or the transaction name when Plaid has no merchant
+        self.vendors = array("l")
+        self.account_values: DictionaryEncoder[str] = DictionaryEncoder()
+        # (primary, detailed, confidence level), or None for uncategorized transactions
+        self.category_values: DictionaryEncoder[tuple[str, str | None, str | None] | None] = DictionaryEncoder()
+        self.merchant_values: DictionaryEncoder[str | None] = DictionaryEncoder()
+        self.name_values: DictionaryEncoder[str] = DictionaryEncoder()
+        self.vendor_values: DictionaryEncoder[str] = DictionaryEncoder()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[sqlite3.Row]) -> "TransactionBatch":
+        """
+        Builds a batch from transaction store rows, keeping their order.
+
+        The "parse.rows" span includes reading the rows, when they are streamed from the store.
+        """
+        batch = cls()
+        with metrics.span("parse.rows"):
+            for row in rows:
+                primary = row["category_primary"]
+                category = (primary, row["category_detailed"], row["category_confidence"]) if primary else None
+
+                batch.transaction_ids.append(row["transaction_id"])
+                batch.amounts.append(row["amount"])
+                batch.dates.append(date.fromisoformat(row["txn_date"]).toordinal())
+                batch.accounts.append(batch.account_values.encode(row["account_name"] or row["account_id"]))
+                batch.categories.append(batch.category_values.encode(category))
+                batch.merchants.append(batch.merchant_values.encode(row["merchant_name"]))
+                batch.names.append(batch.name_values.encode(row["name"]))
+                batch.vendors.append(batch.vendor_values.encode(row["merchant_name"] or row["name"]))
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def total(self) -> float:
+        return sum(self.amounts)
+
+    def date_range(self) -> tuple[date, date] | None:
+        if not self.dates:
+            return None
+        return date.fromordinal(min(self.dates)), date.fromordinal(max(self.dates))
+
+    def _group_labels(self, column: GroupColumn) -> tuple[array, list[str]]:
+        match column:
+            case "account":
+                return self.accounts, self.account_values.values
+            case "category":
+                labels = [category[0] if category else UNCATEGORIZED for category in self.category_values.values]
+                return self.categories, labels
+            case "merchant":
+                return self.vendors, self.vendor_values.values
+
+    def group_by(self, column: GroupColumn) -> list[GroupTotal]:
+        """
+        Sums and counts amounts per account, primary category or merchant.
+
+        Codes whose labels coincide (e.g. several detailed categories of one
+        primary category) are merged into one group.
+
+        Args:
+            column: The column to group by
+
+        Returns:
+            One total per group, in order of first appearance
+        """
+        with metrics.span("aggregate.group_by", column=column):
+            codes, labels = self._group_labels(column)
+            totals = [0.0] * len(labels)
+            counts = [0] * len(labels)
+            for code, amount in zip(codes, self.amounts):
+                totals[code] += amount
+                counts[code] += 1
+
+            groups: dict[str, list[float | int]] = {}
+            for label, total, count in zip(labels, totals, counts):
+                group = groups.setdefault(label, [0.0, 0])
+                group[0] += total
+                group[1] += count
+        return [GroupTotal(key=label, total=total, count=count) for label, (total, count) in groups.items()]
+
+    def indices_by(self, column: GroupColumn) -> dict[str, list[int]]:
+        """
+        Lists the row indices of each account, primary category or merchant group, in batch order.
+        """
+        with metrics.span("aggregate.indices_by", column=column):
+            codes, labels = self._group_labels(column)
+            indices: dict[str, list[int]] = {}
+            for index, code in enumerate(codes):
+                indices.setdefault(labels[code], []).append(index)
+        return indices
+
+    def estimate_size(self, index: int) -> int:
+        """
+        Estimates the serialized size of the compact model of one row.
+        """
+        category = self.category_values.values[self.categories[index]]
+        return estimate_size((
+            self.merchant_values.values[self.merchants[index]],
+            self.name_values.values[self.names[index]],
+            *(category[:2] if category else ()),
+        ))
+
+    def compact(self, index: int) -> CompactPlaidTransaction:
+        """
+        Builds the compact response model of one row.
+        """
+        category = self.category_values.values[self.categories[index]]
+        return compact_transaction(
+            self.amounts[index],
+            self.merchant_values.values[self.merchants[index]],
+            self.name_values.values[self.names[index]],
+            date.fromordinal(self.dates[index]),
+            *(category or (None, None, None)),
+        )
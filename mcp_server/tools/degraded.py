@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from mcp_server.services.health import item_health
+from mcp_server.storage.balances import balance_store
+from mcp_server.storage.item import item_storage
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.tools.schemas.io import DegradedItem
+
+def _timestamp(seconds: float | None) -> datetime | None:
+    return datetime.fromtimestamp(seconds).astimezone() if seconds else None
+
+def degraded_items() -> list[DegradedItem]:
+    """
+    The stored connections whose last Plaid request failed, for responses built without them.
+
+    Returns:
+        Per connection: the error, whether the user has to re-link it, when it will be
+        retried and how old its stored balances and transactions are
+    """
+    item_ids = {connection.item_id for connection in item_storage.get_items().values()}
+    return [
+        DegradedItem(
+            name=health.name,
+            item_id=health.item_id,
+            error_code=health.error_code,
+            error_message=health.error_message,
+            requires_user_action=health.requires_action,
+            consecutive_failures=health.failures,
+            failing_since=_timestamp(health.failing_since),
+            next_retry_at=_timestamp(health.next_probe_at),
+            balances_as_of=_timestamp(balance_store.observed_at(health.item_id)),
+            transactions_synced_at=_timestamp(transaction_store.get_cursor(health.item_id)[1]),
+        )
+        for health in item_health.degraded()
+        if health.item_id in item_ids
+    ]
@@ -1,17 +1,31 @@
+import sqlite3
+
+from mcp_server.storage.balances import balance_store
+from mcp_server.storage.cache import TTLCache
 from mcp_server.storage.item import item_storage
+from mcp_server.services import metrics
+from mcp_server.services.concurrency import fan_out
+from mcp_server.services.health import is_item_error, item_health
 from mcp_server.services.plaid.client import plaid_client
-from plaid.model.accounts_get_request import AccountsGetRequest
+from mcp_server.services.tenants import TenantLocal
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.schemas.io import GetAllItemsResponse
 from mcp_server.tools.schemas.tools import PlaidAccount, PlaidBalance, PlaidItem
+from mcp_server.tools.schemas.util import PlaidConnection
+
+# accounts_get results per connection name, per tenant. Entries older than 10 minutes
+# are refreshed in the background, entries older than 30 minutes are never served.
+account_cache: TenantLocal[TTLCache[str, PlaidItem]] = TenantLocal(
+    "account_cache", lambda tenant: TTLCache(maxsize=128, ttl=30 * 60, refresh_after=10 * 60)
+)
 
 def get_item_by_name(name: str) -> PlaidItem:
     """
     Retrieves a list of financial accounts.
     
-    This function would normally connect to Plaid to fetch real account data,
-    but for demonstration purposes, it returns dummy data.
-    
-    The response is cached per item_id using an LRU cache with max size of 128 items
-    and a 30 minute TTL.
+    The response is cached per connection using an LRU cache with max size of 128 items
+    and a 30 minute TTL. Entries older than 10 minutes are served while being refreshed
+    in the background.
     
     Args:
         name: Optional name for a specific financial connection. This is what the name is saved as in the ttyf-cli
@@ -19,43 +33,115 @@ def get_item_by_name(name: str) -> PlaidItem:
     Returns:
         A list of account objects containing account details
     """
+    return account_cache.get_or_load(name, _fetch_item)
+
+def refresh_item(name: str) -> PlaidItem:
+    """
+    Fetches the accounts of a connection from Plaid and replaces its cache entry.
+
+    Args:
+        name: The name of the connection to refresh
+    """
+    item = _fetch_item(name)
+    account_cache.put(name, item)
+    return item
+
+def invalidate_item_cache(name: str | None = None) -> None:
+    """
+    Drops the cached accounts of a connection, or of every connection when no name is given.
+
+    Args:
+        name: Optional name of the connection to invalidate
+    """
+    account_cache.invalidate(name)
+
+def _fetch_item(name: str) -> PlaidItem:
+    from plaid.model.accounts_get_request import AccountsGetRequest
+
     connection = item_storage.get_item(name)
     request = AccountsGetRequest(access_token=connection.access_token)
-    item = plaid_client.client.accounts_get(request).to_dict()
-    if item is None:
+    with item_health.guard(connection.item_id, name):
+        response = plaid_client.call("accounts_get", request)
+    if response is None:
         return PlaidItem(name=name, accounts=[], access_token=None, item_id=None)
 
-    parsed_accounts: list[PlaidAccount] = [
-        PlaidAccount(
-            account_id=account['account_id'],
-            name=account['name'],
-            mask=account['mask'],
-            type=str(account['type']),
-            subtype=str(account['subtype']),
-            balances=PlaidBalance(
-                available=account['balances']['available'],
-                current=account['balances']['current'],
-                limit=account['balances']['limit'],
-                iso_currency_code=account['balances']['iso_currency_code'],
-            ),
-            holder_category=account['holder_category'] if 'holder_category' in account else None,
-            official_name=account['official_name'] if 'official_name' in account else None,
-        )
-        for account in item['accounts']
-    ]
-
-
-    return PlaidItem(name=name, accounts=parsed_accounts, access_token=connection.access_token, item_id=connection.item_id)
-
-def get_all_items() -> list[PlaidItem]:
+    with metrics.span("parse.accounts_get"):
+        item = response.to_dict()
+        parsed_accounts: list[PlaidAccount] = [
+            PlaidAccount(
+                account_id=account['account_id'],
+                name=account['name'],
+                mask=account['mask'],
+                type=str(account['type']),
+                subtype=str(account['subtype']),
+                balances=PlaidBalance(
+                    available=account['balances']['available'],
+                    current=account['balances']['current'],
+                    limit=account['balances']['limit'],
+                    iso_currency_code=account['balances']['iso_currency_code'],
+                ),
+                holder_category=account['holder_category'] if 'holder_category' in account else None,
+                official_name=account['official_name'] if 'official_name' in account else None,
+            )
+            for account in item['accounts']
+        ]
+
+    plaid_item = PlaidItem(name=name, accounts=parsed_accounts, access_token=connection.access_token, item_id=connection.item_id)
+    balance_store.record(plaid_item)
+    return plaid_item
+
+def account_from_snapshot(row: sqlite3.Row) -> PlaidAccount:
+    """
+    Rebuilds an account from its latest row in the balance snapshot store.
+    """
+    return PlaidAccount(
+        account_id=row["account_id"],
+        name=row["name"],
+        mask=row["mask"],
+        type=row["type"],
+        subtype=row["subtype"],
+        official_name=row["official_name"],
+        holder_category=row["holder_category"],
+        balances=PlaidBalance(
+            current=row["current"],
+            available=row["available"],
+            limit=row["credit_limit"],
+            iso_currency_code=row["iso_currency_code"],
+        ),
+    )
+
+def _item_or_last_known(connection: PlaidConnection) -> PlaidItem | None:
+    """The connection's accounts, or their last recorded balances if Plaid cannot be reached for it."""
+    try:
+        return get_item_by_name(connection.name)
+    except Exception as error:
+        if not is_item_error(error):
+            raise
+    accounts = [account_from_snapshot(row) for row in balance_store.latest([connection.item_id])]
+    if not accounts:
+        return None
+    return PlaidItem(name=connection.name, accounts=accounts, access_token=connection.access_token, item_id=connection.item_id)
+
+def fetch_all_items() -> list[PlaidItem]:
+    """
+    Fetches the accounts of every connection concurrently, in storage order.
+
+    Connections that fail, or whose circuit is open after an earlier failure,
+    are answered with their last recorded balances, or left out if none were
+    ever recorded. See degraded_items for which connections those are.
+    """
+    connections = list(item_storage.get_items().values())
+    items = fan_out(_item_or_last_known, connections)
+    return [item for item in items if item is not None]
+
+def get_all_items() -> GetAllItemsResponse:
     """
     Retrieves all financial accounts from all connections.
     
     This function fetches all accounts from all connections stored in the item storage.
+    Connections are fetched concurrently and returned in storage order.
+    Connections that cannot be reached are listed in `degraded_items`, and their
+    accounts carry the last recorded balances, if any.
     """
-    items = item_storage.get_items()
-    accs = []
-    for item in items.values():
-        accs.append(get_item_by_name(item.name))
-    return accs
-
+    items = fetch_all_items()
+    return GetAllItemsResponse(items=items, degraded_items=degraded_items())
@@ -1,69 +1,83 @@
-from collections import defaultdict
+import heapq
+from typing import Literal
 
-from mcp_server.tools.get_transactions import get_all_transactions
-from mcp_server.tools.schemas.tools import PlaidTransaction
+from mcp_server.tools.budget import DEFAULT_MAX_RESPONSE_BYTES, ResponseBudget
+from mcp_server.tools.columnar import TransactionBatch
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.get_transactions import iter_transaction_rows
 from mcp_server.tools.schemas.io import CategorizedSummary, CategorySummary 
 from mcp_server.tools.schemas.util import DateRange
 
 def get_categorized_summary(
     start_date: str,
     end_date: str,
+    transactions: Literal["none", "top", "all"] = "all",
+    top_n: int = 5,
+    max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
 ) -> CategorizedSummary:
     """
     Get a categorized summary of transactions within a date range.
+
+    Totals, counts and averages always cover every transaction. Which
+    transactions are listed per category is controlled by `transactions`, and
+    the listed transactions are cut off once they no longer fit in `max_bytes`
+    (reported by `transactions_truncated`). Use query_transactions to page
+    through the transactions of a single category.
     
     Args:
         start_date: Start date in ISO format (YYYY-MM-DD)
         end_date: End date in ISO format (YYYY-MM-DD)
+        transactions: "all" for every transaction, most recent first (the default, within
+            `max_bytes`), "top" for the `top_n` largest (by absolute amount) transactions
+            per category, or "none" for totals only
+        top_n: Number of transactions listed per category with transactions="top"
+        max_bytes: Approximate maximum size of the listed transactions in bytes
         
     Returns:
         CategorizedSummary object containing transaction summaries by category
     """
-    # Get all transactions
-    transactions_response = get_all_transactions(start_date=start_date, end_date=end_date)
-    transactions = transactions_response.transactions
-    
-    # Initialize category dictionaries
-    category_transactions = defaultdict(list[PlaidTransaction])
-    category_totals = defaultdict(float)
-    category_counts = defaultdict(int)
+    # Get all transactions, most recent first
+    batch = TransactionBatch.from_rows(iter_transaction_rows(start_date=start_date, end_date=end_date))
     
-    # Process each transaction
-    for txn in transactions:
-        # Use personal finance category if available, otherwise use merchant name
-        category = txn.category.primary if txn.category else "Uncategorized"
-        
-        # Add transaction to category
-        category_transactions[category].append(txn)
-        
-        # Update category totals
-        category_totals[category] += txn.amount
-        category_counts[category] += 1
+    # Group row indices by category (primary category, or Uncategorized), keeping the date order
+    category_indices = batch.indices_by("category") if transactions != "none" else {}
     
-    # Create category summaries
+    # Create category summaries, giving the largest categories the first share of the budget
+    budget = ResponseBudget(max_bytes)
+    truncated = False
     category_summaries = {}
-    for category, transactions_in_category in category_transactions.items():
-        # Sort transactions by date (most recent first)
-        sorted_transactions = sorted(transactions_in_category, key=lambda x: x.txn_date, reverse=True)
-        
-        # Create category summary
-        category_summaries[category] = CategorySummary(
-            total_amount=round(category_totals[category], 2),
-            transaction_count=category_counts[category],
-            average_transaction=round(category_totals[category] / category_counts[category], 2),
-            transactions=sorted_transactions
+    for group in sorted(batch.group_by("category"), key=lambda group: group.total, reverse=True):
+        indices = category_indices.get(group.key, [])
+        if transactions == "top":
+            indices = heapq.nlargest(max(top_n, 0), indices, key=lambda index: abs(batch.amounts[index]))
+
+        listed = []
+        for index in indices:
+            if not budget.take(batch.estimate_size(index)):
+                truncated = True
+                break
+            listed.append(batch.compact(index))
+
+        category_summaries[group.key] = CategorySummary(
+            total_amount=round(group.total, 2),
+            transaction_count=group.count,
+            average_transaction=round(group.mean, 2),
+            transactions=listed
         )
     
     # Create date range
+    dates = batch.date_range()
     date_range = DateRange(
-        start_date=min(txn.txn_date for txn in transactions) if transactions else start_date,
-        end_date=max(txn.txn_date for txn in transactions) if transactions else end_date
+        start_date=dates[0] if dates else start_date,
+        end_date=dates[1] if dates else end_date
     )
     
     # Create and return final summary
     return CategorizedSummary(
         categories=category_summaries,
-        total_transactions=len(transactions),
-        total_amount=round(sum(txn.amount for txn in transactions), 2),
-        date_range=date_range
+        total_transactions=len(batch),
+        total_amount=round(batch.total(), 2),
+        date_range=date_range,
+        transactions_truncated=truncated,
+        degraded_items=degraded_items(),
     )
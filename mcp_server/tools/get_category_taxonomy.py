@@ -1,28 +1,29 @@
+from functools import cache
 
-
-import os
-from csv import DictReader
-
+from mcp_server.storage.taxonomy import get_taxonomy, sub_category
 from mcp_server.tools.schemas.io import CategoryTaxonomy
 
-def get_category_taxonomy() -> list[CategoryTaxonomy]:
+def get_category_taxonomy(primary_category: str | None = None) -> list[CategoryTaxonomy]:
     """
-    Retrieves the category taxonomy from the Plaid API.
+    Retrieves the Plaid personal finance category taxonomy.
+
+    Args:
+        primary_category: Optional primary category to list the sub-categories of, e.g. FOOD_AND_DRINK
     
     Returns:
         list[CategoryTaxonomy]: A list of category taxonomies.
     """
+    return list(_taxonomy_models(primary_category.strip().upper() if primary_category else None))
 
-    category_taxonomy: list[CategoryTaxonomy] = []
-    file_path = os.path.join(os.path.dirname(__file__), "../storage/static/plaid_categories.csv")
-
-    with open(file_path, "r") as file:
-        reader = DictReader(file)
-        for row in reader:
-            category_taxonomy.append(CategoryTaxonomy(
-                primary_category=row["PRIMARY"],
-                sub_category=row["DETAILED"].replace(f"{row['PRIMARY']}_", ""),
-                description=row["DESCRIPTION"]
-            ))
-
-    return category_taxonomy
\ No newline at end of file
+@cache
+def _taxonomy_models(primary_category: str | None) -> tuple[CategoryTaxonomy, ...]:
+    taxonomy = get_taxonomy()
+    detailed = taxonomy.resolve(primary_category) if primary_category else taxonomy.primary_by_detailed
+    return tuple(
+        CategoryTaxonomy(
+            primary_category=taxonomy.primary_by_detailed[category],
+            sub_category=sub_category(taxonomy.primary_by_detailed[category], category),
+            description=taxonomy.descriptions[category],
+        )
+        for category in detailed
+    )
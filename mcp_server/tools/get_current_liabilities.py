@@ -1,5 +1,6 @@
 from mcp_server.enums.plaid import PlaidAccountSubtype, PlaidAccountType
-from mcp_server.tools.get_accounts import get_all_items
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.get_accounts import fetch_all_items
 from mcp_server.tools.schemas.io import CreditCardBreakdown, GetCurrentLiabilitiesResponse, LoanBreakdown
 from mcp_server.tools.schemas.tools import PlaidCreditCard, PlaidLoan
 
@@ -18,7 +19,7 @@ def get_current_liabilities() -> GetCurrentLiabilitiesResponse:
         A dictionary containing liability information grouped by type
     """
     # Get accounts using the global get_accounts function
-    items = get_all_items()
+    items = fetch_all_items()
     
     # Filter and categorize liabilities
     credit_card_liabilities: list[PlaidCreditCard] = []
@@ -77,5 +78,6 @@ def get_current_liabilities() -> GetCurrentLiabilitiesResponse:
             accounts=loan_liabilities,
             total=total_loan
         ),
-        total_liabilities=total_liabilities
+        total_liabilities=total_liabilities,
+        degraded_items=degraded_items(),
     )
\ No newline at end of file
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from mcp_server.services.health import item_health
+from mcp_server.services.scheduler import refresh_scheduler
+from mcp_server.services.tenants import current_tenant
+from mcp_server.storage.balances import balance_store
+from mcp_server.storage.item import item_storage
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.tools.schemas.io import DataFreshnessResponse, ItemFreshness
+
+def _timestamp(seconds: float | None) -> datetime | None:
+    return datetime.fromtimestamp(seconds).astimezone() if seconds is not None else None
+
+def get_data_freshness() -> DataFreshnessResponse:
+    """
+    Reports how current the locally stored data of every financial connection of the current tenant is.
+
+    Use this to tell the user how up to date balances and transactions are,
+    or why a connection's data is stale.
+
+    Returns:
+        Per connection: when balances were last observed, when transactions were
+        last synced, the last background refresh error, the next scheduled refresh and
+        whether Plaid requests are being skipped after a failure
+    """
+    states = {state.item_id: state for state in refresh_scheduler.states()}
+    items = []
+    for connection in item_storage.get_items().values():
+        state = states.get(connection.item_id)
+        health = item_health.get(connection.item_id)
+        items.append(ItemFreshness(
+            name=connection.name,
+            item_id=connection.item_id,
+            balances_as_of=_timestamp(balance_store.observed_at(connection.item_id)),
+            transactions_synced_at=_timestamp(transaction_store.get_cursor(connection.item_id)[1]),
+            last_refresh_error=state.last_error if state else None,
+            consecutive_failures=state.failures if state else 0,
+            next_refresh_at=_timestamp(state.next_run_at) if state and refresh_scheduler.running else None,
+            unavailable=health is not None and not health.healthy,
+            requires_user_action=health is not None and health.requires_action,
+        ))
+
+    return DataFreshnessResponse(
+        tenant=current_tenant(),
+        background_refresh=refresh_scheduler.running,
+        refresh_interval_seconds=refresh_scheduler.settings.interval_seconds,
+        items=items,
+    )
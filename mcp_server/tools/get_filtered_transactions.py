@@ -1,12 +1,19 @@
+from datetime import datetime
+
+from mcp_server.services.plaid.sync import sync_all_transactions
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.storage.vendor_index import normalize_vendor, vendor_index
 from mcp_server.tools.constants import DEFAULT_DATE_RANGE
-from mcp_server.tools.get_transactions import get_all_transactions
-from mcp_server.tools.schemas.io import GetAllTransactionsResponse
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.schemas.io import GetTransactionsByVendorResponse, to_transaction
+from mcp_server.tools.schemas.records import TransactionRecord
 
 def get_transactions_by_vendor(
     vendor: str,
     start_date: str = DEFAULT_DATE_RANGE.start_date.strftime("%Y-%m-%d"),
     end_date: str = DEFAULT_DATE_RANGE.end_date.strftime("%Y-%m-%d"),
-) -> GetAllTransactionsResponse:
+    fuzzy: bool = False,
+) -> GetTransactionsByVendorResponse:
     """
     Get all transactions by vendor
 
@@ -14,27 +21,26 @@ def get_transactions_by_vendor(
         vendor: The vendor to filter by
         start_date: The start date to filter by (YYYY-MM-DD)
         end_date: The end date to filter by (YYYY-MM-DD)
+        fuzzy: Also match abbreviations and misspellings of the vendor (e.g. "AMZN" or "amazn" for "Amazon")
 
     Returns:
-        A list of transactions
+        A list of transactions, and the vendors they were matched to
     """
-    all_transactions = get_all_transactions(
-        start_date=start_date,
-        end_date=end_date
-    )
-
-    cleaned_vendor = vendor.lower().strip()
-    txn_vendor = lambda txn: txn.merchant_name.lower() if txn.merchant_name else txn.name.lower()
+    sync_all_transactions()
 
-    filtered_transactions = [
-        txn for txn in all_transactions.transactions
-        if cleaned_vendor in txn_vendor(txn)
-    ]
+    transaction_ids = vendor_index.lookup(
+        vendor,
+        start=datetime.strptime(start_date, "%Y-%m-%d").date(),
+        end=datetime.strptime(end_date, "%Y-%m-%d").date(),
+        fuzzy=fuzzy,
+    )
+    records = [TransactionRecord.from_row(row) for row in transaction_store.get_transactions(transaction_ids)]
 
-    return GetAllTransactionsResponse(
-        transactions=filtered_transactions,
-        total_transactions=len(filtered_transactions),
-        total_amount=sum(txn.amount for txn in filtered_transactions)
+    return GetTransactionsByVendorResponse(
+        transactions=[to_transaction(record) for record in records],
+        total_transactions=len(records),
+        total_amount=sum(record.amount for record in records),
+        matched_vendors=sorted({normalize_vendor(record.vendor) for record in records}),
+        degraded_items=degraded_items(),
     )
     
-
@@ -1,8 +1,26 @@
+import time
+from datetime import date, datetime, timedelta
 from typing import Any
 from mcp_server.enums.plaid import PlaidAccountType
-from mcp_server.tools.get_accounts import get_all_items
-from mcp_server.tools.schemas.io import GetNetWorthResponse, NetWorthAssetBreakdown, NetWorthLiabilityBreakdown
+from mcp_server.storage.balances import balance_store
+from mcp_server.storage.item import item_storage
+from mcp_server.storage.transactions import RollupPeriod, bucket_bounds
+from mcp_server.tools.constants import DEFAULT_DATE_RANGE
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.get_accounts import account_from_snapshot, fetch_all_items
+from mcp_server.tools.schemas.io import (
+    AccountBalanceHistory,
+    BalanceHistoryResponse,
+    BalanceSnapshot,
+    GetNetWorthResponse,
+    NetWorthAssetBreakdown,
+    NetWorthHistoryResponse,
+    NetWorthLiabilityBreakdown,
+    NetWorthPoint,
+)
 from mcp_server.tools.schemas.tools import PlaidAccount
+from mcp_server.tools.schemas.util import DateRange
+from mcp_server.utils import get_net_worth_vars
 
 def _is_liability(account_type: str) -> bool:
     return account_type == PlaidAccountType.CREDIT.value or account_type == PlaidAccountType.LOAN.value
@@ -10,30 +28,57 @@ def _is_liability(account_type: str) -> bool:
 def _is_asset(account_type: str) -> bool:
     return account_type == PlaidAccountType.DEPOSITORY.value or account_type == PlaidAccountType.INVESTMENT.value
 
-def get_net_worth() -> GetNetWorthResponse:
+def _snapshot_accounts(max_age_seconds: float) -> tuple[list[PlaidAccount], float] | None:
+    """The latest snapshot of every connection's accounts and when the oldest was observed, if all are fresh enough."""
+    item_ids = [connection.item_id for connection in item_storage.get_items().values()]
+    observed = [balance_store.observed_at(item_id) for item_id in item_ids]
+    if not item_ids or any(observed_at is None or time.time() - observed_at > max_age_seconds for observed_at in observed):
+        return None
+    return [account_from_snapshot(row) for row in balance_store.latest(item_ids)], min(observed)
+
+def get_net_worth(max_snapshot_age_minutes: float | None = None) -> GetNetWorthResponse:
     """
     Calculates total net worth by summing assets and subtracting liabilities. 
     This is the only tool that you need to get net worth.
+
+    Balances recorded within the last `max_snapshot_age_minutes` are answered
+    from the local snapshot store, with `as_of` set to when they were observed.
+    Otherwise the balances come from accounts_get, which also records a new snapshot.
+    Connections that cannot be reached count with their last recorded balances
+    and are listed in `degraded_items`.
+
+    Args:
+        max_snapshot_age_minutes: Maximum age of stored balances to use, defaults to
+            NET_WORTH_SNAPSHOT_MAX_AGE_SECONDS. Pass 0 to always fetch live balances.
     
     Returns:
         A dictionary containing net worth information, including total assets,
         total liabilities, and overall net worth
     """   
-    items = get_all_items()
+    if max_snapshot_age_minutes is None:
+        max_age_seconds = get_net_worth_vars().snapshot_max_age_seconds
+    else:
+        max_age_seconds = max_snapshot_age_minutes * 60
+    snapshot = _snapshot_accounts(max_age_seconds) if max_age_seconds > 0 else None
+    if snapshot is not None:
+        accounts, observed_at = snapshot
+        as_of = datetime.fromtimestamp(observed_at).astimezone()
+    else:
+        accounts = [account for item in fetch_all_items() for account in item.accounts]
+        as_of = None
     
     # Calculate assets (positive balances) and liabilities (negative or credit accounts)
     assets: list[PlaidAccount] = []
     liabilities: list[PlaidAccount] = []
     
-    for item in items:
-        for account in item.accounts:
-            account_type = account.type
-
-            match account_type:
-                case _ if _is_liability(account_type):
-                    liabilities.append(account)
-                case _ if _is_asset(account_type):
-                    assets.append(account)
+    for account in accounts:
+        account_type = account.type
+
+        match account_type:
+            case _ if _is_liability(account_type):
+                liabilities.append(account)
+            case _ if _is_asset(account_type):
+                assets.append(account)
         
     # Calculate totals
     total_assets = sum(asset.balances.current for asset in assets)
@@ -49,5 +94,127 @@ def get_net_worth() -> GetNetWorthResponse:
             accounts=liabilities,
             total=total_liabilities
         ),
-        net_worth=net_worth
-    )
\ No newline at end of file
+        net_worth=net_worth,
+        as_of=as_of,
+        degraded_items=degraded_items(),
+    )
+
+def _end_of_day(day: date) -> float:
+    return datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+
+def get_net_worth_history(
+    start_date: str = DEFAULT_DATE_RANGE.start_date.isoformat(),
+    end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
+    period: RollupPeriod = "day",
+) -> NetWorthHistoryResponse:
+    """
+    Net worth over time, from the balances recorded locally whenever accounts were fetched.
+
+    Plaid is not called. Each point uses every account's latest recorded
+    balance at the end of its day, week or month, so history only goes back to
+    when balances were first recorded. Accounts count until their Item was
+    first observed without them, and only Items that are still connected count,
+    so the latest point agrees with get_net_worth.
+
+    Args:
+        start_date: Start date in ISO format (YYYY-MM-DD)
+        end_date: End date in ISO format (YYYY-MM-DD)
+        period: One point per day, week or month
+
+    Returns:
+        Total assets, total liabilities and net worth at the end of each period, oldest first
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    connected = {connection.item_id for connection in item_storage.get_items().values()}
+    accounts = {row["account_id"]: row for row in balance_store.get_accounts() if row["item_id"] in connected}
+
+    # One pass over the snapshots, carrying every account's latest balance forward
+    balances: dict[str, float] = {}
+    snapshots = balance_store.iter_snapshots(_end_of_day(end), account_ids=accounts)
+    pending = next(snapshots, None)
+    points: list[NetWorthPoint] = []
+    day = start
+    while day <= end:
+        point_date = min(bucket_bounds(period, day)[1], end)
+        cutoff = _end_of_day(point_date)
+        while pending is not None and pending["taken_at"] < cutoff:
+            balances[pending["account_id"]] = pending["current"] or 0.0
+            pending = next(snapshots, None)
+
+        # Accounts leave their Item's balances once an observation of the Item no longer has them
+        current = [
+            (accounts[account_id]["type"], balance)
+            for account_id, balance in balances.items()
+            if accounts[account_id]["removed_at"] is None or accounts[account_id]["removed_at"] >= cutoff
+        ]
+        if current:
+            assets = sum(balance for account_type, balance in current if _is_asset(account_type))
+            liabilities = sum(balance for account_type, balance in current if _is_liability(account_type))
+            points.append(NetWorthPoint(
+                date=point_date,
+                total_assets=round(assets, 2),
+                total_liabilities=round(liabilities, 2),
+                net_worth=round(assets - liabilities, 2),
+            ))
+        day = point_date + timedelta(days=1)
+
+    return NetWorthHistoryResponse(
+        period=period,
+        date_range=DateRange(start_date=start, end_date=end),
+        points=points,
+    )
+
+def get_balance_history(
+    start_date: str = DEFAULT_DATE_RANGE.start_date.isoformat(),
+    end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
+    account_ids: list[str] | None = None,
+) -> BalanceHistoryResponse:
+    """
+    Balance changes per account, from the balances recorded locally whenever accounts were fetched.
+
+    Plaid is not called. Each account's first snapshot is its balance as of the
+    start date (recorded on or before it), followed by every change up to the end date.
+
+    Args:
+        start_date: Start date in ISO format (YYYY-MM-DD)
+        end_date: End date in ISO format (YYYY-MM-DD)
+        account_ids: Optional accounts to restrict the history to
+
+    Returns:
+        The balance snapshots of each account, oldest first
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    start_time = datetime.combine(start, datetime.min.time()).timestamp()
+
+    snapshots: dict[str, list[BalanceSnapshot]] = {}
+    for row in balance_store.iter_snapshots(_end_of_day(end), account_ids=account_ids):
+        snapshot = BalanceSnapshot(
+            taken_at=datetime.fromtimestamp(row["taken_at"]).astimezone(),
+            current=row["current"],
+            available=row["available"],
+            limit=row["credit_limit"],
+        )
+        history = snapshots.setdefault(row["account_id"], [])
+        if row["taken_at"] < start_time:
+            # Only the latest snapshot before the window is kept, as the starting balance
+            history[:] = [snapshot]
+        else:
+            history.append(snapshot)
+
+    return BalanceHistoryResponse(
+        date_range=DateRange(start_date=start, end_date=end),
+        accounts=[
+            AccountBalanceHistory(
+                account_id=account["account_id"],
+                name=account["name"],
+                item_name=account["item_name"],
+                type=account["type"],
+                subtype=account["subtype"],
+                snapshots=snapshots[account["account_id"]],
+            )
+            for account in balance_store.get_accounts()
+            if account["account_id"] in snapshots
+        ],
+    )
@@ -0,0 +1,68 @@
+from datetime import date
+
+from mcp_server.services.plaid.sync import sync_all_transactions
+from mcp_server.storage.item import item_storage
+from mcp_server.storage.recurring import recurring_index
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.schemas.io import RecurringTransaction, RecurringTransactionsResponse
+
+def get_recurring_transactions(
+    include_income: bool = False,
+    include_inactive: bool = False,
+) -> RecurringTransactionsResponse:
+    """
+    Finds recurring charges such as subscriptions, memberships and bills, and optionally recurring income.
+
+    Use this tool for questions like "what are my subscriptions?" instead of
+    looking up vendors one by one. Transactions of each vendor are checked for
+    a weekly, biweekly, monthly, quarterly or annual rhythm across the whole
+    stored history. Positive amounts are money leaving the account. Fixed-amount
+    series are typically subscriptions, varying ones are typically bills.
+
+    Args:
+        include_income: Also list recurring deposits such as paychecks
+        include_inactive: Also list series whose charges have stopped, e.g. cancelled subscriptions
+
+    Returns:
+        The recurring series, largest monthly amount first, with the total monthly outflow and inflow of all active series
+    """
+    sync_all_transactions()
+
+    today = date.today()
+    names = transaction_store.get_account_names()
+    recurring = []
+    monthly_outflow = monthly_inflow = 0.0
+    for connection in item_storage.get_items().values():
+        for series in recurring_index.get(connection.item_id):
+            active = series.is_active(today)
+            if active and series.average_amount > 0:
+                monthly_outflow += series.monthly_amount
+            elif active:
+                monthly_inflow -= series.monthly_amount
+            if (series.average_amount < 0 and not include_income) or (not active and not include_inactive):
+                continue
+            recurring.append(RecurringTransaction(
+                vendor=series.vendor,
+                item_name=connection.name,
+                accounts=[names.get(account_id, account_id) for account_id in series.account_ids],
+                category=series.category,
+                frequency=series.frequency,
+                average_amount=round(series.average_amount, 2),
+                last_amount=series.last_amount,
+                fixed_amount=series.fixed_amount,
+                monthly_amount=round(series.monthly_amount, 2),
+                occurrences=series.occurrences,
+                first_date=series.first_date,
+                last_date=series.last_date,
+                next_expected_date=series.next_expected_date if active else None,
+                active=active,
+            ))
+
+    recurring.sort(key=lambda transaction: abs(transaction.monthly_amount), reverse=True)
+    return RecurringTransactionsResponse(
+        recurring=recurring,
+        monthly_outflow=round(monthly_outflow, 2),
+        monthly_inflow=round(monthly_inflow, 2),
+        degraded_items=degraded_items(),
+    )
@@ -0,0 +1,76 @@
+from datetime import date, datetime
+from itertools import groupby
+
+from mcp_server.services import metrics
+from mcp_server.services.plaid.sync import sync_all_transactions
+from mcp_server.storage.transactions import RollupDimension, RollupPeriod, transaction_store
+from mcp_server.tools.constants import DEFAULT_DATE_RANGE
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.schemas.io import RollupBucket, RollupGroup, SpendingRollupResponse
+from mcp_server.tools.schemas.util import DateRange
+
+OTHER = "Other"
+
+def get_spending_rollup(
+    start_date: str = DEFAULT_DATE_RANGE.start_date.isoformat(),
+    end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
+    period: RollupPeriod = "month",
+    group_by: RollupDimension = "category",
+    top_n: int = 10,
+) -> SpendingRollupResponse:
+    """
+    Totals transactions per day, week or month, broken down by category, account or merchant.
+
+    Use this tool for trends over time (e.g. monthly spending per category over
+    two years) instead of fetching every transaction. Positive amounts are money
+    leaving the account. Weeks run Monday to Sunday, and the first and last
+    buckets only cover the part of them inside the date range.
+
+    Args:
+        start_date: Start date in ISO format (YYYY-MM-DD)
+        end_date: End date in ISO format (YYYY-MM-DD)
+        period: Bucket size: day, week or month
+        group_by: Break each bucket down by primary category, account or merchant
+        top_n: Number of largest groups listed per bucket, the rest are summed up as "Other"
+
+    Returns:
+        One bucket per period that has transactions, oldest first, each with its total and largest groups
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    sync_all_transactions()
+
+    with metrics.span("aggregate.rollups", period=period, group_by=group_by):
+        rows = transaction_store.get_rollups(period, group_by, start, end)
+    names = transaction_store.get_account_names() if group_by == "account" else {}
+
+    buckets = []
+    for (bucket_start, bucket_end), bucket_rows in groupby(rows, key=lambda row: (row["bucket"], row["bucket_end"])):
+        groups = sorted(
+            (RollupGroup(key=names.get(row["key"], row["key"]), total_amount=round(row["total"], 2), transaction_count=row["count"])
+             for row in bucket_rows),
+            key=lambda group: abs(group.total_amount),
+            reverse=True,
+        )
+        listed, rest = groups[:max(top_n, 0)], groups[max(top_n, 0):]
+        if rest:
+            listed.append(RollupGroup(
+                key=OTHER,
+                total_amount=round(sum(group.total_amount for group in rest), 2),
+                transaction_count=sum(group.transaction_count for group in rest),
+            ))
+        buckets.append(RollupBucket(
+            start_date=max(date.fromisoformat(bucket_start), start),
+            end_date=min(date.fromisoformat(bucket_end), end),
+            total_amount=round(sum(group.total_amount for group in groups), 2),
+            transaction_count=sum(group.transaction_count for group in groups),
+            groups=listed,
+        ))
+
+    return SpendingRollupResponse(
+        period=period,
+        group_by=group_by,
+        date_range=DateRange(start_date=start, end_date=end),
+        buckets=buckets,
+        degraded_items=degraded_items(),
+    )
@@ -1,14 +1,17 @@
+import sqlite3
+from collections.abc import Iterable, Iterator
 from datetime import datetime
-from mcp_server.services.plaid.client import plaid_client
+from mcp_server.services import metrics
+from mcp_server.services.plaid.sync import sync_all_transactions
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.tools.budget import DEFAULT_MAX_RESPONSE_BYTES, ResponseBudget, decode_cursor, encode_cursor, estimate_transaction_size
+from mcp_server.tools.columnar import TransactionBatch
 from mcp_server.tools.constants import DEFAULT_DATE_RANGE
-from mcp_server.tools.get_accounts import get_all_items
+from mcp_server.tools.degraded import degraded_items
 from mcp_server.enums.plaid import PlaidAccountType
-from plaid.model.transactions_get_request import TransactionsGetRequest
-from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
-from collections import defaultdict
 
-from mcp_server.tools.schemas.io import AccountBreakdown, CategoryBreakdown, GetAllTransactionsResponse, SummarizeTransactionsResponse
-from mcp_server.tools.schemas.tools import PlaidAccount, PlaidCategory, PlaidTransaction
+from mcp_server.tools.schemas.io import AccountBreakdown, CategoryBreakdown, GetAllTransactionsResponse, SummarizeTransactionsResponse, to_compact_transaction, to_transaction
+from mcp_server.tools.schemas.records import TransactionRecord
 from mcp_server.tools.schemas.util import DateRange
 
 def get_transactions(
@@ -16,159 +19,167 @@ def get_transactions(
     end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
     account_type: PlaidAccountType | None = None,
 ) -> SummarizeTransactionsResponse:
-    all_transactions = get_all_transactions(start_date, end_date, account_type)
-    return summarize_transactions(all_transactions)
+    return summarize_transactions(TransactionBatch.from_rows(iter_transaction_rows(start_date, end_date, account_type)))
+
+def iter_transaction_rows(
+    start_date: str = DEFAULT_DATE_RANGE.start_date.isoformat(),
+    end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
+    account_type: PlaidAccountType | None = None,
+    account_ids: list[str] | None = None,
+    detailed_categories: Iterable[str] | None = None,
+) -> Iterator[sqlite3.Row]:
+    """
+    Streams raw transaction rows for all accounts within a date range, most recent first.
+
+    Every Item's local transaction store is brought up to date with
+    /transactions/sync first, which only pulls the changes since the last sync.
+    The window, including account details and the account and category
+    filters, is then answered from the store without fetching accounts separately.
+
+    Args:
+        start_date: Start date for transactions in ISO format (YYYY-MM-DD)
+        end_date: End date for transactions in ISO format (YYYY-MM-DD)
+        account_type: Optional account type to filter by
+        account_ids: Optional account ids to filter by
+        detailed_categories: Optional detailed Plaid categories to filter by
+
+    Returns:
+        An iterator over the matching store rows
+    """
+    sync_all_transactions()
+
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    account_type = account_type.value if isinstance(account_type, PlaidAccountType) else account_type
+
+    yield from metrics.counted(transaction_store.iter_transactions(
+        start, end, account_ids=account_ids, account_type=account_type, detailed_categories=detailed_categories
+    ))
+
+def iter_transactions(
+    start_date: str = DEFAULT_DATE_RANGE.start_date.isoformat(),
+    end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
+    account_type: PlaidAccountType | None = None,
+) -> Iterator[TransactionRecord]:
+    """
+    Streams transaction records for all accounts within a date range, most recent first.
+
+    See iter_transaction_rows for how the data is kept up to date.
+
+    Args:
+        start_date: Start date for transactions in ISO format (YYYY-MM-DD)
+        end_date: End date for transactions in ISO format (YYYY-MM-DD)
+        account_type: Optional account type to filter by
+
+    Returns:
+        An iterator over the matching transaction records
+    """
+    for row in iter_transaction_rows(start_date, end_date, account_type):
+        yield TransactionRecord.from_row(row)
+
+# Results with more transactions than this are returned in compact form
+COMPACT_THRESHOLD = 20
 
 def get_all_transactions(
     start_date: str = DEFAULT_DATE_RANGE.start_date.isoformat(),
     end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
     account_type: PlaidAccountType | None = None,
+    cursor: str | None = None,
+    max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
 ) -> GetAllTransactionsResponse:
     """
     Retrieves transaction data for specified accounts within a date range.
+
+    Large results are split into pages that fit in `max_bytes` of JSON. When
+    `next_cursor` is set, call again with the same arguments and that cursor to
+    get the next page. Totals always cover every matching transaction.
     
     Args:
         start_date: Start date for transactions in ISO format (YYYY-MM-DD)
         end_date: End date for transactions in ISO format (YYYY-MM-DD)
         account_type: Optional account type to filter by
+        cursor: Optional continuation cursor from a previous response
+        max_bytes: Approximate maximum size of the returned transactions in bytes
         
     Returns:
         A dictionary containing transaction data for the requested accounts
     """
-    accounts: list[PlaidAccount] = []
-    account_to_token_map: dict[str, str] = {}
-    items = get_all_items() 
-    for item in items:
-        for account in item.accounts:
-            if not account_type or account.type == account_type:
-                accounts.append(account)
-                account_to_token_map[account.account_id] = item.access_token
-    if not accounts:
-        return GetAllTransactionsResponse(
-            transactions=[],
-            total_transactions=0,
-            total_amount=0
-        )
-    
-    # Get all transactions for each account
-    all_transactions: list[PlaidTransaction] = []
-    for account in accounts:
-        access_token = account_to_token_map[account.account_id]
-
-        # Create request options with account filter
-        options = TransactionsGetRequestOptions(
-            account_ids=[account.account_id]
-        )
+    query = {"start_date": start_date, "end_date": end_date, "account_type": account_type}
+    offset = decode_cursor(cursor, query)
 
-        # Create and send request to Plaid API
-        request = TransactionsGetRequest(
-            access_token=access_token,
-            start_date=datetime.strptime(start_date, "%Y-%m-%d").date(),
-            end_date=datetime.strptime(end_date, "%Y-%m-%d").date(),
-            options=options
-        )
-        
-        response = plaid_client.client.transactions_get(request)
-        transactions = response.to_dict()["transactions"]
-        
-        # Add account info to each transaction
-        for transaction in transactions:
-            txn = PlaidTransaction(
-                account_id=transaction["account_id"],
-                amount=transaction["amount"],
-                authorized_date=transaction["authorized_date"],
-                authorized_datetime=transaction["authorized_datetime"],
-                iso_currency_code=transaction["iso_currency_code"],
-                merchant_name=transaction["merchant_name"],
-                name=transaction["name"],
-                txn_date=transaction["date"],
-                txn_datetime=transaction["datetime"],
-                pending=transaction["pending"],
-                category=transaction["personal_finance_category"],
-                website=transaction["website"],
-                account_name=account.name,
-                account_type=account.type,
-                account_subtype=account.subtype,
-            )
-
-            all_transactions.append(txn)
-        
-            
-    
-    all_transactions.sort(key=lambda x: x.txn_date, reverse=True)    
-    total_amount = round(sum(tx.amount for tx in all_transactions), 2)
+    # Fill the page as if it were compact, and remember where a full page would end,
+    # since whether the result is compact depends on the total, known only at the end
+    compact_budget = ResponseBudget(max_bytes)
+    full_budget = ResponseBudget(max_bytes)
+    page: list[TransactionRecord] = []
+    full_page_size: int | None = None
+    page_full = False
+    total_transactions = 0
+    total_amount = 0.0
+    for row in iter_transaction_rows(start_date, end_date, account_type):
+        index = total_transactions
+        total_transactions += 1
+        total_amount += row["amount"]
+        if index < offset or page_full:
+            continue
 
-    if len(all_transactions) > 20:
-        all_transactions = [tx.to_compact() for tx in all_transactions]
-    
+        record = TransactionRecord.from_row(row)
+        if not compact_budget.take(estimate_transaction_size(record)):
+            page_full = True
+            continue
+        if full_page_size is None and not full_budget.take(estimate_transaction_size(record, full=True)):
+            full_page_size = len(page)
+        page.append(record)
+
+    compact = total_transactions > COMPACT_THRESHOLD
+    if not compact and full_page_size is not None:
+        page = page[:full_page_size]
+    to_model = to_compact_transaction if compact else to_transaction
+
+    next_offset = offset + len(page)
     return GetAllTransactionsResponse(
-        transactions=all_transactions,
-        total_transactions=len(all_transactions),
-        total_amount=total_amount
+        transactions=[to_model(record) for record in page],
+        total_transactions=total_transactions,
+        total_amount=round(total_amount, 2),
+        next_cursor=encode_cursor(next_offset, query) if next_offset < total_transactions else None,
+        degraded_items=degraded_items(),
     )
-    
-    
 
-def summarize_transactions(transactions_response: GetAllTransactionsResponse) -> SummarizeTransactionsResponse:
+def summarize_transactions(batch: TransactionBatch) -> SummarizeTransactionsResponse:
     """
     Creates a summary of transaction data including breakdowns by account and category.
     
     Args:
-        transactions_response: Response dictionary from get_transactions()
+        batch: Columnar transactions, e.g. built from iter_transaction_rows()
         
     Returns:
         A dictionary containing summary statistics and breakdowns
     """
-    transactions = transactions_response.transactions
-    
-    # Initialize summary data structures
-    account_totals = defaultdict(float)
-    account_counts = defaultdict(int)
-    category_totals = defaultdict(float)
-    category_counts = defaultdict(int)
-    
-    # Calculate date range
-    dates = [tx.txn_date for tx in transactions]
-    date_range = DateRange(
-        start_date=min(dates),
-        end_date=max(dates)
-    ) if dates else None
-    
-    # Calculate summaries
-    for transaction in transactions:
-        amount = transaction.amount
-        account_name = transaction.account_name
-        category = transaction.category or PlaidCategory(
-            primary="Uncategorized",
-            detailed="Uncategorized",
-            confidence_level="LOW"
-        )
-        
-        account_totals[account_name] += amount
-        account_counts[account_name] += 1
-        category_totals[category.primary] += amount
-        category_counts[category.primary] += 1
+    total_transactions = len(batch)
+    total_amount = round(batch.total(), 2)
+    dates = batch.date_range()
+    date_range = DateRange(start_date=dates[0], end_date=dates[1]) if dates else None
     
     # Format account breakdown
     account_breakdown = [
         AccountBreakdown(
-            account_name=account,
-            total_amount=round(total, 2),
-            transaction_count=account_counts[account],
-            average_transaction=round(total / account_counts[account], 2)
+            account_name=group.key,
+            total_amount=round(group.total, 2),
+            transaction_count=group.count,
+            average_transaction=round(group.mean, 2)
         )
-        for account, total in account_totals.items()
+        for group in batch.group_by("account")
     ]
     
     # Format category breakdown
     category_breakdown = [
         CategoryBreakdown(
-            category=category,
-            total_amount=round(total, 2),
-            transaction_count=category_counts[category],
-            average_transaction=round(total / category_counts[category], 2)
+            category=group.key,
+            total_amount=round(group.total, 2),
+            transaction_count=group.count,
+            average_transaction=round(group.mean, 2)
         )
-        for category, total in category_totals.items()
+        for group in batch.group_by("category")
     ]
     
     # Sort breakdowns by total amount
@@ -177,10 +188,10 @@ def summarize_transactions(transactions_response: GetAllTransactionsResponse) ->
     
     return SummarizeTransactionsResponse(
         date_range=date_range,
-        total_amount=transactions_response.total_amount,
-        total_transactions=transactions_response.total_transactions,
-        average_transaction_amount=round(transactions_response.total_amount / transactions_response.total_transactions, 2) if transactions_response.total_transactions > 0 else 0,
+        total_amount=total_amount,
+        total_transactions=total_transactions,
+        average_transaction_amount=round(total_amount / total_transactions, 2) if total_transactions > 0 else 0,
         account_breakdown=account_breakdown,
-        category_breakdown=category_breakdown
+        category_breakdown=category_breakdown,
+        degraded_items=degraded_items(),
     )
-    
\ No newline at end of file
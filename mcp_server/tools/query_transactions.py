@@ -0,0 +1,119 @@
+import heapq
+import sqlite3
+from collections.abc import Iterable, Iterator
+from typing import Any, Literal
+
+from mcp_server.enums.plaid import PlaidAccountType
+from mcp_server.services import metrics
+from mcp_server.storage.taxonomy import get_taxonomy
+from mcp_server.tools.constants import DEFAULT_DATE_RANGE
+from mcp_server.tools.degraded import degraded_items
+from mcp_server.tools.get_transactions import iter_transaction_rows
+from mcp_server.tools.schemas.io import QueryTransactionsResponse, to_transaction
+from mcp_server.tools.schemas.records import TransactionRecord
+from mcp_server.tools.schemas.tools import PlaidTransaction
+
+MAX_LIMIT = 500
+
+_SORT_KEYS = {
+    "date": lambda row: row["txn_date"],
+    "amount": lambda row: row["amount"],
+    "merchant": lambda row: (row["merchant_name"] or row["name"]).lower(),
+}
+
+def _project(row: sqlite3.Row, fields: set[str] | None) -> dict[str, Any]:
+    return to_transaction(TransactionRecord.from_row(row)).model_dump(mode="json", include=fields)
+
+def query_transactions(
+    start_date: str = DEFAULT_DATE_RANGE.start_date.isoformat(),
+    end_date: str = DEFAULT_DATE_RANGE.end_date.isoformat(),
+    account_ids: list[str] | None = None,
+    account_type: PlaidAccountType | None = None,
+    categories: list[str] | None = None,
+    min_amount: float | None = None,
+    max_amount: float | None = None,
+    pending: bool | None = None,
+    merchant: str | None = None,
+    sort_by: Literal["date", "amount", "merchant"] = "date",
+    descending: bool = True,
+    limit: int = 50,
+    offset: int = 0,
+    fields: list[str] | None = None,
+) -> QueryTransactionsResponse:
+    """
+    Queries transactions with filters, sorting, pagination and field selection.
+
+    Prefer this tool over get_all_transactions when only a narrow slice of the
+    transactions is needed. Positive amounts are money leaving the account.
+
+    Args:
+        start_date: Start date in ISO format (YYYY-MM-DD)
+        end_date: End date in ISO format (YYYY-MM-DD)
+        account_ids: Optional account ids to restrict the results to
+        account_type: Optional account type to restrict the results to
+        categories: Optional primary, detailed or sub-categories from get_category_taxonomy
+            (e.g. FOOD_AND_DRINK, FOOD_AND_DRINK_COFFEE or COFFEE)
+        min_amount: Optional minimum transaction amount (inclusive)
+        max_amount: Optional maximum transaction amount (inclusive)
+        pending: Optionally only pending (true) or only posted (false) transactions
+        merchant: Optional case-insensitive substring of the merchant or transaction name
+        sort_by: Field to sort by: date, amount or merchant
+        descending: Sort in descending order
+        limit: Maximum number of transactions to return (at most 500)
+        offset: Number of matching transactions to skip
+        fields: Optional transaction fields to return, e.g. ["txn_date", "amount", "merchant_name"]
+
+    Returns:
+        The requested page of matching transactions, with the total count and amount of all matches
+    """
+    if fields:
+        unknown = set(fields) - set(PlaidTransaction.model_fields)
+        if unknown:
+            raise ValueError(
+                f"Unknown fields {sorted(unknown)}, expected any of {sorted(PlaidTransaction.model_fields)}"
+            )
+    limit = max(0, min(limit, MAX_LIMIT))
+    offset = max(0, offset)
+    # Validated and expanded to detailed categories up front, so typos fail instead of matching nothing
+    detailed_categories = get_taxonomy().expand(categories) if categories else None
+    vendor = merchant.strip().lower() if merchant else None
+
+    # Date window, accounts and categories are pushed down to the store query,
+    # everything else is evaluated in a single pass over its rows
+    rows = iter_transaction_rows(start_date, end_date, account_type, account_ids, detailed_categories)
+
+    totals = {"matches": 0, "amount": 0.0}
+
+    def matching(rows: Iterable[sqlite3.Row]) -> Iterator[sqlite3.Row]:
+        for row in rows:
+            amount = row["amount"]
+            if min_amount is not None and amount < min_amount:
+                continue
+            if max_amount is not None and amount > max_amount:
+                continue
+            if pending is not None and bool(row["pending"]) != pending:
+                continue
+            if vendor is not None and vendor not in (row["merchant_name"] or row["name"]).lower():
+                continue
+            totals["matches"] += 1
+            totals["amount"] += amount
+            yield row
+
+    window = offset + limit
+    with metrics.span("aggregate.query", sort_by=sort_by):
+        if sort_by == "date" and descending:
+            # The store already returns the most recent rows first, so only the page is kept
+            page = [row for index, row in enumerate(matching(rows)) if offset <= index < window]
+        else:
+            select = heapq.nlargest if descending else heapq.nsmallest
+            page = select(window, matching(rows), key=_SORT_KEYS[sort_by])[offset:]
+
+    projection = set(fields) if fields else None
+    return QueryTransactionsResponse(
+        transactions=[_project(row, projection) for row in page],
+        total_matches=totals["matches"],
+        total_amount=round(totals["amount"], 2),
+        offset=offset,
+        has_more=window < totals["matches"],
+        degraded_items=degraded_items(),
+    )
@@ -1,12 +1,48 @@
+from datetime import date, datetime
+from typing import Any
+
 from pydantic import BaseModel
 
-from mcp_server.tools.schemas.tools import CompactPlaidTransaction, PlaidAccount, PlaidCreditCard, PlaidLoan, PlaidTransaction
+from mcp_server.tools.schemas.records import TransactionRecord
+from mcp_server.tools.schemas.tools import CompactPlaidTransaction, PlaidAccount, PlaidCreditCard, PlaidItem, PlaidLoan, PlaidTransaction
 from mcp_server.tools.schemas.util import DateRange
 
+class DegradedItem(BaseModel):
+    """A connection whose last Plaid request failed, left out of or answered from stored data in a response."""
+    name: str
+    item_id: str
+    error_code: str | None = None
+    error_message: str | None = None
+    # The user has to re-link the connection in the ttyf CLI, retrying will not help
+    requires_user_action: bool = False
+    consecutive_failures: int
+    failing_since: datetime | None = None
+    next_retry_at: datetime | None = None
+    balances_as_of: datetime | None = None
+    transactions_synced_at: datetime | None = None
+
+class GetAllItemsResponse(BaseModel):
+    items: list[PlaidItem]
+    degraded_items: list[DegradedItem] = []
+
 class GetAllTransactionsResponse(BaseModel):
     transactions: list[CompactPlaidTransaction]
     total_transactions: int
     total_amount: float
+    next_cursor: str | None = None
+    degraded_items: list[DegradedItem] = []
+
+class GetTransactionsByVendorResponse(GetAllTransactionsResponse):
+    # The normalized vendors whose transactions were returned, so fuzzy matches are visible
+    matched_vendors: list[str]
+
+class QueryTransactionsResponse(BaseModel):
+    transactions: list[dict[str, Any]]
+    total_matches: int
+    total_amount: float
+    offset: int
+    has_more: bool
+    degraded_items: list[DegradedItem] = []
 
 class AccountBreakdown(BaseModel):
     account_name: str
@@ -27,6 +63,7 @@ class SummarizeTransactionsResponse(BaseModel):
     average_transaction_amount: float
     account_breakdown: list[AccountBreakdown]
     category_breakdown: list[CategoryBreakdown]
+    degraded_items: list[DegradedItem] = []
 
 
 class CreditCardBreakdown(BaseModel):
@@ -41,6 +78,7 @@ class GetCurrentLiabilitiesResponse(BaseModel):
     credit_cards: CreditCardBreakdown
     loans: LoanBreakdown
     total_liabilities: float
+    degraded_items: list[DegradedItem] = []
 
 class NetWorthAssetBreakdown(BaseModel):
     accounts: list[PlaidAccount]
@@ -54,6 +92,39 @@ class GetNetWorthResponse(BaseModel):
     assets: NetWorthAssetBreakdown
     liabilities: NetWorthLiabilityBreakdown
     net_worth: float
+    # When the balances were observed, if served from the snapshot store rather than live
+    as_of: datetime | None = None
+    # Connections that could not be reached, whose last recorded balances are included instead
+    degraded_items: list[DegradedItem] = []
+
+class NetWorthPoint(BaseModel):
+    date: date
+    total_assets: float
+    total_liabilities: float
+    net_worth: float
+
+class NetWorthHistoryResponse(BaseModel):
+    period: str
+    date_range: DateRange
+    points: list[NetWorthPoint]
+
+class BalanceSnapshot(BaseModel):
+    taken_at: datetime
+    current: float | None = None
+    available: float | None = None
+    limit: float | None = None
+
+class AccountBalanceHistory(BaseModel):
+    account_id: str
+    name: str
+    item_name: str
+    type: str
+    subtype: str
+    snapshots: list[BalanceSnapshot]
+
+class BalanceHistoryResponse(BaseModel):
+    date_range: DateRange
+    accounts: list[AccountBalanceHistory]
 
 class CategoryTaxonomy(BaseModel):
     primary_category: str
@@ -70,4 +141,131 @@ class CategorizedSummary(BaseModel):
     categories: dict[str, CategorySummary]
     total_transactions: int
     total_amount: float
-    date_range: DateRange
\ No newline at end of file
+    date_range: DateRange
+    transactions_truncated: bool = False
+    degraded_items: list[DegradedItem] = []
+
+class RollupGroup(BaseModel):
+    key: str
+    total_amount: float
+    transaction_count: int
+
+class RollupBucket(BaseModel):
+    start_date: date
+    end_date: date
+    total_amount: float
+    transaction_count: int
+    groups: list[RollupGroup]
+
+class SpendingRollupResponse(BaseModel):
+    period: str
+    group_by: str
+    date_range: DateRange
+    buckets: list[RollupBucket]
+    degraded_items: list[DegradedItem] = []
+
+class ItemFreshness(BaseModel):
+    name: str
+    item_id: str
+    balances_as_of: datetime | None = None
+    transactions_synced_at: datetime | None = None
+    last_refresh_error: str | None = None
+    consecutive_failures: int = 0
+    next_refresh_at: datetime | None = None
+    # Set while Plaid requests for the connection are being skipped after a failure
+    unavailable: bool = False
+    requires_user_action: bool = False
+
+class DataFreshnessResponse(BaseModel):
+    tenant: str
+    background_refresh: bool
+    refresh_interval_seconds: float
+    items: list[ItemFreshness]
+
+def _category(primary: str | None, detailed: str | None, confidence: str | None) -> dict[str, str] | None:
+    if not primary:
+        return None
+    return {
+        "primary": primary,
+        "detailed": detailed or primary,
+        "confidence_level": confidence or "UNKNOWN",
+    }
+
+def to_transaction(record: TransactionRecord) -> PlaidTransaction:
+    """
+    Builds the response model of a record. This is the only place the
+    transaction is validated.
+    """
+    return PlaidTransaction(
+        account_id=record.account_id,
+        amount=record.amount,
+        authorized_date=record.authorized_date,
+        authorized_datetime=record.authorized_datetime,
+        iso_currency_code=record.iso_currency_code,
+        merchant_name=record.merchant_name,
+        name=record.name,
+        txn_date=record.txn_date,
+        txn_datetime=record.txn_datetime,
+        pending=record.pending,
+        category=_category(record.category_primary, record.category_detailed, record.category_confidence),
+        website=record.website,
+        account_name=record.account_name,
+        account_type=record.account_type,
+        account_subtype=record.account_subtype,
+    )
+
+def compact_transaction(
+    amount: float,
+    merchant_name: str | None,
+    name: str,
+    txn_date: date,
+    category_primary: str | None,
+    category_detailed: str | None,
+    category_confidence: str | None,
+) -> CompactPlaidTransaction:
+    """
+    Builds the compact response model of a transaction from its stored fields, validating it once.
+    """
+    return CompactPlaidTransaction(
+        amount=amount,
+        merchant_name=merchant_name,
+        name=name,
+        txn_date=txn_date,
+        category=_category(category_primary, category_detailed, category_confidence),
+    )
+
+def to_compact_transaction(record: TransactionRecord) -> CompactPlaidTransaction:
+    """
+    Builds the compact response model of a record, see compact_transaction.
+    """
+    return compact_transaction(
+        record.amount,
+        record.merchant_name,
+        record.name,
+        record.txn_date,
+        record.category_primary,
+        record.category_detailed,
+        record.category_confidence,
+    )
+
+class RecurringTransaction(BaseModel):
+    vendor: str
+    item_name: str
+    accounts: list[str]
+    category: str | None = None
+    frequency: str
+    average_amount: float
+    last_amount: float
+    fixed_amount: bool
+    monthly_amount: float
+    occurrences: int
+    first_date: date
+    last_date: date
+    next_expected_date: date | None = None
+    active: bool
+
+class RecurringTransactionsResponse(BaseModel):
+    recurring: list[RecurringTransaction]
+    monthly_outflow: float
+    monthly_inflow: float
+    degraded_items: list[DegradedItem] = []
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Mapping
+
+
+def _date(value: str | None) -> date | None:
+    return date.fromisoformat(value) if value else None
+
+
+def _datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+@dataclass(slots=True)
+class TransactionRecord:
+    """
+    Internal, unvalidated transaction used while fetching and aggregating.
+
+    Pydantic models are only built, and validated once, from the records that
+    are actually returned; see `to_transaction` and `to_compact_transaction`
+    in schemas/io.py.
+    """
+    transaction_id: str
+    account_id: str
+    amount: float
+    txn_date: date
+    name: str
+    merchant_name: str | None
+    pending: bool
+    iso_currency_code: str | None
+    category_primary: str | None
+    category_detailed: str | None
+    category_confidence: str | None
+    authorized_date: date | None
+    authorized_datetime: datetime | None
+    txn_datetime: datetime | None
+    website: str | None
+    account_name: str | None
+    account_type: str | None
+    account_subtype: str | None
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "TransactionRecord":
+        """
+        Builds a record from a transaction store row.
+        """
+        return cls(
+            transaction_id=row["transaction_id"],
+            account_id=row["account_id"],
+            amount=row["amount"],
+            txn_date=date.fromisoformat(row["txn_date"]),
+            name=row["name"],
+            merchant_name=row["merchant_name"],
+            pending=bool(row["pending"]),
+            iso_currency_code=row["iso_currency_code"],
+            category_primary=row["category_primary"],
+            category_detailed=row["category_detailed"],
+            category_confidence=row["category_confidence"],
+            authorized_date=_date(row["authorized_date"]),
+            authorized_datetime=_datetime(row["authorized_datetime"]),
+            txn_datetime=_datetime(row["txn_datetime"]),
+            website=row["website"],
+            account_name=row["account_name"],
+            account_type=row["account_type"],
+            account_subtype=row["account_subtype"],
+        )
+
+    @property
+    def vendor(self) -> str:
+        return self.merchant_name or self.name
@@ -1,44 +1,212 @@
 import json
 import os
 from pathlib import Path
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, NamedTuple
 from mcp_server.tools.schemas.util import PlaidConnection
 from mcp_server.services.keyring.auth import AuthHandler
-from plaid import Environment
+from mcp_server.services.tenants import DEFAULT_TENANT
+
+if TYPE_CHECKING:
+    from plaid import Environment
+
+# Default number of Plaid requests in flight at once, across all tenants and tool calls
+MAX_PLAID_CALLS = 16
 
 _STORAGE_DIR_ = Path.home() / "ttyf"
 _CONNECTIONS_FILE = _STORAGE_DIR_ / "plaid_connections.json"
 _CREDENTIALS_FILE = _STORAGE_DIR_ / "user_credentials.json"
+_TRANSACTIONS_DB = _STORAGE_DIR_ / "transactions.db"
+_BALANCES_DB = _STORAGE_DIR_ / "balances.db"
+
+
+class TenantStorage(NamedTuple):
+    connections_file: Path
+    transactions_db: Path
+    balances_db: Path
+    keyring_service: str
+
+
+def get_tenant_storage(tenant: str) -> TenantStorage:
+    """
+    Get where a tenant's connections, transactions and balances are stored, and its keyring service.
+
+    The default tenant uses the storage directory and keyring service of a
+    single-user install. Every other tenant has a directory under
+    `tenants/` and a keyring service suffixed with its name, e.g. `ttyf_plaid:alice`.
+    """
+    if tenant == DEFAULT_TENANT:
+        return TenantStorage(_CONNECTIONS_FILE, _TRANSACTIONS_DB, _BALANCES_DB, AuthHandler.tenant_service(tenant))
+    directory = _STORAGE_DIR_ / "tenants" / tenant
+    return TenantStorage(
+        connections_file=directory / "plaid_connections.json",
+        transactions_db=directory / "transactions.db",
+        balances_db=directory / "balances.db",
+        keyring_service=AuthHandler.tenant_service(tenant),
+    )
 
-def read_access_tokens() -> dict[str, PlaidConnection]:
+def read_access_tokens(
+    known_tokens: Mapping[str, str] | None = None,
+    *,
+    connections_file: Path,
+    keyring_service: str,
+) -> dict[str, PlaidConnection]:
     """
-    Read the access tokens from the file.
+    Read the connections from the file, with their access tokens from the keyring.
+
+    Args:
+        known_tokens: Access tokens already read, by item id, which are not read again
+        connections_file: The tenant's connections file, see get_tenant_storage
+        keyring_service: The tenant's keyring service the access tokens are stored under
+
+    Returns:
+        The connections by name
     """
-    with open(_CONNECTIONS_FILE, "r") as f:
-        response_obj = {}
+    with open(connections_file, "r") as f:
         connections = json.load(f)
 
-        for connection in connections:
-            id = connection["id"]
-            access_token = AuthHandler.get_access_token(id)
+    known_tokens = known_tokens or {}
+    missing = [connection["id"] for connection in connections if connection["id"] not in known_tokens]
+    tokens = {**known_tokens, **(AuthHandler.get_access_tokens(missing, service=keyring_service) if missing else {})}
+
+    response_obj = {}
+    for connection in connections:
+        id = connection["id"]
+        access_token = tokens[id]
 
-            if not access_token:
-                raise ValueError(f"Access token for {id} not found")
+        if not access_token:
+            raise ValueError(f"Access token for {id} not found")
 
-            response_obj[connection["name"]] = PlaidConnection(
-                name=connection["name"],
-                access_token=access_token,
-                item_id=id,
-            )
-        
+        response_obj[connection["name"]] = PlaidConnection(
+            name=connection["name"],
+            access_token=access_token,
+            item_id=id,
+        )
 
-        return response_obj
+    return response_obj
 
-def get_plaid_vars() -> tuple[str, str, Environment]:
+def get_plaid_vars() -> tuple[str, str, "Environment"]:
     """
     Get the Plaid client ID and secret.
     """
+    # Importing plaid loads its whole API client, so it waits until the client is first used
+    from plaid import Environment
+
     env = os.getenv("ENV", "DEV").lower()
     if env == "prod":
         return os.getenv("PLAID_CLIENT_ID"), os.getenv("PROD_PLAID_SECRET_KEY"), Environment.Production
     else:
-        return os.getenv("PLAID_CLIENT_ID"), os.getenv("SANDBOX_PLAID_SECRET_KEY"), Environment.Sandbox
\ No newline at end of file
+        return os.getenv("PLAID_CLIENT_ID"), os.getenv("SANDBOX_PLAID_SECRET_KEY"), Environment.Sandbox
+
+class PlaidHttpVars(NamedTuple):
+    pool_size: int
+    connect_timeout: float
+    read_timeout: float
+    max_retries: int
+    retry_backoff: float
+
+
+def get_plaid_http_vars() -> PlaidHttpVars:
+    """
+    Get the Plaid HTTP transport settings.
+
+    PLAID_POOL_SIZE: Kept-alive connections to Plaid, which is also the number of Plaid requests in flight at once
+    PLAID_CONNECT_TIMEOUT_SECONDS / PLAID_READ_TIMEOUT_SECONDS: Per-request timeouts
+    PLAID_MAX_RETRIES: Retries of rate-limited (429), 5xx and network-failed requests
+    PLAID_RETRY_BACKOFF_SECONDS: Base delay of the jittered exponential backoff between retries
+    """
+    return PlaidHttpVars(
+        pool_size=max(1, int(os.getenv("PLAID_POOL_SIZE", MAX_PLAID_CALLS))),
+        connect_timeout=float(os.getenv("PLAID_CONNECT_TIMEOUT_SECONDS", 5)),
+        read_timeout=float(os.getenv("PLAID_READ_TIMEOUT_SECONDS", 30)),
+        max_retries=max(0, int(os.getenv("PLAID_MAX_RETRIES", 3))),
+        retry_backoff=float(os.getenv("PLAID_RETRY_BACKOFF_SECONDS", 0.5)),
+    )
+
+
+class RefreshVars(NamedTuple):
+    enabled: bool
+    interval_seconds: float
+    max_backoff_seconds: float
+
+
+def get_refresh_vars() -> RefreshVars:
+    """
+    Get the background refresh settings.
+
+    BACKGROUND_REFRESH: Set to 0 to only fetch data when a tool needs it
+    REFRESH_INTERVAL_SECONDS: How often every Item's balances and transactions are refreshed
+    REFRESH_MAX_BACKOFF_SECONDS: Longest wait before retrying an Item whose refresh keeps failing
+    """
+    return RefreshVars(
+        enabled=os.getenv("BACKGROUND_REFRESH", "1").lower() not in ("0", "false", "no"),
+        interval_seconds=max(30.0, float(os.getenv("REFRESH_INTERVAL_SECONDS", 10 * 60))),
+        max_backoff_seconds=float(os.getenv("REFRESH_MAX_BACKOFF_SECONDS", 60 * 60)),
+    )
+
+
+class MetricsVars(NamedTuple):
+    enabled: bool
+    log_spans: bool
+    response_bytes: bool
+    prometheus_file: Path | None
+
+
+def get_metrics_vars() -> MetricsVars:
+    """
+    Get the instrumentation settings.
+
+    METRICS_ENABLED: Set to 1 to time hot paths and count per-tool calls, API calls, rows and cache hits
+    METRICS_LOG_SPANS: Set to 1 to also log every timing span as JSON to stderr
+    METRICS_RESPONSE_BYTES: Set to 1 to also count response bytes, which serializes every tool result a second time
+    METRICS_PROMETHEUS_FILE: Optional file the metrics are periodically written to in the Prometheus text format
+    """
+    prometheus_file = os.getenv("METRICS_PROMETHEUS_FILE")
+    return MetricsVars(
+        enabled=os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes"),
+        log_spans=os.getenv("METRICS_LOG_SPANS", "0").lower() in ("1", "true", "yes"),
+        response_bytes=os.getenv("METRICS_RESPONSE_BYTES", "0").lower() in ("1", "true", "yes"),
+        prometheus_file=Path(prometheus_file).expanduser() if prometheus_file else None,
+    )
+
+
+class NetWorthVars(NamedTuple):
+    snapshot_max_age_seconds: float
+
+
+def get_net_worth_vars() -> NetWorthVars:
+    """
+    Get the net worth settings.
+
+    NET_WORTH_SNAPSHOT_MAX_AGE_SECONDS: Balance snapshots younger than this answer get_net_worth without calling Plaid
+    """
+    return NetWorthVars(
+        snapshot_max_age_seconds=float(os.getenv("NET_WORTH_SNAPSHOT_MAX_AGE_SECONDS", 15 * 60)),
+    )
+
+
+class TenantVars(NamedTuple):
+    default_tenant: str
+    max_resident: int
+    header_enabled: bool
+    header_tenants: frozenset[str]
+    max_plaid_calls: int
+
+
+def get_tenant_vars() -> TenantVars:
+    """
+    Get the multi-tenant settings.
+
+    TTYF_TENANT: The tenant served when a request names none, e.g. over stdio
+    TENANT_MAX_RESIDENT: Tenants whose Items, stores and caches are kept in memory, least recently used ones are evicted
+    TENANT_HEADER_ENABLED: Set to 1 to let unauthenticated HTTP clients pick their tenant with the X-TTYF-Tenant header
+    TENANT_HEADER_ALLOWLIST: Comma-separated tenants the X-TTYF-Tenant header may pick, the default tenant only if listed
+    TENANT_MAX_PLAID_CALLS: Plaid requests a single tenant may have in flight at once
+    """
+    return TenantVars(
+        default_tenant=os.getenv("TTYF_TENANT", DEFAULT_TENANT),
+        max_resident=max(1, int(os.getenv("TENANT_MAX_RESIDENT", 16))),
+        header_enabled=os.getenv("TENANT_HEADER_ENABLED", "0").lower() in ("1", "true", "yes"),
+        header_tenants=frozenset(filter(None, (tenant.strip() for tenant in os.getenv("TENANT_HEADER_ALLOWLIST", "").split(",")))),
+        max_plaid_calls=max(1, int(os.getenv("TENANT_MAX_PLAID_CALLS", MAX_PLAID_CALLS // 2))),
+    )
@@ -0,0 +1,58 @@
+"""
+Shared setup: storage under a temporary home, an in-memory keyring and the offline Plaid stand-in.
+
+The storage directory is resolved when mcp_server.utils is imported, so HOME is
+pointed at a temporary directory before any mcp_server module is imported.
+"""
+import json
+import os
+import tempfile
+import uuid
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="ttyf-tests-")
+os.environ["BACKGROUND_REFRESH"] = "0"
+os.environ.setdefault("PLAID_CLIENT_ID", "test-client")
+os.environ.setdefault("SANDBOX_PLAID_SECRET_KEY", "test-secret")
+
+import keyring
+import pytest
+
+from benchmarks.fake_plaid import FakePlaidApi, FakePlaidConfig, MemoryKeyring
+
+keyring.set_keyring(MemoryKeyring())
+
+
+@pytest.fixture
+def plaid_api():
+    """A small, instant fake Plaid backend behind the shared client."""
+    from mcp_server.services.plaid.client import plaid_client
+
+    api = FakePlaidApi(FakePlaidConfig(accounts=4, transactions=300, accounts_per_item=2, history_days=120, latency=0))
+    previous = plaid_client.client
+    plaid_client.client = api
+    yield api
+    plaid_client.client = previous
+
+
+def connect_tenant(tenant: str, api: FakePlaidApi) -> None:
+    """Writes a tenant's connections file and stores its access tokens, as the ttyf CLI would."""
+    from mcp_server.utils import get_tenant_storage
+
+    storage = get_tenant_storage(tenant)
+    storage.connections_file.parent.mkdir(parents=True, exist_ok=True)
+    connections = api.connections()
+    storage.connections_file.write_text(json.dumps([{"id": item_id, "name": name} for item_id, name, _ in connections]))
+    for item_id, _, access_token in connections:
+        keyring.set_password(storage.keyring_service, item_id, access_token)
+
+
+@pytest.fixture
+def tenant(plaid_api):
+    """Runs the test as a fresh tenant connected to the fake backend."""
+    from mcp_server.services.tenants import tenant_registry
+
+    name = f"test-{uuid.uuid4().hex[:12]}"
+    connect_tenant(name, plaid_api)
+    with tenant_registry.use(name):
+        yield name
+    tenant_registry.evict(name)
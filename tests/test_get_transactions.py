@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+import pytest
+
+from mcp_server.tools.get_transactions import get_all_transactions
+
+START = (date.today() - timedelta(days=120)).isoformat()
+END = date.today().isoformat()
+
+
+def _all_pages(**arguments) -> list:
+    pages = [get_all_transactions(START, END, **arguments)]
+    while pages[-1].next_cursor:
+        pages.append(get_all_transactions(START, END, cursor=pages[-1].next_cursor, **arguments))
+    return pages
+
+
+def test_pages_cover_every_transaction_once(tenant, plaid_api):
+    everything = get_all_transactions(START, END, max_bytes=10_000_000)
+    assert everything.next_cursor is None
+    assert everything.total_transactions == 300
+
+    pages = _all_pages(max_bytes=2_000)
+    assert len(pages) > 1
+    assert all(page.transactions for page in pages)
+    assert [transaction for page in pages for transaction in page.transactions] == everything.transactions
+    # Totals describe the whole result on every page
+    assert {page.total_transactions for page in pages} == {300}
+    assert {page.total_amount for page in pages} == {everything.total_amount}
+
+
+def test_paging_does_not_sync_again(tenant, plaid_api):
+    _all_pages(max_bytes=2_000)
+    calls = plaid_api.calls["transactions_sync"]
+    _all_pages(max_bytes=2_000)
+    assert plaid_api.calls["transactions_sync"] == calls
+
+
+def test_cursor_is_bound_to_its_query(tenant, plaid_api):
+    cursor = get_all_transactions(START, END, max_bytes=2_000).next_cursor
+    assert cursor is not None
+
+    with pytest.raises(ValueError):
+        get_all_transactions(START, (date.today() - timedelta(days=1)).isoformat(), cursor=cursor, max_bytes=2_000)
+    with pytest.raises(ValueError):
+        get_all_transactions(START, END, cursor="not-a-cursor", max_bytes=2_000)
@@ -0,0 +1,131 @@
+import json
+from types import SimpleNamespace
+
+import plaid
+import pytest
+
+from mcp_server.services import health as health_module
+from mcp_server.services.health import (
+    ACTION_REQUIRED_BACKOFF_SECONDS,
+    HEALTH_BASE_BACKOFF_SECONDS,
+    HEALTH_MAX_BACKOFF_SECONDS,
+    ItemHealthRegistry,
+    ItemUnavailableError,
+)
+
+
+def _api_error(error_code: str = "INTERNAL_SERVER_ERROR", status: int = 500) -> plaid.ApiException:
+    error = plaid.ApiException(status=status, reason="Error")
+    error.body = json.dumps({"error_type": "API_ERROR", "error_code": error_code, "error_message": "failed"})
+    error.headers = {}
+    return error
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(health_module, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def registry():
+    return ItemHealthRegistry()
+
+
+def _fail(registry: ItemHealthRegistry, error: Exception) -> None:
+    with pytest.raises(type(error)):
+        with registry.guard("item-1", "Bank"):
+            raise error
+
+
+def _succeed(registry: ItemHealthRegistry) -> None:
+    with registry.guard("item-1", "Bank"):
+        pass
+
+
+def test_failure_opens_the_circuit(registry, clock):
+    _succeed(registry)
+    assert registry.get("item-1").healthy
+
+    _fail(registry, _api_error())
+    health = registry.get("item-1")
+    assert health.failures == 1
+    assert health.error_code == "INTERNAL_SERVER_ERROR"
+    assert health.next_probe_at == clock.now + HEALTH_BASE_BACKOFF_SECONDS
+    assert [item.item_id for item in registry.degraded()] == ["item-1"]
+
+    # Fails fast without running the block
+    ran = False
+    with pytest.raises(ItemUnavailableError):
+        with registry.guard("item-1", "Bank"):
+            ran = True
+    assert not ran
+
+
+def test_successful_probe_closes_the_circuit(registry, clock):
+    _fail(registry, _api_error())
+    clock.now += HEALTH_BASE_BACKOFF_SECONDS
+
+    _succeed(registry)
+    health = registry.get("item-1")
+    assert health.healthy
+    assert health.error_code is None
+    assert health.last_success_at == clock.now
+    assert registry.degraded() == []
+
+
+def test_only_one_probe_at_a_time(registry, clock):
+    _fail(registry, _api_error())
+    clock.now += HEALTH_BASE_BACKOFF_SECONDS
+
+    with registry.guard("item-1", "Bank"):
+        with pytest.raises(ItemUnavailableError):
+            with registry.guard("item-1", "Bank"):
+                pass
+    assert registry.get("item-1").healthy
+
+
+def test_failed_probes_double_the_backoff(registry, clock):
+    backoffs = []
+    for _ in range(10):
+        _fail(registry, _api_error())
+        health = registry.get("item-1")
+        backoffs.append(health.next_probe_at - clock.now)
+        clock.now = health.next_probe_at
+
+    assert backoffs[:3] == [HEALTH_BASE_BACKOFF_SECONDS, 2 * HEALTH_BASE_BACKOFF_SECONDS, 4 * HEALTH_BASE_BACKOFF_SECONDS]
+    assert max(backoffs) == HEALTH_MAX_BACKOFF_SECONDS
+    assert registry.get("item-1").failures == 10
+
+
+def test_items_needing_action_back_off_longer(registry, clock):
+    _fail(registry, _api_error("ITEM_LOGIN_REQUIRED", status=400))
+    health = registry.get("item-1")
+    assert health.requires_action
+    assert health.next_probe_at == clock.now + ACTION_REQUIRED_BACKOFF_SECONDS
+
+
+def test_bugs_are_not_recorded(registry, clock):
+    _fail(registry, KeyError("account_id"))
+    assert registry.get("item-1").healthy
+    _succeed(registry)
+
+
+def test_items_are_independent(registry, clock):
+    _fail(registry, _api_error())
+    with registry.guard("item-2", "Other bank"):
+        pass
+    assert registry.get("item-2").healthy
+
+    registry.reset("item-1")
+    assert registry.get("item-1") is None
+    _succeed(registry)
@@ -0,0 +1,112 @@
+import sqlite3
+from collections import defaultdict
+from datetime import date
+
+import pytest
+
+from mcp_server.storage.transactions import TransactionStore, bucket_bounds
+
+
+def _transaction(transaction_id: str, day: str, amount: float, category: str | None = "FOOD_AND_DRINK",
+                 merchant: str | None = "Cafe", account_id: str = "account-1") -> dict:
+    return {
+        "transaction_id": transaction_id,
+        "account_id": account_id,
+        "date": day,
+        "amount": amount,
+        "name": f"{merchant or 'POS DEBIT'} #1",
+        "merchant_name": merchant,
+        "pending": False,
+        "iso_currency_code": "USD",
+        "personal_finance_category": {"primary": category, "detailed": None, "confidence_level": "HIGH"} if category else None,
+    }
+
+
+def _expected(store: TransactionStore, period: str, dimension: str, start: date, end: date) -> dict:
+    """The rollups aggregated by brute force from the stored transactions."""
+    key = {
+        "category": lambda row: row["category_primary"] or "Uncategorized",
+        "account": lambda row: row["account_id"],
+        "merchant": lambda row: row["merchant_name"] or row["name"],
+    }[dimension]
+    totals: dict = defaultdict(lambda: [0.0, 0])
+    for row in store.iter_transactions(start, end):
+        bucket = bucket_bounds(period, date.fromisoformat(row["txn_date"]))[0].isoformat()
+        totals[bucket, key(row)][0] += row["amount"]
+        totals[bucket, key(row)][1] += 1
+    return {bucket_key: (round(total, 2), count) for bucket_key, (total, count) in totals.items()}
+
+
+def _actual(store: TransactionStore, period: str, dimension: str, start: date, end: date) -> dict:
+    return {
+        (row["bucket"], row["key"]): (round(row["total"], 2), row["count"])
+        for row in store.get_rollups(period, dimension, start, end)
+    }
+
+
+def _assert_consistent(store: TransactionStore) -> None:
+    for start, end in [(date(2025, 1, 1), date(2025, 3, 31)), (date(2025, 1, 15), date(2025, 2, 20))]:
+        for period in ("day", "week", "month"):
+            for dimension in ("category", "account", "merchant"):
+                assert _actual(store, period, dimension, start, end) == _expected(store, period, dimension, start, end)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TransactionStore(tmp_path / "transactions.db")
+
+
+def test_rollups_follow_added_transactions(store):
+    store.apply_sync("item-1", [
+        _transaction("a", "2025-01-10", 12.5),
+        _transaction("b", "2025-01-10", 7.25, merchant=None),
+        _transaction("c", "2025-02-03", 40.0, category=None, account_id="account-2"),
+        _transaction("d", "2025-03-31", -100.0, category="INCOME"),
+    ], [], [], "cursor-1")
+    _assert_consistent(store)
+
+    store.apply_sync("item-1", [_transaction("e", "2025-01-20", 3.0)], [], [], "cursor-2")
+    _assert_consistent(store)
+
+
+def test_rollups_follow_modified_and_removed_transactions(store):
+    store.apply_sync("item-1", [
+        _transaction("a", "2025-01-10", 12.5),
+        _transaction("b", "2025-01-31", 7.25),
+        _transaction("c", "2025-02-03", 40.0),
+    ], [], [], "cursor-1")
+    _assert_consistent(store)
+
+    # A modification moving a transaction to another month must update both months
+    store.apply_sync("item-1", [], [_transaction("b", "2025-02-01", 8.0, category="TRANSPORTATION")], ["c"], "cursor-2")
+    _assert_consistent(store)
+    assert _actual(store, "month", "category", date(2025, 1, 1), date(2025, 2, 28)) == {
+        ("2025-01-01", "FOOD_AND_DRINK"): (12.5, 1),
+        ("2025-02-01", "TRANSPORTATION"): (8.0, 1),
+    }
+
+
+def test_rollups_only_recompute_changed_buckets(store):
+    store.apply_sync("item-1", [_transaction("a", "2025-01-10", 1.0), _transaction("b", "2025-03-10", 2.0)], [], [], "cursor-1")
+    store.refresh_rollups()
+    assert store.refresh_rollups() == 0
+
+    store.apply_sync("item-1", [_transaction("c", "2025-03-11", 3.0)], [], [], "cursor-2")
+    # The day, week and month of the single changed day
+    assert store.refresh_rollups() == 3
+
+
+def test_rollups_cover_transactions_stored_before_rollups_existed(tmp_path):
+    path = tmp_path / "transactions.db"
+    store = TransactionStore(path)
+    store.apply_sync("item-1", [_transaction("a", "2025-01-10", 12.5), _transaction("b", "2025-02-10", 4.0)], [], [], "cursor-1")
+
+    # Simulate a database from before rollups, without dirty days or the schema version
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("DELETE FROM rollup_dirty_days")
+        connection.execute("DELETE FROM rollups")
+        connection.execute("PRAGMA user_version = 0")
+    connection.close()
+
+    _assert_consistent(TransactionStore(path))
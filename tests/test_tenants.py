@@ -0,0 +1,144 @@
+import json
+import threading
+
+import pytest
+
+from conftest import connect_tenant
+from mcp_server.services.tenants import (
+    DEFAULT_TENANT,
+    TenantLocal,
+    TenantRegistry,
+    client_tenant,
+    current_tenant,
+    tenant_registry,
+    validate_tenant,
+)
+from mcp_server.storage.item import item_storage
+from mcp_server.storage.transactions import transaction_store
+from mcp_server.utils import get_tenant_storage
+
+
+def test_tenant_local_state_is_per_tenant():
+    counter = TenantLocal("test_counter", lambda tenant: {"tenant": tenant, "calls": 0})
+    with tenant_registry.use("alice-state"):
+        counter.resolve()["calls"] += 1
+        assert counter.resolve() is counter.resolve()
+    with tenant_registry.use("bob-state"):
+        assert counter.resolve() == {"tenant": "bob-state", "calls": 0}
+    with tenant_registry.use("alice-state"):
+        assert counter.resolve()["calls"] == 1
+    tenant_registry.evict("alice-state")
+    tenant_registry.evict("bob-state")
+    assert current_tenant() == tenant_registry.default_tenant
+
+
+def test_tenants_have_separate_items_and_stores(plaid_api):
+    connect_tenant("alice-items", plaid_api)
+    bob = get_tenant_storage("bob-items")
+    bob.connections_file.parent.mkdir(parents=True, exist_ok=True)
+    bob.connections_file.write_text(json.dumps([]))
+
+    with tenant_registry.use("alice-items"):
+        assert set(item_storage.get_items()) == {name for _, name, _ in plaid_api.connections()}
+        alice_store = transaction_store.resolve()
+    with tenant_registry.use("bob-items"):
+        assert dict(item_storage.get_items()) == {}
+        bob_store = transaction_store.resolve()
+
+    assert alice_store.path != bob_store.path
+    assert alice_store.path.parent.name == "alice-items"
+    assert get_tenant_storage("alice-items").keyring_service != get_tenant_storage(DEFAULT_TENANT).keyring_service
+    tenant_registry.evict("alice-items")
+    tenant_registry.evict("bob-items")
+
+
+def test_least_recently_used_tenants_are_evicted():
+    registry = TenantRegistry()
+    registry.max_resident = 3
+    for name in ("a", "b", "c"):
+        with registry.use(name):
+            pass
+    with registry.use("a"):
+        pass
+    with registry.use("d"):
+        pass
+
+    assert registry.resident() == [DEFAULT_TENANT, "c", "a", "d"]
+    assert registry.evictions == 1
+
+
+def test_evicted_tenants_lose_their_state():
+    counter = TenantLocal("test_evicted", lambda tenant: {"calls": 0})
+    with tenant_registry.use("carol-evicted"):
+        counter.resolve()["calls"] += 1
+    assert tenant_registry.evict("carol-evicted")
+    with tenant_registry.use("carol-evicted"):
+        assert counter.resolve()["calls"] == 0
+    tenant_registry.evict("carol-evicted")
+
+
+def test_busy_and_default_tenants_are_not_evicted():
+    registry = TenantRegistry()
+    registry.max_resident = 1
+    with registry.use(DEFAULT_TENANT):
+        pass
+
+    entered, release = threading.Event(), threading.Event()
+
+    def busy_call():
+        with registry.use("busy"):
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=busy_call)
+    thread.start()
+    entered.wait()
+    try:
+        with registry.use("other"):
+            pass
+        assert "busy" in registry.resident()
+        assert DEFAULT_TENANT in registry.resident()
+        assert not registry.evict("busy")
+    finally:
+        release.set()
+        thread.join()
+
+    with registry.use("later"):
+        pass
+    assert "busy" not in registry.resident()
+    assert DEFAULT_TENANT in registry.resident()
+
+
+def test_background_work_does_not_touch_tenants():
+    registry = TenantRegistry()
+    registry.max_resident = 2
+    for name in ("a", "b"):
+        with registry.use(name):
+            pass
+    with registry.use("a", touch=False):
+        pass
+    with registry.use("c"):
+        pass
+    assert "a" not in registry.resident()
+
+
+@pytest.mark.parametrize("name", ["", "../etc", "a/b", ".hidden", "x" * 65, "tenant name"])
+def test_invalid_tenant_names_are_rejected(name):
+    with pytest.raises(ValueError):
+        validate_tenant(name)
+    with pytest.raises(ValueError):
+        with tenant_registry.use(name):
+            pass
+
+
+def test_client_identities_map_to_safe_tenants():
+    assert client_tenant("alice") == "alice"
+
+    tenant = client_tenant("https://app.example.com/mcp")
+    assert validate_tenant(tenant) == tenant
+    assert tenant.startswith("https-app.example.com-mcp-")
+    assert tenant != client_tenant("https://app.example.com/mcp2")
+
+    # No token can select the single-user install's data
+    assert client_tenant(DEFAULT_TENANT) != DEFAULT_TENANT
+    assert validate_tenant(client_tenant(DEFAULT_TENANT))